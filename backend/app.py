@@ -18,6 +18,17 @@ try:
 except Exception as e:
     print(f"⚠️ Could not load feature flags: {e}")
 
+# Optionally load the Whisper model at boot. With gunicorn --preload this runs once
+# in the master and forked HTTP workers share the loaded model instead of each paying the cold start.
+# Background job workers are spawned, not forked, so they prewarm their own copy when they start
+# (services/job_queue.py).
+if os.getenv('PREWARM_WHISPER', 'false').lower() == 'true':
+    try:
+        from services.processor_registry import prewarm
+        prewarm()
+    except Exception as e:
+        print(f"⚠️ Could not pre-warm processing resources: {e}")
+
 app = Flask(__name__)
 
 # CORS allowed origins
@@ -120,6 +131,18 @@ except Exception as e:
     # Don't raise - allow app to start even if routes fail (for debugging)
     print("⚠️ App will start but routes may not work")
 
+# Start background job workers for queued /process requests
+# (skipped inside spawned worker processes, which re-import this module)
+try:
+    import multiprocessing
+    from config import FeatureFlags
+    embedded_workers = os.getenv('JOB_WORKERS_EMBEDDED', 'true').lower() == 'true'
+    if FeatureFlags.USE_BACKGROUND_JOBS and embedded_workers and multiprocessing.parent_process() is None:
+        from services.job_queue import start_worker_pool
+        start_worker_pool()
+except Exception as e:
+    print(f"⚠️ Could not start background job workers: {e}")
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint - no dependencies, always works"""
@@ -135,11 +158,68 @@ def health():
     except:
         feature_flags = {}
     
+    try:
+        from services.processor_registry import get_registry_stats
+        processor_stats = get_registry_stats()
+    except Exception:
+        processor_stats = {}
+    
+    try:
+        from services.transcript_cache import get_transcript_cache
+        processor_stats['transcript_cache'] = get_transcript_cache().get_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.info_cache import get_info_cache
+        processor_stats['info_cache'] = get_info_cache().get_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.strategy_scoreboard import get_strategy_scoreboard
+        processor_stats['download_strategies'] = get_strategy_scoreboard().get_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.analysis_cache import get_analysis_cache
+        processor_stats['analysis_cache'] = get_analysis_cache().get_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.transcription import get_transcription_stats
+        processor_stats['transcription'] = get_transcription_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.blob_store import get_blob_store
+        processor_stats['blob_store'] = get_blob_store().get_stats()
+    except Exception:
+        pass
+    
+    try:
+        from services.token_verifier import get_token_verifier
+        auth_stats = get_token_verifier().get_stats()
+    except Exception:
+        auth_stats = {}
+    
+    try:
+        from services.supabase_client import get_client_manager
+        supabase_stats = get_client_manager().get_stats()
+    except Exception:
+        supabase_stats = {}
+    
     return {
         'status': 'healthy', 
         'timestamp': datetime.datetime.utcnow().isoformat(),
         'cors_origins': allowed_origins,
-        'feature_flags': feature_flags
+        'feature_flags': feature_flags,
+        'processor': processor_stats,
+        'auth': auth_stats,
+        'supabase': supabase_stats
     }, 200
 
 @app.route('/api/admin/feature-flags', methods=['GET'])
@@ -159,10 +239,12 @@ def get_feature_flags():
 
 @app.route('/api/test-proxy', methods=['GET'])
 def test_proxy():
-    """Test endpoint to check proxy configuration"""
+    """Proxy configuration and cached health (pass ?refresh=true to schedule a new probe)"""
     import os
     
     try:
+        from services.proxy_health import get_proxy_monitor, build_proxy_url, mask_proxy_url
+        
         # Check environment variables directly (don't initialize VideoProcessor to avoid crashes)
         proxy_host = os.environ.get('PROXY_HOST')
         proxy_port = os.environ.get('PROXY_PORT')
@@ -171,11 +253,7 @@ def test_proxy():
         proxy_url = os.environ.get('PROXY_URL')
         
         # Build proxy URL the same way VideoProcessor does
-        built_proxy_url = None
-        if proxy_url:
-            built_proxy_url = proxy_url
-        elif proxy_host and proxy_port and proxy_username and proxy_password:
-            built_proxy_url = f"http://{proxy_username}:{proxy_password}@{proxy_host}:{proxy_port}"
+        built_proxy_url = build_proxy_url()
         
         result = {
             'proxy_url_set': bool(proxy_url),
@@ -184,13 +262,21 @@ def test_proxy():
             'proxy_username_set': bool(proxy_username),
             'proxy_password_set': bool(proxy_password),
             'proxy_configured': bool(built_proxy_url),
-            'proxy_url_preview': built_proxy_url.split('@')[1] if built_proxy_url and '@' in built_proxy_url else None
+            'proxy_url_preview': mask_proxy_url(built_proxy_url) if built_proxy_url and '@' in built_proxy_url else None
         }
         
+        # Health comes from the background monitor's cache - this endpoint never waits on a probe
+        monitor = get_proxy_monitor()
+        if request.args.get('refresh', 'false').lower() == 'true':
+            monitor.request_refresh()
+        else:
+            monitor.ensure_started()
+        
         return jsonify({
             'success': True,
             'proxy_configured': bool(built_proxy_url),
-            'details': result
+            'details': result,
+            'health': monitor.get_status()
         }), 200
     except Exception as e:
         import traceback
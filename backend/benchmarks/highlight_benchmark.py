@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark highlight strategies on the golden corpus (no LLM calls).
+
+Usage (from backend/):
+    python -m benchmarks.highlight_benchmark [--strategy indexed legacy exact]
+        [--case podcast_20k ...] [--repeat 3] [--max-chars 60000]
+
+For each case and strategy it reports:
+    time      - best wall time over --repeat runs
+    peak MB   - peak Python allocation during one run (tracemalloc)
+    recall    - claims tagged / claims supplied
+    located   - claims whose tag overlaps the ground-truth sentence with the right verdict
+
+The legacy strategy is quadratic; use --max-chars to skip it on big cases.
+"""
+import os
+import io
+import re
+import sys
+import time
+import argparse
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.highlight_corpus import load_corpus, CASES
+from benchmarks.legacy_highlighter import legacy_auto_highlight
+from services.highlighting import highlight_transcript, collect_claims, CLAIM_TAGS
+
+TAG = re.compile(r'\[(/?)(VERIFIED|OPINION|UNCERTAIN|FALSE)\] ?')
+
+
+def exact_highlight(transcript, analysis):
+    """Lower bound: tag only claims that appear verbatim (case-insensitive)"""
+    lowered = transcript.lower()
+    spans = []
+    for claim_text, verdict, _, _ in collect_claims(analysis):
+        start = lowered.find(claim_text.lower())
+        if start >= 0 and all(e <= start or s >= start + len(claim_text) for s, e, _ in spans):
+            spans.append((start, start + len(claim_text), verdict))
+    pieces, cursor = [], 0
+    for start, end, verdict in sorted(spans):
+        pieces += [transcript[cursor:start], f'[{verdict}] {transcript[start:end]}[/{verdict}]']
+        cursor = end
+    pieces.append(transcript[cursor:])
+    return ''.join(pieces)
+
+
+STRATEGIES = {
+    'indexed': lambda transcript, analysis: highlight_transcript(transcript, analysis)[0],
+    'legacy': legacy_auto_highlight,
+    'exact': exact_highlight,
+}
+
+
+def parse_tagged(text):
+    """Tagged output -> [(start, end, verdict)] in untagged-transcript offsets"""
+    spans = []
+    open_tags = []
+    removed = 0
+    for match in TAG.finditer(text):
+        position = match.start() - removed
+        removed += len(match.group())
+        closing, verdict = match.group(1), match.group(2)
+        # "[/TAG]" never has a trailing space in our format, so strip only what the opener added
+        if closing:
+            if match.group().endswith(' '):
+                removed -= 1
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i][1] == verdict:
+                    start, _ = open_tags.pop(i)
+                    spans.append((start, position, verdict))
+                    break
+        else:
+            open_tags.append((position, verdict))
+    return spans
+
+
+def score(case, output):
+    spans = parse_tagged(output)
+    tagged = sum(1 for m in TAG.finditer(output) if not m.group(1))
+    supplied = len(case['expected'])
+    verdict_of = {name: verdict for name, verdict in CLAIM_TAGS}
+    located = 0
+    for expected in case['expected']:
+        verdict = verdict_of[expected['list']]
+        if any(v == verdict and s < expected['end'] and e > expected['start'] for s, e, v in spans):
+            located += 1
+    return {
+        'recall': min(tagged, supplied) / supplied if supplied else 1.0,
+        'located': located / supplied if supplied else 1.0,
+    }
+
+
+def run_strategy(strategy, case, repeat):
+    highlight = STRATEGIES[strategy]
+    sink = io.StringIO()  # the legacy strategy prints per claim
+
+    best = None
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with redirect_stdout(sink):
+            output = highlight(case['transcript'], case['analysis'])
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        sink.seek(0)
+        sink.truncate()
+
+    tracemalloc.start()
+    with redirect_stdout(sink):
+        highlight(case['transcript'], case['analysis'])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(score(case, output), seconds=best, peak_mb=peak / (1024 * 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strategy', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--case', nargs='+', choices=[c[0] for c in CASES], help='default: all cases')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-chars', type=int, default=60000, help='skip legacy above this transcript length (0 = never)')
+    args = parser.parse_args()
+
+    print(f"{'case':<15} {'chars':>7} {'claims':>6}  {'strategy':<8} {'time':>9} {'peak MB':>8} {'recall':>7} {'located':>8}")
+    print('-' * 76)
+    for case in load_corpus(args.case):
+        chars = len(case['transcript'])
+        for strategy in args.strategy:
+            if strategy == 'legacy' and args.max_chars and chars > args.max_chars:
+                print(f"{case['name']:<15} {chars:>7} {len(case['expected']):>6}  {strategy:<8} {'skipped':>9}")
+                continue
+            result = run_strategy(strategy, case, args.repeat)
+            print(f"{case['name']:<15} {chars:>7} {len(case['expected']):>6}  {strategy:<8} "
+                  f"{result['seconds'] * 1000:>7.1f}ms {result['peak_mb']:>8.2f} "
+                  f"{result['recall']:>7.0%} {result['located']:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
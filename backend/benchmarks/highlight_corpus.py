@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Golden corpus for the highlight benchmark.
+
+Each case is a synthetic transcript plus a fact-check `analysis` dict whose
+claims were derived from known sentences, with the character span of every
+source sentence recorded as ground truth. Claims are perturbed the way LLM
+output drifts from the transcript:
+
+    exact       - copied verbatim
+    normalized  - different casing/punctuation
+    trimmed     - leading or trailing words dropped
+    paraphrase  - a couple of words swapped for synonyms, filler removed
+    reworded    - clauses reordered ("..., according to X")
+
+Generation is seeded, so the checked-in files under corpus/highlight/ can be
+rebuilt byte-for-byte:
+
+    python -m benchmarks.highlight_corpus --write
+"""
+import os
+import re
+import gzip
+import json
+import random
+import argparse
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'highlight')
+
+# (name, target chars, caption style)
+CASES = [
+    ('news_1k', 1000, False),
+    ('interview_5k', 5000, False),
+    ('podcast_20k', 20000, False),
+    ('captions_20k', 20000, True),
+    ('podcast_50k', 50000, False),
+    ('podcast_100k', 100000, False),
+    ('captions_100k', 100000, True),
+    ('podcast_200k', 200000, False),
+]
+
+NAMES = ['Senator Collins', 'Dr. Fauci', 'the governor', 'Elon Musk', 'the CDC', 'the Federal Reserve',
+         'Professor Lee', 'the mayor', 'NASA', 'the World Bank', 'the FBI', 'Taylor Swift']
+NOUNS = ['people', 'jobs', 'vaccines', 'cars', 'homes', 'students', 'flights', 'barrels of oil',
+         'acres of forest', 'migrants', 'voters', 'patients', 'electric vehicles', 'small businesses']
+VERBS = ['created', 'lost', 'sold', 'approved', 'reported', 'counted', 'delivered', 'destroyed', 'registered']
+PLACES = ['Texas', 'California', 'the United States', 'Europe', 'China', 'New York', 'Florida',
+          'Canada', 'Ohio', 'the Midwest', 'Brazil', 'India']
+TIMES = ['year', 'month', 'quarter', 'decade', 'week', 'summer', 'winter']
+SYNONYMS = {
+    'people': 'individuals', 'jobs': 'positions', 'homes': 'houses', 'cars': 'vehicles',
+    'created': 'added', 'lost': 'cut', 'sold': 'purchased', 'reported': 'announced',
+    'students': 'pupils', 'year': '12 months', 'patients': 'people in hospital',
+}
+FILLER = [
+    'You know, it is kind of crazy when you think about it.',
+    'All right, thank you so much for being here today.',
+    'What about the roads this weekend?',
+    'Let me just pull that up real quick.',
+    'And honestly I was not expecting that at all.',
+    'So anyway, moving on to the next thing.',
+    'Make sure you like and subscribe if you have not already.',
+    'I mean, we talked about this last time too.',
+    'Okay so here is where it gets interesting.',
+    'That is a great question, I appreciate you asking.',
+]
+OPINIONS = [
+    'Honestly I think {noun} in {place} are the most overrated thing in the world right now.',
+    'In my opinion {name} is going to regret this decision for the rest of the {time}.',
+    'This is easily the worst policy {place} has seen in a generation.',
+    'I believe {noun} will completely disappear from {place} within ten years.',
+]
+
+
+def _fact(rng):
+    number = rng.choice([f'{rng.randint(2, 99)} million', f'{rng.randint(100, 999)} thousand',
+                         f'{rng.randint(2, 95)} percent of', f'{rng.randint(1000, 9999)}'])
+    fields = {
+        'name': rng.choice(NAMES), 'number': number, 'noun': rng.choice(NOUNS),
+        'verb': rng.choice(VERBS), 'place': rng.choice(PLACES), 'time': rng.choice(TIMES),
+    }
+    template = rng.choice([
+        '{name} said that {number} {noun} were {verb} in {place} last {time}.',
+        'According to {name}, {number} {noun} were {verb} in {place} over the past {time}.',
+        'Last {time} {place} {verb} {number} {noun}, which {name} called a record.',
+        'In {place} alone, {number} {noun} were {verb} this {time}, {name} confirmed.',
+    ])
+    return template.format(**fields), fields
+
+
+def _opinion(rng):
+    fields = {'name': rng.choice(NAMES), 'noun': rng.choice(NOUNS), 'place': rng.choice(PLACES), 'time': rng.choice(TIMES)}
+    return rng.choice(OPINIONS).format(**fields), fields
+
+
+def _caption_style(sentence):
+    """YouTube auto-captions: lowercase, no punctuation"""
+    return ' '.join(re.sub(r"[^\w\s%']", ' ', sentence.lower()).split())
+
+
+def _perturb(rng, sentence, fields, kind):
+    words = sentence.rstrip('.').split()
+    if kind == 'exact':
+        return sentence
+    if kind == 'normalized':
+        return re.sub(r'[,.]', '', sentence).lower().capitalize()
+    if kind == 'trimmed':
+        return ' '.join(words[2:]) if rng.random() < 0.5 else ' '.join(words[:-2])
+    if kind == 'paraphrase':
+        swapped = [SYNONYMS.get(w, w) for w in words]
+        return ' '.join(w for w in swapped if w not in ('that', 'alone,', 'just'))
+    # reworded: the claim as an LLM would restate it
+    if 'number' in fields:
+        return f"{fields['number'].capitalize()} {fields['noun']} were {fields['verb']} in {fields['place']}, according to {fields['name']}"
+    return f"{fields['name'].capitalize()} will regret the decision about {fields['noun']} in {fields['place']}"
+
+
+def generate_case(name, target_chars, caption_style=False, seed=None):
+    """One corpus case -> {'name', 'transcript', 'analysis', 'expected'}"""
+    rng = random.Random(seed if seed is not None else f'{name}:{target_chars}')
+    claim_budget = max(3, min(60, target_chars // 1500))
+    kinds = ['exact', 'normalized', 'trimmed', 'paraphrase', 'reworded']
+    kind_weights = [3, 2, 2, 2, 1]
+
+    pieces = []
+    length = 0
+    candidates = []  # (piece index, sentence, fields, is_opinion)
+    while length < target_chars:
+        roll = rng.random()
+        if roll < 0.55:
+            sentence, fields, opinion = rng.choice(FILLER), {}, False
+        elif roll < 0.85:
+            sentence, fields = _fact(rng)
+            opinion = False
+        else:
+            sentence, fields = _opinion(rng)
+            opinion = True
+        text = _caption_style(sentence) if caption_style else sentence
+        if fields:
+            candidates.append((len(pieces), sentence, fields, opinion))
+        pieces.append(text)
+        length += len(text) + 1
+
+    transcript = ' '.join(pieces)
+    offsets = []
+    cursor = 0
+    for piece in pieces:
+        offsets.append(cursor)
+        cursor += len(piece) + 1
+
+    chosen = rng.sample(candidates, min(claim_budget, len(candidates)))
+    chosen.sort(key=lambda c: c[0])
+    analysis = {'fact_score': 6, 'overall_verdict': 'Mixed Accuracy', 'summary': f'Synthetic case {name}',
+                'verified_claims': [], 'opinion_claims': [], 'uncertain_claims': [], 'false_claims': []}
+    expected = []
+    for piece_index, sentence, fields, opinion in chosen:
+        kind = rng.choices(kinds, weights=kind_weights)[0]
+        list_name = 'opinion_claims' if opinion else rng.choice(['verified_claims', 'uncertain_claims', 'false_claims'])
+        claim = {'claim': _perturb(rng, sentence, fields, kind), 'verdict': list_name.split('_')[0].upper(),
+                 'timestamp': 'Throughout', 'explanation': 'synthetic', 'sources': [], 'confidence': 'Medium'}
+        expected.append({
+            'list': list_name,
+            'index': len(analysis[list_name]),
+            'kind': kind,
+            'start': offsets[piece_index],
+            'end': offsets[piece_index] + len(pieces[piece_index]),
+        })
+        analysis[list_name].append(claim)
+
+    return {'name': name, 'caption_style': caption_style, 'transcript': transcript,
+            'analysis': analysis, 'expected': expected}
+
+
+def case_path(name):
+    return os.path.join(CORPUS_DIR, f'{name}.json.gz')
+
+
+def write_corpus():
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    for name, target_chars, caption_style in CASES:
+        case = generate_case(name, target_chars, caption_style)
+        # mtime=0 keeps the gzip bytes identical across regenerations
+        with open(case_path(name), 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as out:
+            out.write(json.dumps(case, indent=1, sort_keys=True).encode('utf-8'))
+        print(f"wrote {case_path(name)} ({len(case['transcript'])} chars, {len(case['expected'])} claims)")
+
+
+def load_corpus(names=None):
+    """Checked-in cases (in size order), optionally filtered by name"""
+    cases = []
+    for name, _, _ in CASES:
+        if names and name not in names:
+            continue
+        with gzip.open(case_path(name), 'rt', encoding='utf-8') as f:
+            cases.append(json.load(f))
+    return cases
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--write', action='store_true', help='regenerate the checked-in corpus files')
+    args = parser.parse_args()
+    if args.write:
+        write_corpus()
+    else:
+        parser.print_help()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare serial vs chunked/parallel local Whisper transcription wall time.
+
+Usage (from backend/):
+    python -m benchmarks.transcription_benchmark [--audio PATH] [--minutes 10]
+        [--workers 4] [--chunk-seconds 120] [--model base]
+
+Without --audio, a deterministic synthetic sample (speech-like noise bursts
+separated by pauses, fixed seed) is generated, so runs are comparable across
+machines without shipping a large media file. Chunk boundaries are computed
+twice and compared to confirm the split is deterministic.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import transcription
+from services.transcription import SAMPLE_RATE
+
+
+def synthesize_sample(minutes, seed=1234):
+    """Deterministic speech-like audio: modulated noise bursts with pauses between them"""
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    while pos < total:
+        burst = int(rng.uniform(2.0, 8.0) * SAMPLE_RATE)
+        end = min(total, pos + burst)
+        t = np.arange(end - pos) / SAMPLE_RATE
+        # ~4 Hz syllable envelope over broadband noise
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t))
+        audio[pos:end] = (rng.normal(0, 0.1, end - pos) * envelope).astype(np.float32)
+        pos = end + int(rng.uniform(0.3, 1.5) * SAMPLE_RATE)
+    return audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audio', help='audio/video file to transcribe (default: synthetic sample)')
+    parser.add_argument('--minutes', type=float, default=10, help='length of the synthetic sample')
+    parser.add_argument('--workers', type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--chunk-seconds', type=float, default=120)
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--skip-serial', action='store_true')
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = transcription.load_audio(args.audio)
+        source = args.audio
+    else:
+        audio = synthesize_sample(args.minutes)
+        source = f'synthetic ({args.minutes:g} min, seed 1234)'
+    duration = len(audio) / SAMPLE_RATE
+
+    first = transcription.find_chunk_boundaries(audio, chunk_seconds=args.chunk_seconds)
+    second = transcription.find_chunk_boundaries(audio, chunk_seconds=args.chunk_seconds)
+    assert first == second, 'chunk boundaries are not deterministic'
+
+    print(f"Audio: {source} - {duration:.1f}s")
+    print(f"Chunks: {len(first)} -> " + ', '.join(f"{(e - s) / SAMPLE_RATE:.1f}s" for s, e in first))
+
+    results = {}
+    if not args.skip_serial:
+        import whisper
+        model = whisper.load_model(args.model)
+        started = time.time()
+        serial = transcription.transcribe_serial(audio, model)
+        results['serial'] = time.time() - started
+        print(f"Serial:   {results['serial']:.1f}s (RTF {results['serial'] / duration:.2f}, {len(serial['segments'])} segments)")
+
+    # Warm the pool (model loads) outside the timed region
+    pool = transcription._get_pool(args.workers, args.model)
+    list(pool.map(transcription._transcribe_chunk, [(0, 0.0, audio[:SAMPLE_RATE], None)] * args.workers))
+
+    started = time.time()
+    parallel = transcription.transcribe_chunked(audio, args.workers, args.model, chunk_seconds=args.chunk_seconds)
+    results['parallel'] = time.time() - started
+    print(f"Parallel: {results['parallel']:.1f}s (RTF {results['parallel'] / duration:.2f}, "
+          f"{len(parallel['segments'])} segments, {args.workers} workers)")
+
+    if 'serial' in results:
+        print(f"Speedup:  {results['serial'] / results['parallel']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,10 +10,15 @@ class FeatureFlags:
     # Low-risk optimizations
     USE_FASTER_AI_MODELS = os.getenv('USE_FASTER_AI_MODELS', 'false').lower() == 'true'
     USE_GLOBAL_CACHE = os.getenv('USE_GLOBAL_CACHE', 'false').lower() == 'true'
+    USE_LOCAL_JWT = os.getenv('USE_LOCAL_JWT', 'false').lower() == 'true'
     
     # Medium-risk optimizations
     USE_OPENAI_WHISPER = os.getenv('USE_OPENAI_WHISPER', 'false').lower() == 'true'
     USE_PARALLEL_PROCESSING = os.getenv('USE_PARALLEL_PROCESSING', 'false').lower() == 'true'
+    USE_VAD = os.getenv('USE_VAD', 'false').lower() == 'true'
+    USE_BLOB_STORAGE = os.getenv('USE_BLOB_STORAGE', 'false').lower() == 'true'
+    USE_HEDGED_DOWNLOADS = os.getenv('USE_HEDGED_DOWNLOADS', 'false').lower() == 'true'
+    USE_ADAPTIVE_STRATEGIES = os.getenv('USE_ADAPTIVE_STRATEGIES', 'false').lower() == 'true'
     
     # High-risk optimizations
     USE_BACKGROUND_JOBS = os.getenv('USE_BACKGROUND_JOBS', 'false').lower() == 'true'
@@ -24,8 +29,13 @@ class FeatureFlags:
         return {
             'faster_ai_models': cls.USE_FASTER_AI_MODELS,
             'global_cache': cls.USE_GLOBAL_CACHE,
+            'local_jwt': cls.USE_LOCAL_JWT,
             'openai_whisper': cls.USE_OPENAI_WHISPER,
             'parallel_processing': cls.USE_PARALLEL_PROCESSING,
+            'vad': cls.USE_VAD,
+            'blob_storage': cls.USE_BLOB_STORAGE,
+            'hedged_downloads': cls.USE_HEDGED_DOWNLOADS,
+            'adaptive_strategies': cls.USE_ADAPTIVE_STRATEGIES,
             'background_jobs': cls.USE_BACKGROUND_JOBS,
         }
     
@@ -1,51 +1,79 @@
 from functools import wraps
 from flask import request, jsonify
 from services.supabase_client import get_supabase_client
-import jwt
-
-def verify_token(f):
-    """Decorator to verify JWT token from Supabase"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        token = None
-        
-        # Get token from Authorization header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(' ')[1]  # Bearer <token>
-            except IndexError:
-                return jsonify({'success': False, 'error': 'Invalid token format'}), 401
-        
-        if not token:
-            return jsonify({'success': False, 'error': 'Token is missing'}), 401
-        
-        try:
-            # Verify token with Supabase
-            supabase = get_supabase_client()
-            print(f"=== AUTH MIDDLEWARE: Verifying token ===")
-            response = supabase.auth.get_user(token)
-            
-            print(f"Supabase response: {response}")
-            print(f"User: {response.user if response else 'None'}")
-            
-            if not response or not response.user:
-                print("❌ No user in response")
-                return jsonify({'success': False, 'error': 'Invalid token'}), 401
-            
+from services.token_verifier import get_token_verifier, TokenUser, TokenVerificationError
+from config import FeatureFlags
+
+
+def _verify_with_supabase(token):
+    """Ask Supabase who the token belongs to (network round trip; sees revocations)"""
+    supabase = get_supabase_client()
+    print(f"=== AUTH MIDDLEWARE: Verifying token ===")
+    response = supabase.auth.get_user(token)
+
+    print(f"Supabase response: {response}")
+    print(f"User: {response.user if response else 'None'}")
+
+    if not response or not response.user:
+        return None
+    print(f"✅ User authenticated: {response.user.email} (ID: {response.user.id})")
+    return response.user
+
+
+def verify_token(f=None, *, strict=False):
+    """Decorator to verify JWT token from Supabase
+
+    With USE_LOCAL_JWT the token is checked locally (signature, expiry, audience)
+    and Supabase is only asked when the token can't be judged locally (no key
+    configured, unknown signing key). @verify_token(strict=True) always asks
+    Supabase - use it for routes that must honour sign-out/revocation immediately.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            token = None
+
+            # Get token from Authorization header
+            if 'Authorization' in request.headers:
+                auth_header = request.headers['Authorization']
+                try:
+                    token = auth_header.split(' ')[1]  # Bearer <token>
+                except IndexError:
+                    return jsonify({'success': False, 'error': 'Invalid token format'}), 401
+
+            if not token:
+                return jsonify({'success': False, 'error': 'Token is missing'}), 401
+
+            user = None
+            if FeatureFlags.USE_LOCAL_JWT and not strict:
+                try:
+                    user = TokenUser(get_token_verifier().verify(token))
+                except TokenVerificationError as e:
+                    if not e.fallback:
+                        return jsonify({'success': False, 'error': f'Token verification failed: {str(e)}'}), 401
+                    print(f"⚠️ Local token verification unavailable, asking Supabase: {e}")
+
+            if user is None:
+                try:
+                    user = _verify_with_supabase(token)
+                except Exception as e:
+                    print(f"❌ Token verification error: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    return jsonify({'success': False, 'error': f'Token verification failed: {str(e)}'}), 401
+
+                if user is None:
+                    print("❌ No user in response")
+                    return jsonify({'success': False, 'error': 'Invalid token'}), 401
+
             # Add user info to request context
-            request.user = response.user
-            request.user_id = response.user.id
-            
-            print(f"✅ User authenticated: {response.user.email} (ID: {response.user.id})")
-            
-        except Exception as e:
-            print(f"❌ Token verification error: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'success': False, 'error': f'Token verification failed: {str(e)}'}), 401
-        
-        return f(*args, **kwargs)
-    
-    return decorated_function
+            request.user = user
+            request.user_id = user.id
+
+            return f(*args, **kwargs)
+
+        return decorated_function
 
+    if f is None:
+        return decorator
+    return decorator(f)
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from services.supabase_client import get_supabase_client
+from services.supabase_client import create_supabase_client
 from services.slack_notifier import notify_new_signup
 
 bp = Blueprint('auth', __name__)
@@ -18,7 +18,7 @@ def signup():
         if len(password) < 8:
             return jsonify({'success': False, 'error': 'Password must be at least 8 characters'}), 400
         
-        supabase = get_supabase_client()
+        supabase = create_supabase_client()  # Auth calls store a session on the client - never the shared one
         
         # Sign up user
         try:
@@ -104,7 +104,7 @@ def login():
         if not email or not password:
             return jsonify({'success': False, 'error': 'Email and password are required'}), 400
         
-        supabase = get_supabase_client()
+        supabase = create_supabase_client()
         
         # Sign in user
         response = supabase.auth.sign_in_with_password({
@@ -169,7 +169,7 @@ def login():
 def logout():
     """Logout user"""
     try:
-        supabase = get_supabase_client()
+        supabase = create_supabase_client()
         supabase.auth.sign_out()
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -185,7 +185,7 @@ def reset_password():
         if not email:
             return jsonify({'success': False, 'error': 'Email is required'}), 400
         
-        supabase = get_supabase_client()
+        supabase = create_supabase_client()
         supabase.auth.reset_password_for_email(email)
         
         return jsonify({
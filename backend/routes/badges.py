@@ -1,8 +1,8 @@
 from flask import Blueprint, request, Response
 from services.supabase_client import get_supabase_client
+from services.blob_store import hydrate_video, payload_columns
 
 badges_bp = Blueprint('badges', __name__)
-supabase = get_supabase_client()
 
 def get_badge_color(score):
     """Get badge color based on score"""
@@ -31,6 +31,7 @@ def generate_star_svg(score, max_stars=5):
 def get_creator_badge(creator_id):
     """Generate SVG badge for a creator"""
     try:
+        supabase = get_supabase_client()
         # Get creator data
         creator_response = supabase.table('creators').select('*').eq('id', creator_id).execute()
         
@@ -95,6 +96,7 @@ def get_creator_badge(creator_id):
 def get_video_badge(video_id):
     """Generate SVG badge for a video"""
     try:
+        supabase = get_supabase_client()
         # Validate video_id is not undefined or empty
         if not video_id or video_id == 'undefined' or video_id.strip() == '':
             return Response('Invalid video ID', status=400)
@@ -106,12 +108,12 @@ def get_video_badge(video_id):
             return Response('Invalid video ID format', status=400)
         
         # Get video data
-        video_response = supabase.table('videos').select('title, analysis').eq('id', video_id).execute()
+        video_response = supabase.table('videos').select(payload_columns('title', 'analysis')).eq('id', video_id).execute()
         
         if not video_response.data:
             return Response('Video not found', status=404)
         
-        video = video_response.data[0]
+        video = hydrate_video(video_response.data[0])
         
         # Parse analysis to get fact score
         analysis = video.get('analysis')
@@ -177,6 +179,7 @@ def get_video_badge(video_id):
 def get_creator_badge_by_platform(platform, platform_id):
     """Generate SVG badge for a creator by platform ID"""
     try:
+        supabase = get_supabase_client()
         # Get creator data by platform
         creator_response = supabase.table('creators').select('*').eq('platform', platform).eq('platform_id', platform_id).execute()
         
@@ -24,7 +24,7 @@ def get_price_id(plan_key):
     return os.getenv(env_key)
 
 @bp.route('/create-checkout-session', methods=['POST'])
-@verify_token
+@verify_token(strict=True)
 def create_checkout_session():
     """Create Stripe checkout session"""
     try:
@@ -261,7 +261,7 @@ def handle_payment_failed(invoice):
         print(f"Error handling payment failed: {e}")
 
 @bp.route('/create-portal-session', methods=['POST'])
-@verify_token
+@verify_token(strict=True)
 def create_portal_session():
     """Create Stripe Customer Portal session"""
     try:
@@ -290,7 +290,7 @@ def create_portal_session():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @bp.route('/cancel-subscription', methods=['POST'])
-@verify_token
+@verify_token(strict=True)
 def cancel_subscription():
     """Cancel subscription"""
     try:
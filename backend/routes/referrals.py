@@ -5,13 +5,13 @@ import random
 import string
 
 referrals_bp = Blueprint('referrals', __name__)
-supabase = get_supabase_client()
 
 @referrals_bp.route('/code', methods=['GET'])
 @verify_token
 def get_referral_code():
     """Get or generate user's referral code"""
     try:
+        supabase = get_supabase_client()
         user_id = request.user_id
         
         # Get user's current referral code
@@ -47,6 +47,7 @@ def get_referral_code():
 def apply_referral():
     """Apply a referral code"""
     try:
+        supabase = get_supabase_client()
         user_id = request.user_id
         data = request.json
         referral_code = data.get('referral_code', '').strip().upper()
@@ -84,6 +85,7 @@ def apply_referral():
 def get_referral_stats():
     """Get user's referral statistics"""
     try:
+        supabase = get_supabase_client()
         user_id = request.user_id
         
         # Get referral stats
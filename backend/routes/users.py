@@ -80,7 +80,7 @@ def get_usage():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @bp.route('/me', methods=['DELETE'])
-@verify_token
+@verify_token(strict=True)
 def delete_account():
     """Delete user account"""
     try:
@@ -1,495 +1,215 @@
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import verify_token
 from services.supabase_client import get_supabase_client
-from services.slack_notifier import notify_video_upload
+from services.video_pipeline import (
+    process_video_for_user, create_pending_video, get_video_processor,
+    estimate_video_minutes, charge_multiplier
+)
+from services.minute_ledger import reserve_minutes, limit_exceeded_response, UserNotFound
+from services.blob_store import hydrate_video, payload_columns
+from services.highlighting import with_highlighted_transcript
+from services.video_artifacts import VideoArtifacts
 from datetime import datetime
+import base64
 import math
 import os
+import re
 import json
+import uuid
 
-bp = Blueprint('videos', __name__)
+from config import FeatureFlags
 
-def get_video_processor():
-    """Lazy import VideoProcessor to avoid startup crashes"""
-    from services.video_processor import VideoProcessor
-    return VideoProcessor()
+bp = Blueprint('videos', __name__)
 
 @bp.route('/process', methods=['POST'])
 @verify_token
 def process_video():
-    """Process video from URL"""
+    """Process video from URL (queued as a background job when USE_BACKGROUND_JOBS is on)"""
+    data = request.get_json() or {}
+    video_url = data.get('url')
+    analysis_type = data.get('analysis_type', 'summarize')
+    bypass_cache = bool(data.get('bypass_cache'))  # Honored for admins only (ADMIN_EMAILS)
+    user_id = request.user_id
+    
+    if not FeatureFlags.USE_BACKGROUND_JOBS:
+        response_data, status_code = process_video_for_user(user_id, video_url, analysis_type, bypass_cache=bypass_cache)
+        return jsonify(response_data), status_code
+    
     try:
-        print("\n" + "="*80)
-        print("🎬 VIDEO PROCESS: STARTING")
-        print("="*80)
-        data = request.get_json()
-        video_url = data.get('url')
-        analysis_type = data.get('analysis_type', 'summarize')
-        
-        print(f"Video URL: {video_url}")
-        print(f"Analysis type: {analysis_type}")
-        
         if not video_url:
             return jsonify({'success': False, 'error': 'Video URL is required'}), 400
         
         if analysis_type not in ['summarize', 'fact-check']:
             return jsonify({'success': False, 'error': 'Invalid analysis type'}), 400
         
-        supabase = get_supabase_client()
-        user_id = request.user_id
-        
-        print(f"User ID: {user_id}")
-        
-        # Get user to check limits
-        user_response = supabase.table('users').select('*').eq('id', user_id).execute()
-        if not user_response.data:
-            print(f"❌ User not found: {user_id}")
+        # Hold the estimated charge up front so exhausted users get an immediate 403, not a
+        # failed job - and so parallel submissions can't all squeeze under the limit
+        # What the estimate fetches (captions or the yt-dlp probe) travels with the job
+        processor = get_video_processor()
+        artifacts = VideoArtifacts(video_url)
+        estimated_minutes = estimate_video_minutes(processor, video_url, artifacts)
+        try:
+            reservation, usage = reserve_minutes(user_id, math.ceil(estimated_minutes * charge_multiplier(analysis_type)))
+        except UserNotFound:
             return jsonify({'success': False, 'error': 'User not found'}), 404
+        if reservation is None:
+            return jsonify(limit_exceeded_response(usage)), 403
         
-        user = user_response.data[0]
-        user_email = user.get('email', 'Unknown')
-        print(f"✅ User found: {user_email}")
-        
-        # Check if we already have a transcript for this video URL
-        print(f"Checking for existing transcript for URL: {video_url}")
-        existing_video = supabase.table('videos').select('transcription, title, platform, duration_minutes').eq('user_id', user_id).eq('video_url', video_url).order('created_at', desc=True).limit(1).execute()
-        
-        existing_transcript = None
-        video_metadata = {}
-        
-        if existing_video.data and existing_video.data[0].get('transcription'):
-            existing_transcript = existing_video.data[0]['transcription']
-            video_metadata = {
-                'title': existing_video.data[0].get('title', 'Untitled'),
-                'platform': existing_video.data[0].get('platform', 'youtube'),
-                'duration_minutes': float(existing_video.data[0].get('duration_minutes', 0))
-            }
-            print(f"✅ Found existing transcript ({len(existing_transcript)} chars) - will reuse!")
-            print(f"   Title: {video_metadata['title']}")
-            print(f"   Duration: {video_metadata['duration_minutes']} minutes")
-        
-        # Initialize processor (lazy import)
-        print("Initializing VideoProcessor...")
+        from services.job_queue import enqueue_job
         try:
-            processor = get_video_processor()
-            print("✅ VideoProcessor initialized")
-        except Exception as proc_error:
-            print(f"❌ VideoProcessor initialization failed: {proc_error}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'success': False, 'error': f'Video processor initialization failed: {str(proc_error)}'}), 500
-        
-        # Try to get YouTube transcript first (works without proxy, fast!)
-        estimated_minutes = 15  # Default estimate
-        has_transcript = False
-        
-        if not existing_transcript and ('youtube.com' in video_url or 'youtu.be' in video_url):
-            print("🎯 Checking for YouTube transcript (no proxy needed)...")
-            test_transcript = processor.get_youtube_transcript(video_url)
-            if test_transcript:
-                print(f"✅ Found YouTube transcript! Estimating from transcript length...")
-                # Estimate: ~150 words per minute speaking rate
-                # Handle new dict format {'text': ..., 'segments': ...}
-                transcript_text = test_transcript.get('text') if isinstance(test_transcript, dict) else test_transcript
-                word_count = len(transcript_text.split())
-                estimated_minutes = math.ceil(word_count / 150)
-                has_transcript = True
-                print(f"📊 Estimated {estimated_minutes} minutes based on transcript ({word_count} words)")
-            else:
-                print("⚠️ No YouTube transcript - will need to download video")
-        
-        # Only estimate duration with yt-dlp if we couldn't get transcript
-        if not has_transcript and not existing_transcript:
-            try:
-                print("⏱️ Estimating video duration with yt-dlp...")
-                estimated_duration = processor.estimate_duration(video_url)
-                print(f"✅ Estimated duration: {estimated_duration}s ({estimated_duration/60:.1f} min)")
-                estimated_minutes = math.ceil(estimated_duration / 60)
-            except Exception as est_error:
-                print(f"⚠️ Duration estimation failed (not critical): {str(est_error)}")
-                print("   Will use default estimate of 15 minutes")
-                estimated_minutes = 15
-        elif existing_transcript:
-            estimated_minutes = math.ceil(video_metadata['duration_minutes'])
-            print(f"✅ Using cached duration: {estimated_minutes} minutes")
-        
-        print(f"📊 Will charge {estimated_minutes} minutes for this video")
-        
-        # Check limit - Grace period approach
-        used = float(user.get('minutes_used_this_month', 0))
-        limit = user.get('monthly_minute_limit', 60)
-        
-        # Block NEW videos if already AT or OVER limit
-        if used >= limit:
-            print(f"❌ User has exhausted their limit: {used} >= {limit}")
-            return jsonify({
-                'success': False,
-                'error': f'You have used all {limit} minutes this month. Upgrade to continue analyzing videos.',
-                'upgrade_required': True,
-                'current_tier': user.get('subscription_tier', 'free'),
-                'used': used,
-                'limit': limit
-            }), 403
-        
-        # Grace period: If they have ANY minutes left, let them start (even if it goes over)
-        remaining = limit - used
-        if estimated_minutes > remaining:
-            overage = estimated_minutes - remaining
-            print(f"⚠️ Grace period: This video will use {estimated_minutes} min, going {overage} min over limit")
-            print(f"   Allowing because user has {remaining} min remaining (started under limit)")
-        else:
-            print(f"✅ User has enough minutes: {remaining} remaining, needs {estimated_minutes}")
-        
-        # Process video (use cached transcript if available)
-        if existing_transcript:
-            print("🔄 Reusing cached transcript - only running new analysis!")
-            # Choose AI model based on transcript length
-            transcript_length = len(existing_transcript)
-            use_openai = transcript_length >= 12000  # Switch to OpenAI to avoid Claude truncation issues
-            
-            if use_openai:
-                print(f"🤖 Analyzing with OpenAI GPT-4o-mini ({transcript_length} chars)...")
-                analysis = processor.analyze_with_openai(existing_transcript, analysis_type)
-                # OpenAI returns JSON string for fact-check, plain text for summarize
-                if analysis_type == 'fact-check' and isinstance(analysis, str):
-                    if not analysis or analysis.strip() == '':
-                        raise Exception("OpenAI returned empty analysis. Please try again.")
-                    try:
-                        analysis = json.loads(analysis)
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Failed to parse OpenAI response in route: {str(e)}")
-                        print(f"📄 Raw analysis (first 200 chars): {analysis[:200]}")
-                        raise Exception(f"Failed to parse AI analysis: {str(e)}")
-                elif analysis_type == 'summarize':
-                    # Summarize returns plain text, no parsing needed
-                    print(f"✅ OpenAI returned summary ({len(analysis)} chars)")
-            else:
-                print(f"🤖 Analyzing with Claude AI ({transcript_length} chars)...")
-                analysis = processor.analyze_with_claude(existing_transcript, analysis_type)
-            
-            # For fact-checks, auto-generate highlighted transcript if OpenAI or Claude didn't
-            if analysis_type == 'fact-check' and isinstance(analysis, dict):
-                # Check if Claude already added highlights
-                claude_highlights = analysis.get('full_transcript_with_highlights')
-                has_claude_highlights = claude_highlights and (
-                    '[VERIFIED]' in str(claude_highlights) or 
-                    '[OPINION]' in str(claude_highlights) or
-                    '[UNCERTAIN]' in str(claude_highlights) or
-                    '[FALSE]' in str(claude_highlights)
-                )
-                
-                if has_claude_highlights:
-                    # Validate that Claude didn't truncate the transcript
-                    import re
-                    original_length = len(existing_transcript)
-                    highlighted_length = len(str(claude_highlights))
-                    # Remove tags to get approximate content length
-                    content_length = len(re.sub(r'\[(VERIFIED|OPINION|UNCERTAIN|FALSE)\]', '', str(claude_highlights)))
-                    
-                    # If highlighted transcript is less than 80% of original, Claude truncated it
-                    if content_length < original_length * 0.8:
-                        print(f"⚠️ Claude's highlighted transcript is truncated ({content_length} vs {original_length} chars)")
-                        print("🎨 Falling back to auto-highlighting for complete transcript")
-                        has_claude_highlights = False  # Force fallback
-                    else:
-                        print(f"✅ Using Claude's inline highlights (short transcript) - {highlighted_length} chars")
-                        # Debug: Check if field is actually in the response
-                        print(f"🔍 DEBUG: 'full_transcript_with_highlights' in analysis? {claude_highlights is not None}")
-                        print(f"🔍 DEBUG: First 200 chars of highlights: {str(claude_highlights)[:200] if claude_highlights else 'NONE'}")
-                
-                if has_claude_highlights:
-                    # Claude included highlights in JSON, already in analysis dict
-                    print("✅ Claude highlights already in analysis dict, no further processing needed")
-                    pass
-                else:
-                    print("🎨 Generating highlights via auto-matching (long transcript or Claude didn't add them)")
-                    highlighted_transcript = processor.auto_highlight_transcript(existing_transcript, analysis)
-                    # Add to analysis dict
-                    if highlighted_transcript and highlighted_transcript != existing_transcript:
-                        analysis['full_transcript_with_highlights'] = highlighted_transcript
-                        print("✅ Highlighted transcript added to analysis")
-                    else:
-                        print("⚠️ No highlights added to transcript")
-            
-            result = {
-                'title': video_metadata['title'],
-                'platform': video_metadata['platform'],
-                'duration_minutes': video_metadata['duration_minutes'],
-                'transcription': existing_transcript,
-                'analysis': analysis,
-                'language': 'en'
-            }
-        else:
-            print("📥 No cached transcript - fetching new transcript and analyzing...")
-            result = processor.process(video_url, analysis_type)
-        
-        # Track creator (if metadata was successfully extracted)
-        creator_id = None
-        creator_data = None
-        if result.get('creator_info') and result['creator_info'].get('name'):
-            try:
-                print("👤 Tracking creator...")
-                creator_info = result['creator_info']
-                
-                # Upsert creator using database function
-                creator_response = supabase.rpc('upsert_creator', {
-                    'p_name': creator_info['name'],
-                    'p_platform_id': creator_info['platform_id'] or 'unknown',
-                    'p_platform': result.get('platform', 'youtube'),
-                    'p_channel_url': creator_info.get('channel_url'),
-                    'p_subscriber_count': creator_info.get('subscriber_count'),
-                    'p_category': creator_info.get('category')
-                }).execute()
-                
-                if creator_response.data:
-                    creator_id = creator_response.data
-                    print(f"✅ Creator tracked: {creator_info['name']} (ID: {creator_id})")
-                    
-                    # Track video upload globally
-                    supabase.rpc('track_video_upload', {
-                        'p_video_url': video_url,
-                        'p_creator_id': creator_id
-                    }).execute()
-                    
-                    # If this is a fact-check, update creator stats
-                    if analysis_type == 'fact-check' and creator_id:
-                        # Extract fact_score from analysis
-                        fact_score = None
-                        if isinstance(result['analysis'], dict):
-                            fact_score = result['analysis'].get('fact_score')
-                        elif isinstance(result['analysis'], str):
-                            # Try to parse JSON from string
-                            try:
-                                analysis_obj = json.loads(result['analysis'])
-                                fact_score = analysis_obj.get('fact_score')
-                            except:
-                                pass
-                        
-                        if fact_score is not None:
-                            print(f"📊 Updating creator stats with score: {fact_score}")
-                            supabase.rpc('update_creator_stats', {
-                                'p_creator_id': creator_id,
-                                'p_new_fact_score': float(fact_score)
-                            }).execute()
-                            
-                            # Fetch updated creator data for response
-                            creator_query = supabase.table('creators').select('*').eq('id', creator_id).execute()
-                            if creator_query.data:
-                                creator_data = creator_query.data[0]
-                                print(f"✅ Creator stats updated: {creator_data['total_videos_analyzed']} videos, avg score: {creator_data['avg_fact_score']}")
-            except Exception as e:
-                print(f"⚠️ Creator tracking failed (non-critical): {str(e)}")
-                # Continue processing even if creator tracking fails
-        
-        # Calculate actual minutes charged with multiplier (round up)
-        # Summarize: 1x multiplier (standard)
-        # Fact-check: 2.5x multiplier (premium - reflects higher AI costs)
-        multiplier = 2.5 if analysis_type == 'fact-check' else 1.0
-        actual_minutes = math.ceil(result['duration_minutes'] * multiplier)
-        
-        # Prepare analysis for storage - ensure it's a JSON string
-        analysis_to_store = result['analysis']
-        if isinstance(analysis_to_store, dict):
-            # Convert dict to JSON string for storage in TEXT column
-            try:
-                analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=False)
-                print("✅ Converted analysis dict to JSON string for storage")
-                
-                # VALIDATE: Try parsing it back to ensure it's valid JSON
-                json.loads(analysis_to_store)
-                print("✅ Validated: Analysis is valid JSON")
-            except Exception as e:
-                print(f"❌ CRITICAL: Failed to serialize analysis to JSON: {e}")
-                import traceback
-                traceback.print_exc()
-                # Try with ascii encoding as last resort
-                try:
-                    analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=True)
-                    json.loads(analysis_to_store)  # Validate
-                    print("✅ Fallback: Converted with ensure_ascii=True")
-                except Exception as e2:
-                    print(f"❌ CRITICAL: All JSON serialization attempts failed: {e2}")
-                    # DON'T charge user for corrupted analysis - return error
-                    return jsonify({
-                        'success': False,
-                        'error': 'Analysis processing failed due to data corruption. Your minutes have NOT been charged. Please try again.'
-                    }), 500
-        elif not isinstance(analysis_to_store, str):
-            # This shouldn't happen, but handle it properly if it does
-            try:
-                analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=False)
-                json.loads(analysis_to_store)  # Validate
-                print("✅ Converted non-dict/non-string analysis to JSON")
-            except:
-                # If it's truly not JSON-serializable, don't charge the user
-                print(f"❌ Analysis is not JSON-serializable: {type(analysis_to_store)}")
-                return jsonify({
-                    'success': False,
-                    'error': 'Analysis processing failed. Your minutes have NOT been charged. Please try again.'
-                }), 500
-        
-        # Save to database
-        video_data = {
-            'user_id': user_id,
-            'video_url': video_url,
-            'title': result.get('title', 'Untitled'),
-            'platform': result.get('platform', 'unknown'),
-            'duration_minutes': result['duration_minutes'],
-            'transcription': result['transcription'],
-            'analysis': analysis_to_store,  # Now guaranteed to be a string
-            'analysis_type': analysis_type,
-            'processing_status': 'completed',
-            'minutes_charged': actual_minutes,
-            'completed_at': datetime.utcnow().isoformat(),
-            'creator_id': creator_id,
-            'creator_name': result.get('creator_info', {}).get('name') if result.get('creator_info') else None,
-            'creator_platform_id': result.get('creator_info', {}).get('platform_id') if result.get('creator_info') else None,
-            'category': result.get('creator_info', {}).get('category') if result.get('creator_info') else None
-        }
-        
-        video_response = supabase.table('videos').insert(video_data).execute()
-        video_id = video_response.data[0]['id'] if video_response.data else None
-        
-        # Update user minutes
-        new_used = used + actual_minutes
-        supabase.table('users').update({
-            'minutes_used_this_month': new_used
-        }).eq('id', user_id).execute()
-        
-        # Create transaction record
-        supabase.table('minute_transactions').insert({
-            'user_id': user_id,
-            'video_id': video_id,
-            'minutes_used': actual_minutes,
-            'transaction_type': 'video_processing'
-        }).execute()
-        
-        remaining = max(0, limit - new_used)
-        
-        # Parse analysis if it's a JSON string (from database TEXT column)
-        analysis = result['analysis']
-        if isinstance(analysis, str) and analysis_type == 'fact-check':
-            try:
-                analysis = json.loads(analysis)
-                print("✅ Parsed analysis string to object for response")
-                # Debug: Check if highlights are in parsed analysis
-                if 'full_transcript_with_highlights' in analysis:
-                    print(f"✅ Highlights found in analysis (length: {len(analysis['full_transcript_with_highlights'])})")
-                else:
-                    print("⚠️ NO 'full_transcript_with_highlights' in analysis dict!")
-                    print(f"🔍 Available keys: {list(analysis.keys())}")
-            except:
-                print("⚠️ Analysis is plain text (probably from summarize mode)")
+            video_id = create_pending_video(user_id, video_url, analysis_type)
+            job_id = enqueue_job('services.video_pipeline:run_video_job', {
+                'user_id': user_id,
+                'url': video_url,
+                'analysis_type': analysis_type,
+                'video_id': video_id,
+                'bypass_cache': bypass_cache,
+                'reservation_id': reservation.id,
+                'artifacts': artifacts.to_payload()
+            }, user_id=user_id)
+        except Exception:
+            reservation.release()
+            raise
         
-        response_data = {
+        return jsonify({
             'success': True,
+            'job_id': job_id,
             'video_id': video_id,
-            'video_url': video_url,
-            'title': result.get('title', 'Untitled'),
-            'platform': result.get('platform', 'unknown'),
-            'duration_minutes': result['duration_minutes'],
-            'minutes_charged': actual_minutes,
-            'minute_multiplier': multiplier,
-            'transcription': result['transcription'],
-            'transcript_segments': result.get('transcript_segments'),  # Timestamped segments (YouTube only)
-            'analysis': analysis,  # Now guaranteed to be object for fact-check, string for summarize
-            'analysis_type': analysis_type,  # CRITICAL: Frontend needs this to determine UI rendering
-            'minutes_remaining': remaining
-        }
-        
-        # Add creator data if available (only if 10+ videos analyzed)
-        if creator_data and creator_data.get('total_videos_analyzed', 0) >= 10:
-            response_data['creator'] = {
-                'name': creator_data['name'],
-                'total_videos': creator_data['total_videos_analyzed'],
-                'avg_score': float(creator_data['avg_fact_score']) if creator_data.get('avg_fact_score') else None,
-                'last_score': float(creator_data['last_fact_score']) if creator_data.get('last_fact_score') else None,
-                'category': creator_data.get('category')
-            }
-        
-        # Send Slack notification AFTER everything is complete (DB stored, minutes deducted, response ready)
-        try:
-            notify_video_upload(
-                email=user_email,
-                video_url=video_url,
-                video_title=result.get('title', 'Untitled'),
-                duration_minutes=result['duration_minutes'],
-                analysis_type=analysis_type,
-                user_id=user_id
-            )
-            print("✅ Slack notification sent (processing fully complete)")
-        except Exception as slack_error:
-            print(f"⚠️ Slack notification failed (non-critical): {str(slack_error)}")
-        
-        return jsonify(response_data), 200
+            'status': 'queued',
+            'status_url': f'/api/videos/jobs/{job_id}'
+        }), 202
         
     except Exception as e:
-        error_msg = str(e)
-        print(f"❌ VIDEO PROCESS ERROR: {error_msg}")
+        print(f"❌ Failed to queue video job: {str(e)}")
         import traceback
         traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Could not queue video for processing: {str(e)}'}), 500
+
+@bp.route('/process-stream', methods=['POST'])
+@verify_token
+def process_video_stream():
+    """Process video and stream progress + analysis as Server-Sent Events
+    
+    Events: stage, token (summary text), claim / field (fact-check, as each JSON
+    element completes), chunk (map-reduce progress), then result or error. The
+    result payload is the same as POST /process returns.
+    """
+    import queue
+    import threading
+    from flask import Response, stream_with_context
+    
+    data = request.get_json() or {}
+    video_url = data.get('url')
+    analysis_type = data.get('analysis_type', 'summarize')
+    bypass_cache = bool(data.get('bypass_cache'))
+    user_id = request.user_id
+    events = queue.Queue()
+    
+    def emit(event, payload):
+        events.put((event, payload))
+    
+    def run():
+        try:
+            response_data, status_code = process_video_for_user(
+                user_id, video_url, analysis_type,
+                report=lambda stage, progress: emit('stage', {'stage': stage, 'progress': progress}),
+                bypass_cache=bypass_cache,
+                on_event=emit
+            )
+            emit('result' if status_code < 400 else 'error', dict(response_data, status_code=status_code))
+        except Exception as e:
+            emit('error', {'success': False, 'error': str(e), 'status_code': 500})
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=run, name='process-stream', daemon=True).start()
+    
+    def generate():
+        while True:
+            try:
+                item = events.get(timeout=15)
+            except queue.Empty:
+                yield ': keepalive\n\n'  # Keeps proxies from closing an idle stream
+                continue
+            if item is None:
+                break
+            event, payload = item
+            yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@verify_token
+def get_job_status(job_id):
+    """Poll a queued /process job for stage, progress and (when done) the result"""
+    try:
+        from services.job_queue import get_job_store, serialize_job
+        job = get_job_store().get(job_id)
         
-        # Specific error messages for common issues
-        if 'transcriptsdisabled' in error_msg.lower() or 'subtitles are disabled' in error_msg.lower():
-            print("⚠️ Detected YouTube transcript disabled error")
-            return jsonify({
-                'success': False,
-                'error': 'This YouTube video has subtitles/transcripts disabled by the creator. We cannot process videos without transcripts.',
-                'suggestion': 'Please try a different video that has subtitles enabled. Most YouTube videos have transcripts available.',
-                'error_type': 'transcripts_disabled'
-            }), 400
-        elif 'instagram' in error_msg.lower() and ('login required' in error_msg.lower() or 'rate-limit' in error_msg.lower() or 'format has changed' in error_msg.lower()):
-            print("⚠️ Detected Instagram access error")
-            return jsonify({
-                'success': False,
-                'error': 'Unable to access this Instagram video. Instagram support is experimental and may not work for all videos.',
-                'suggestion': 'Instagram has strict access controls. For more reliable processing, we recommend using YouTube videos instead. If the Instagram video is important, try again later or ensure it\'s public.',
-                'error_type': 'instagram_access_error'
-            }), 400
-        elif 'bot' in error_msg.lower() or 'sign in' in error_msg.lower() or 'ipblocked' in error_msg.lower() or 'ip blocked' in error_msg.lower():
-            print("⚠️ Detected YouTube IP blocking/bot detection")
-            return jsonify({
-                'success': False,
-                'error': 'YouTube is temporarily blocking access. This video may require authentication to access.',
-                'suggestion': 'Please try: 1) A different video, 2) Waiting a few minutes and trying again, 3) A video with subtitles/transcripts enabled. Videos that have available transcripts are more likely to work.',
-                'error_type': 'youtube_blocked'
-            }), 400
-        elif 'proxy' in error_msg.lower() or 'tunnel connection' in error_msg.lower():
-            print("⚠️ Detected proxy/network error")
-            return jsonify({
-                'success': False,
-                'error': 'Network connection issue. Please try again in a moment.',
-                'error_type': 'network_error'
-            }), 400
-        elif 'download' in error_msg.lower() or 'couldn\'t' in error_msg.lower() or 'duration' in error_msg.lower():
-            print("⚠️ Detected download/duration error")
-            return jsonify({
-                'success': False,
-                'error': 'Couldn\'t access video. Make sure it\'s public, has captions/transcripts, and the URL is correct.',
-                'suggestion': 'Check if the video has transcripts by clicking "..." under the video and looking for "Show transcript".',
-                'debug_info': error_msg if os.getenv('FLASK_ENV') == 'development' else None
-            }), 400
+        if not job or job.get('user_id') != request.user_id:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
         
-        print(f"⚠️ Unexpected error type - returning 500")
-        return jsonify({'success': False, 'error': error_msg}), 500
+        return jsonify(dict(serialize_job(job), success=True)), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# History rows never need the transcript/analysis blobs - the detail view fetches those
+HISTORY_COLUMNS = 'id, video_url, title, platform, duration_minutes, minutes_charged, analysis_type, created_at'
+
+
+def _encode_cursor(video):
+    raw = f"{video['created_at']}|{video['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """-> (created_at, id); raises ValueError on anything we didn't issue"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    created_at, video_id = raw.split('|', 1)
+    datetime.fromisoformat(created_at)
+    uuid.UUID(video_id)
+    return created_at, video_id
+
+
+def _search_term(search):
+    """Strip characters that are PostgREST filter syntax or LIKE wildcards"""
+    return re.sub(r'[,()%*\\"]', ' ', search).strip()
+
 
 @bp.route('/history', methods=['GET'])
 @verify_token
 def get_history():
-    """Get user's video history"""
+    """Get user's video history
+
+    Two ways to page:
+    - cursor: pass back next_cursor from the previous response (keyset - constant
+      cost however deep you go; no total is computed)
+    - page or offset: numbered pages with a total count
+    """
     try:
         supabase = get_supabase_client()
         user_id = request.user_id
         
         # Get query parameters
-        page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 20)), 100)
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        cursor = request.args.get('cursor')
         platform = request.args.get('platform')
         analysis_type = request.args.get('analysis_type')
-        search = request.args.get('search')
+        search = _search_term(request.args.get('search') or '')
+        
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = _decode_cursor(cursor)
+            except Exception:
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
         
-        # Build query
-        query = supabase.table('videos').select('*', count='exact').eq('user_id', user_id)
+        # Build query (queued/failed background jobs are tracked via /jobs, not history)
+        count = None if cursor else 'exact'
+        query = supabase.table('videos').select(HISTORY_COLUMNS, count=count).eq('user_id', user_id).eq('processing_status', 'completed')
         
         if platform:
             query = query.eq('platform', platform)
@@ -498,31 +218,45 @@ def get_history():
             query = query.eq('analysis_type', analysis_type)
         
         if search:
-            query = query.or_(f'title.ilike.%{search}%,video_url.ilike.%{search}%')
-        
-        # Order by created_at desc
-        query = query.order('created_at', desc=True)
-        
-        # Pagination
-        offset = (page - 1) * limit
-        query = query.range(offset, offset + limit - 1)
-        
-        response = query.execute()
-        
-        total = response.count if hasattr(response, 'count') else len(response.data)
-        pages = math.ceil(total / limit) if total > 0 else 1
+            # Trigram-indexed (add_history_indexes.sql)
+            query = query.or_(f'title.ilike.*{search}*,video_url.ilike.*{search}*')
+        
+        # Newest first; id breaks ties so the cursor is a total order
+        query = query.order('created_at', desc=True).order('id', desc=True)
+        
+        if cursor:
+            query = query.or_(f'created_at.lt."{cursor_created_at}",and(created_at.eq."{cursor_created_at}",id.lt.{cursor_id})')
+            # One extra row tells us whether there is another page
+            response = query.limit(limit + 1).execute()
+            rows = response.data[:limit]
+            has_more = len(response.data) > limit
+            page = None
+            total = None
+            pages = None
+        else:
+            if 'offset' in request.args:
+                offset = max(0, int(request.args.get('offset', 0)))
+                page = offset // limit + 1
+            else:
+                page = max(1, int(request.args.get('page', 1)))
+                offset = (page - 1) * limit
+            response = query.range(offset, offset + limit - 1).execute()
+            rows = response.data
+            total = response.count if response.count is not None else len(rows)
+            pages = math.ceil(total / limit) if total > 0 else 1
+            has_more = offset + len(rows) < total
         
         # Format response
         videos = []
-        for video in response.data:
+        for video in rows:
             videos.append({
                 'id': video['id'],
                 'video_url': video['video_url'],
-                'title': video.get('title', 'Untitled'),
-                'platform': video.get('platform', 'unknown'),
-                'duration_minutes': float(video.get('duration_minutes', 0)),
-                'minutes_charged': int(video.get('minutes_charged', 0)),
-                'analysis_type': video.get('analysis_type', 'summarize'),
+                'title': video.get('title') or 'Untitled',
+                'platform': video.get('platform') or 'unknown',
+                'duration_minutes': float(video.get('duration_minutes') or 0),
+                'minutes_charged': int(video.get('minutes_charged') or 0),
+                'analysis_type': video.get('analysis_type') or 'summarize',
                 'created_at': video.get('created_at')
             })
         
@@ -531,9 +265,12 @@ def get_history():
             'total': total,
             'page': page,
             'pages': pages,
-            'limit': limit
+            'limit': limit,
+            'next_cursor': _encode_cursor(rows[-1]) if has_more and rows else None
         }), 200
         
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid pagination parameters'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -550,7 +287,7 @@ def get_video(video_id):
         if not response.data:
             return jsonify({'success': False, 'error': 'Video not found'}), 404
         
-        video = response.data[0]
+        video = hydrate_video(response.data[0])
         
         # Parse analysis if it's a JSON string (from database TEXT column)
         analysis = video.get('analysis', '')
@@ -561,6 +298,9 @@ def get_video(video_id):
             except:
                 print("⚠️ Analysis is plain text or invalid JSON")
         
+        # Tagged transcript for the frontend, rendered from the stored spans
+        with_highlighted_transcript(analysis, video.get('transcription'))
+        
         return jsonify({
             'id': video['id'],
             'video_url': video['video_url'],
@@ -568,7 +308,8 @@ def get_video(video_id):
             'platform': video.get('platform', 'unknown'),
             'duration_minutes': float(video.get('duration_minutes', 0)),
             'minutes_charged': int(video.get('minutes_charged', 0)),
-            'transcription': video.get('transcription', ''),
+            'transcription': video.get('transcription') or '',
+            'transcript_segments': video.get('transcript_segments'),  # Only for videos saved with blob storage
             'analysis': analysis,  # Now guaranteed to be object for fact-check, string for summarize
             'analysis_type': video.get('analysis_type', 'summarize'),
             'created_at': video.get('created_at'),
@@ -623,12 +364,12 @@ def recheck_claim(video_id):
         supabase = get_supabase_client()
         user_id = request.user_id
         
-        video_response = supabase.table('videos').select('transcription, user_id').eq('id', video_id).execute()
+        video_response = supabase.table('videos').select(payload_columns('transcription', 'user_id')).eq('id', video_id).execute()
         
         if not video_response.data:
             return jsonify({'success': False, 'error': 'Video not found'}), 404
         
-        video = video_response.data[0]
+        video = hydrate_video(video_response.data[0])
         
         # Verify user owns this video
         if video['user_id'] != user_id:
@@ -637,8 +378,8 @@ def recheck_claim(video_id):
         transcription = video.get('transcription', '')
         
         # Use VideoProcessor to deeply fact-check this specific claim
-        from services.video_processor import VideoProcessor
-        processor = VideoProcessor()
+        from services.processor_registry import get_video_processor
+        processor = get_video_processor()
         result = processor.deep_recheck_claim(
             claim=claim_text,
             timestamp=timestamp,
@@ -687,7 +428,7 @@ def export_video(video_id):
         if not response.data:
             return jsonify({'success': False, 'error': 'Video not found'}), 404
         
-        video = response.data[0]
+        video = hydrate_video(response.data[0])
         
         # Check tier for DOCX
         user_response = supabase.table('users').select('subscription_tier').eq('id', user_id).execute()
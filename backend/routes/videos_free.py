@@ -4,9 +4,9 @@ from services.slack_notifier import notify_video_upload
 bp = Blueprint('videos_free', __name__)
 
 def get_video_processor():
-    """Lazy import VideoProcessor to avoid startup crashes"""
-    from services.video_processor import VideoProcessor
-    return VideoProcessor()
+    """Shared per-worker VideoProcessor (lazy import to avoid startup crashes)"""
+    from services.processor_registry import get_video_processor as get_shared_processor
+    return get_shared_processor()
 
 
 @bp.route('/process-free', methods=['POST'])
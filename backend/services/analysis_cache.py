@@ -0,0 +1,109 @@
+"""
+Cache of parsed AI analyses.
+
+A viral video gets fact-checked by many users, and each run used to send the
+identical prompt to Claude/OpenAI again (tokens plus 30-90s of latency). Results
+are keyed by a hash of the normalized transcript, analysis type, prompt version
+and model, so any change to the prompt or model misses cleanly.
+
+In-process (per gunicorn worker), with a TTL and LRU eviction by entry count.
+Values are deep-copied on the way in and out because callers add highlights to
+the analysis dict they get back.
+
+Environment variables:
+    ANALYSIS_CACHE_SIZE  - max entries per process (default: 256)
+    ANALYSIS_CACHE_TTL   - seconds an entry stays valid (default: 86400)
+    ADMIN_EMAILS         - comma-separated emails allowed to bypass the cache
+"""
+import os
+import copy
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_transcript(transcription):
+    """Whitespace/Unicode-normalized transcript used for the cache key"""
+    return ' '.join(unicodedata.normalize('NFC', transcription or '').split())
+
+
+def analysis_cache_key(transcription, analysis_type, prompt_version, model):
+    digest = hashlib.sha256(normalize_transcript(transcription).encode('utf-8')).hexdigest()
+    return f"{digest}:{analysis_type}:{prompt_version}:{model}"
+
+
+def can_bypass_cache(email):
+    """Only admins (ADMIN_EMAILS) may force a fresh analysis"""
+    admins = {e.strip().lower() for e in os.getenv('ADMIN_EMAILS', '').split(',') if e.strip()}
+    return bool(email) and email.lower() in admins
+
+
+class AnalysisCache:
+    """TTL + size-bounded LRU of analysis results"""
+
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        self.max_entries = max_entries or int(os.getenv('ANALYSIS_CACHE_SIZE', '256'))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('ANALYSIS_CACHE_TTL', '86400'))
+        self._entries = OrderedDict()  # key -> (stored_at, analysis)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'bypasses': 0, 'stores': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._stats['misses'] += 1
+                return None
+            stored_at, analysis = item
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return copy.deepcopy(analysis)
+
+    def put(self, key, analysis):
+        value = copy.deepcopy(analysis)
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            self._stats['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats['bypasses'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Process-wide analysis cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache()
+    return _cache
@@ -0,0 +1,166 @@
+"""
+Streaming helpers for AI analysis (Server-Sent Events).
+
+analyze_with_claude/analyze_with_openai accept an on_event(event, data) callback.
+When it is set, they use the Anthropic/OpenAI streaming APIs and forward:
+
+    token  - {'text': delta}                        (summaries)
+    claim  - {'list': 'false_claims', 'index': 0, 'claim': {...}}
+                                                    (fact-checks, as each array element completes)
+    field  - {'name': 'fact_score', 'value': 7.5}   (fact-checks, top-level fields as they complete)
+
+The full text is still accumulated and goes through the exact same parsing
+code as the non-streaming path, so the final result is identical either way.
+"""
+import json
+
+CLAIM_LISTS = ('verified_claims', 'opinion_claims', 'opinion_based_claims', 'uncertain_claims', 'false_claims')
+
+
+class ClaimStreamParser:
+    """Incremental scanner that yields claim objects as soon as their JSON closes
+
+    Tolerates leading text/markdown fences (starts at the first '{'). Elements
+    that don't parse on their own are skipped - the final parse is authoritative.
+    """
+
+    def __init__(self, claim_lists=CLAIM_LISTS):
+        self.claim_lists = set(claim_lists)
+        self.buffer = ''
+        self.pos = 0
+        self.started = False
+        self.finished = False
+        self.stack = []  # {'type': 'obj'|'arr', 'key': parent key at depth 1, 'start': index}
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.last_string = None  # (start, end) of the last completed string
+        self.pending_key = None  # top-level key whose value is being read
+        self.value_start = None
+        self.claim_counts = {}
+
+    def feed(self, text):
+        """Add streamed text -> list of (event, data) for everything completed so far"""
+        self.buffer += text
+        events = []
+        buf = self.buffer
+        i = self.pos
+        while i < len(buf) and not self.finished:
+            c = buf[i]
+            if not self.started:
+                if c == '{':
+                    self.started = True
+                    self.stack.append({'type': 'obj', 'key': None, 'start': i})
+                i += 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    self.last_string = (self.string_start, i)
+                i += 1
+                continue
+
+            depth = len(self.stack)
+            if depth == 1 and self.pending_key is not None and self.value_start is None \
+                    and not c.isspace() and c not in ',}':
+                self.value_start = i
+
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+            elif c in '{[':
+                self.stack.append({
+                    'type': 'obj' if c == '{' else 'arr',
+                    'key': self.pending_key if depth == 1 else None,
+                    'start': i,
+                })
+            elif c in '}]':
+                node = self.stack.pop()
+                if node['type'] == 'obj' and len(self.stack) == 2 and self.stack[1]['type'] == 'arr' \
+                        and self.stack[1]['key'] in self.claim_lists:
+                    self._emit_claim(events, self.stack[1]['key'], buf[node['start']:i + 1])
+                if not self.stack:
+                    self._finish_value(events, i)
+                    self.finished = True
+            elif c == ':' and depth == 1 and self.last_string:
+                try:
+                    self.pending_key = json.loads(buf[self.last_string[0]:self.last_string[1] + 1])
+                except ValueError:
+                    self.pending_key = None
+                self.value_start = None
+            elif c == ',' and depth == 1:
+                self._finish_value(events, i)
+            i += 1
+        self.pos = i
+        return events
+
+    def _emit_claim(self, events, list_name, text):
+        try:
+            claim = json.loads(text)
+        except ValueError:
+            return
+        if list_name == 'opinion_based_claims':
+            list_name = 'opinion_claims'  # Same normalization as the final parse
+        index = self.claim_counts.get(list_name, 0)
+        self.claim_counts[list_name] = index + 1
+        events.append(('claim', {'list': list_name, 'index': index, 'claim': claim}))
+
+    def _finish_value(self, events, end):
+        key, start = self.pending_key, self.value_start
+        self.pending_key = None
+        self.value_start = None
+        if key is None or start is None or key in self.claim_lists or key == 'full_transcript_with_highlights':
+            return
+        try:
+            value = json.loads(self.buffer[start:end].strip())
+        except ValueError:
+            return
+        events.append(('field', {'name': key, 'value': value}))
+
+
+class AnalysisStreamer:
+    """Turns text deltas into SSE-ready events for one analysis call"""
+
+    def __init__(self, on_event, analysis_type):
+        self.on_event = on_event
+        self.analysis_type = analysis_type
+        self.parser = ClaimStreamParser() if analysis_type == 'fact-check' else None
+        self.chars = 0
+
+    def push(self, delta):
+        if not delta:
+            return
+        self.chars += len(delta)
+        if self.parser is None:
+            self.on_event('token', {'text': delta})
+            return
+        for event, data in self.parser.feed(delta):
+            self.on_event(event, data)
+
+
+def stream_claude_message(client, on_event, analysis_type, **kwargs):
+    """messages.create equivalent that streams deltas; returns the final Message"""
+    streamer = AnalysisStreamer(on_event, analysis_type)
+    with client.messages.stream(**kwargs) as stream:
+        for delta in stream.text_stream:
+            streamer.push(delta)
+        return stream.get_final_message()
+
+
+def stream_openai_text(client, on_event, analysis_type, **kwargs):
+    """chat.completions.create equivalent that streams deltas; returns the full content string"""
+    streamer = AnalysisStreamer(on_event, analysis_type)
+    parts = []
+    for chunk in client.chat.completions.create(stream=True, **kwargs):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            streamer.push(delta)
+    return ''.join(parts)
@@ -0,0 +1,400 @@
+"""
+Content-addressed, compressed storage for large video payloads.
+
+videos.transcription and videos.analysis were plain TEXT: every completed video
+carried its full transcript inline, fact-checks carried it a second time inside
+full_transcript_with_highlights, and a viral video fact-checked by a hundred
+users was stored a hundred times. Timestamped segments weren't kept at all.
+
+Now (database/migrations/add_content_blobs.sql) large payloads live in the
+`content_blobs` table, keyed by the SHA-256 of their uncompressed bytes:
+- identical transcripts/analyses are stored once, whoever submitted them
+- bodies are zstd-compressed (zlib when zstandard isn't installed) and
+  base64-encoded for PostgREST
+- segments use a packed binary layout (int32 millisecond arrays plus one UTF-8
+  text run) instead of a JSON list of dicts
+- highlights are kept as span offsets into the transcript (highlight_spans),
+  never as a tagged copy of it
+
+Rows reference blobs by hash (transcript_hash, segments_hash, analysis_hash) and
+leave the TEXT columns empty. hydrate_video() turns such a row back into the
+old shape, so readers see the same transcription/analysis strings as before.
+Rows written before the migration (or with USE_BLOB_STORAGE off) are returned
+unchanged. USE_BLOB_STORAGE only controls writes.
+
+Decoded blobs are immutable, so each process keeps an LRU of them by hash.
+
+Environment variables:
+    BLOB_COMPRESSION_LEVEL - zstd level (default: 10)
+    BLOB_CACHE_SIZE        - decoded blobs kept per process (default: 64)
+"""
+import os
+import sys
+import json
+import zlib
+import base64
+import struct
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:  # Optional - zlib is always available
+    zstandard = None
+
+KIND_TRANSCRIPT = 'transcript'
+KIND_SEGMENTS = 'segments'
+KIND_ANALYSIS = 'analysis'
+
+# videos / transcript_cache column holding each kind's hash
+HASH_COLUMNS = {
+    KIND_TRANSCRIPT: 'transcript_hash',
+    KIND_SEGMENTS: 'segments_hash',
+    KIND_ANALYSIS: 'analysis_hash',
+}
+
+# Inline column each hash column replaces (for payload_columns)
+_INLINE_COLUMNS = {
+    'transcription': ('transcript_hash', 'segments_hash'),
+    'analysis': ('analysis_hash',),
+}
+
+_SEGMENTS_MAGIC = b'SEG1'
+
+
+# -- segments -----------------------------------------------------------------
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_segments(segments):
+    """[{'start', 'duration', 'text'}] -> packed bytes (millisecond precision)
+
+    Layout: b'SEG1', uint32 count, int32[count] start_ms, int32[count] duration_ms,
+    uint32[count] text byte lengths, then all texts as one UTF-8 run.
+    """
+    starts = array('i')
+    durations = array('i')
+    lengths = array('I')
+    texts = []
+    for segment in segments or []:
+        text = (segment.get('text') or '').encode('utf-8')
+        starts.append(round(float(segment.get('start') or 0) * 1000))
+        durations.append(round(float(segment.get('duration') or 0) * 1000))
+        lengths.append(len(text))
+        texts.append(text)
+    header = _SEGMENTS_MAGIC + struct.pack('<I', len(texts))
+    return b''.join([
+        header,
+        _little_endian(starts).tobytes(),
+        _little_endian(durations).tobytes(),
+        _little_endian(lengths).tobytes(),
+    ] + texts)
+
+
+def decode_segments(data):
+    """Inverse of encode_segments"""
+    if not data:
+        return []
+    if data[:4] != _SEGMENTS_MAGIC:
+        raise ValueError('Not a packed segments blob')
+    (count,) = struct.unpack_from('<I', data, 4)
+    offset = 8
+    arrays = []
+    for typecode in ('i', 'i', 'I'):
+        values = array(typecode)
+        values.frombytes(data[offset:offset + count * values.itemsize])
+        arrays.append(_little_endian(values))
+        offset += count * values.itemsize
+    starts, durations, lengths = arrays
+
+    segments = []
+    for i in range(count):
+        text = data[offset:offset + lengths[i]].decode('utf-8')
+        offset += lengths[i]
+        segments.append({'start': starts[i] / 1000, 'duration': durations[i] / 1000, 'text': text})
+    return segments
+
+
+# -- analyses -----------------------------------------------------------------
+
+def pack_analysis(analysis, transcript):
+    """Stored analysis string -> same string without a tagged transcript copy
+
+    Analyses keep highlights as highlight_spans (services/highlighting.py). An
+    older tagged copy is converted to spans when its tags strip back to exactly
+    this transcript; anything else (an LLM-edited copy) is kept as it is.
+    """
+    from services.highlighting import spans_from_tagged, span_list
+
+    try:
+        parsed = json.loads(analysis)
+    except (TypeError, ValueError):
+        return analysis
+    if not isinstance(parsed, dict):
+        return analysis
+    tagged = parsed.get('full_transcript_with_highlights')
+    if not isinstance(tagged, str) or not transcript:
+        return analysis
+    if 'highlight_spans' not in parsed:
+        plain, spans = spans_from_tagged(tagged)
+        if plain != transcript:
+            return analysis
+        parsed['highlight_spans'] = span_list(spans)
+    del parsed['full_transcript_with_highlights']
+    return json.dumps(parsed, ensure_ascii=False)
+
+
+# -- codec --------------------------------------------------------------------
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """content_blobs table with an LRU of decoded bodies in front"""
+
+    def __init__(self, level=None, cache_size=None):
+        self.level = level or int(os.getenv('BLOB_COMPRESSION_LEVEL', '10'))
+        self.cache_size = cache_size or int(os.getenv('BLOB_CACHE_SIZE', '64'))
+        self.codec = 'zstd' if zstandard else 'zlib'
+        self._cache = OrderedDict()  # hash -> bytes
+        self._lock = threading.Lock()
+        self._local = threading.local()  # zstd (de)compressors aren't thread-safe
+        self._stats = {
+            'puts': 0, 'gets': 0, 'cache_hits': 0, 'fetched': 0, 'errors': 0,
+            'raw_bytes': 0, 'stored_bytes': 0,
+        }
+
+    # -- codec ----------------------------------------------------------------
+
+    def compress(self, data):
+        if self.codec == 'zstd':
+            compressor = getattr(self._local, 'compressor', None)
+            if compressor is None:
+                compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            return compressor.compress(data)
+        return zlib.compress(data, 9)
+
+    def decompress(self, codec, data):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError('zstd blob found but zstandard is not installed')
+            decompressor = getattr(self._local, 'decompressor', None)
+            if decompressor is None:
+                decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data)
+        if codec == 'zlib':
+            return zlib.decompress(data)
+        raise ValueError(f'Unknown blob codec: {codec}')
+
+    # -- cache ----------------------------------------------------------------
+
+    def _cache_get(self, digest):
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+            return data
+
+    def _cache_put(self, digest, data):
+        with self._lock:
+            self._cache[digest] = data
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # -- public API -----------------------------------------------------------
+
+    def put_many(self, items, supabase=None):
+        """[(kind, bytes)] -> [hash]; one round trip, existing blobs are left alone"""
+        from services.supabase_client import get_supabase_client
+
+        rows = {}
+        digests = []
+        for kind, data in items:
+            digest = content_hash(data)
+            digests.append(digest)
+            # Cached bodies were written or read by this process - already stored
+            if digest in rows or self._cache_get(digest) is not None:
+                continue
+            body = self.compress(data)
+            rows[digest] = {
+                'hash': digest,
+                'kind': kind,
+                'codec': self.codec,
+                'size_bytes': len(data),
+                'stored_bytes': len(body),
+                'data': base64.b64encode(body).decode('ascii'),
+            }
+        if rows:
+            (supabase or get_supabase_client()).table('content_blobs') \
+                .upsert(list(rows.values()), on_conflict='hash', ignore_duplicates=True) \
+                .execute()
+        for (kind, data), digest in zip(items, digests):
+            self._cache_put(digest, data)
+        with self._lock:
+            self._stats['puts'] += len(rows)
+            self._stats['raw_bytes'] += sum(r['size_bytes'] for r in rows.values())
+            self._stats['stored_bytes'] += sum(r['stored_bytes'] for r in rows.values())
+        return digests
+
+    def get_many(self, digests, supabase=None):
+        """[hash] -> {hash: bytes}; blobs not found are left out"""
+        from services.supabase_client import get_supabase_client
+
+        found = {}
+        missing = []
+        for digest in dict.fromkeys(d for d in digests if d):
+            data = self._cache_get(digest)
+            if data is not None:
+                found[digest] = data
+            else:
+                missing.append(digest)
+        with self._lock:
+            self._stats['gets'] += len(found) + len(missing)
+            self._stats['cache_hits'] += len(found)
+        if not missing:
+            return found
+
+        rows = (supabase or get_supabase_client()).table('content_blobs') \
+            .select('hash, codec, data').in_('hash', missing).execute().data or []
+        for row in rows:
+            data = self.decompress(row['codec'], base64.b64decode(row['data']))
+            if content_hash(data) != row['hash']:
+                self._count('errors')
+                print(f"⚠️ Blob {row['hash'][:12]} failed its hash check - ignoring")
+                continue
+            self._cache_put(row['hash'], data)
+            found[row['hash']] = data
+        with self._lock:
+            self._stats['fetched'] += len(rows)
+        return found
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_blobs'] = len(self._cache)
+        stats['codec'] = self.codec
+        stats['compression_ratio'] = round(stats['raw_bytes'] / stats['stored_bytes'], 2) if stats['stored_bytes'] else None
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Process-wide blob store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BlobStore()
+    return _store
+
+
+def set_blob_store(store):
+    """Replace the process-wide store (e.g. one with a different compression level)"""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+# -- rows ---------------------------------------------------------------------
+
+def blob_storage_enabled():
+    try:
+        from config import FeatureFlags
+        return FeatureFlags.USE_BLOB_STORAGE
+    except ImportError:
+        return os.getenv('USE_BLOB_STORAGE', 'false').lower() == 'true'
+
+
+_hash_columns = None  # None until probed: do videos/transcript_cache have hash columns?
+
+
+def hash_columns_available(supabase=None):
+    """True once add_content_blobs.sql has been applied (probed once per process)
+
+    Reads don't depend on USE_BLOB_STORAGE, so rows saved as blobs stay readable
+    after the flag is turned off.
+    """
+    global _hash_columns
+    if _hash_columns is None:
+        from services.supabase_client import get_supabase_client
+        try:
+            (supabase or get_supabase_client()).table('videos').select('transcript_hash').limit(1).execute()
+            _hash_columns = True
+        except Exception as e:
+            # 42703: undefined column - anything else (network) is retried next time
+            if getattr(e, 'code', None) != '42703' and 'transcript_hash' not in str(e):
+                return False
+            _hash_columns = False
+    return _hash_columns
+
+
+def payload_columns(*columns):
+    """Select list for the given columns plus the hash columns that may replace them"""
+    selected = list(columns)
+    if hash_columns_available():
+        for column in columns:
+            for hash_column in _INLINE_COLUMNS.get(column, ()):
+                if hash_column not in selected:
+                    selected.append(hash_column)
+    return ', '.join(selected)
+
+
+def store_payload(transcript=None, segments=None, analysis=None, supabase=None):
+    """Write blobs for a row -> {hash column: hash} (raises on failure)
+
+    analysis is the stored string (JSON for fact-checks, text for summaries).
+    """
+    items = []
+    if transcript:
+        items.append((KIND_TRANSCRIPT, transcript.encode('utf-8')))
+    if segments:
+        items.append((KIND_SEGMENTS, encode_segments(segments)))
+    if analysis:
+        items.append((KIND_ANALYSIS, pack_analysis(analysis, transcript).encode('utf-8')))
+    digests = get_blob_store().put_many(items, supabase=supabase)
+    return {HASH_COLUMNS[kind]: digest for (kind, _), digest in zip(items, digests)}
+
+
+def hydrate_rows(rows, supabase=None):
+    """Fill transcription / transcript_segments / analysis from blobs, in place
+
+    One blob fetch for all rows. Rows without hashes are left as they are.
+    """
+    wanted = [row.get(column) for row in rows for column in HASH_COLUMNS.values()]
+    if not any(wanted):
+        return rows
+    blobs = get_blob_store().get_many(wanted, supabase=supabase)
+
+    for row in rows:
+        transcript = blobs.get(row.get('transcript_hash'))
+        if transcript is not None and not row.get('transcription'):
+            row['transcription'] = transcript.decode('utf-8')
+        segments = blobs.get(row.get('segments_hash'))
+        if segments is not None and not row.get('transcript_segments'):
+            row['transcript_segments'] = decode_segments(segments)
+        analysis = blobs.get(row.get('analysis_hash'))
+        if analysis is not None and not row.get('analysis'):
+            row['analysis'] = analysis.decode('utf-8')
+    return rows
+
+
+def hydrate_video(row, supabase=None):
+    """hydrate_rows for one row"""
+    if row:
+        hydrate_rows([row], supabase=supabase)
+    return row
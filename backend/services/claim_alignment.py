@@ -0,0 +1,93 @@
+"""
+Claim -> transcript segment alignment.
+
+Fact-check claims come back from the LLM with guessed timestamps ("Throughout",
+"12:30"), while the transcript we analyzed was flattened from timestamped
+segments (YouTube snippets or Whisper segments, both {'start', 'duration', 'text'}).
+
+The claim matcher (services/highlighting.py) already finds each claim's
+character span in the flattened text. Here the span is mapped back to segments:
+
+- SegmentIndex records the character offset where each segment starts in the
+  transcript (one forward pass), so offset -> segment is a binary search
+- each matched claim gets the real start/end seconds of the segments it covers,
+  and its `timestamp` is rewritten as MM:SS (H:MM:SS past an hour)
+
+Claims that can't be located keep whatever timestamp the LLM gave them.
+"""
+from bisect import bisect_right
+
+from services.highlighting import TranscriptIndex, match_claims
+
+# How far past the expected position to look for a segment's text before
+# assuming it was normalized differently and sits right at the cursor
+SEARCH_SLACK = 200
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class SegmentIndex:
+    """Prefix-offset index: character offset in the transcript -> segment"""
+
+    def __init__(self, transcript, segments):
+        self.segments = segments
+        self.starts = []
+        cursor = 0
+        for segment in segments:
+            text = (segment.get('text') or '').strip()
+            position = transcript.find(text, cursor, cursor + len(text) + SEARCH_SLACK) if text else -1
+            if position < 0:
+                position = min(cursor, len(transcript))
+            self.starts.append(position)
+            cursor = position + len(text)
+
+    def segment_at(self, offset):
+        return max(0, bisect_right(self.starts, offset) - 1)
+
+    def time_range(self, start, end):
+        """Character span -> (first segment, last segment, start seconds, end seconds)"""
+        first = self.segment_at(start)
+        last = max(first, self.segment_at(max(start, end - 1)))
+        start_seconds = float(self.segments[first].get('start') or 0)
+        last_segment = self.segments[last]
+        end_seconds = float(last_segment.get('start') or 0) + float(last_segment.get('duration') or 0)
+        return first, last, start_seconds, max(start_seconds, end_seconds)
+
+
+def align_claims(transcript, segments, analysis, index=None, matches=None):
+    """Write segment-accurate timestamps into the analysis claims in place -> number aligned
+
+    Each located claim gets:
+        timestamp      - 'MM:SS' of the first covered segment
+        start_seconds  - start of the first covered segment
+        end_seconds    - end of the last covered segment
+        segment_range  - [first, last] indexes into transcript_segments
+    """
+    if not transcript or not segments or not isinstance(analysis, dict):
+        return 0
+    if matches is None:
+        matches = match_claims(transcript, analysis, index or TranscriptIndex(transcript))
+    if not matches:
+        return 0
+
+    segment_index = SegmentIndex(transcript, segments)
+    aligned = 0
+    for match in matches:
+        claims = analysis.get(match['list']) or []
+        if match['index'] >= len(claims) or not isinstance(claims[match['index']], dict):
+            continue
+        first, last, start_seconds, end_seconds = segment_index.time_range(match['start'], match['end'])
+        claim = claims[match['index']]
+        claim['timestamp'] = format_timestamp(start_seconds)
+        claim['start_seconds'] = round(start_seconds, 2)
+        claim['end_seconds'] = round(end_seconds, 2)
+        claim['segment_range'] = [first, last]
+        aligned += 1
+    return aligned
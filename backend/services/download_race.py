@@ -0,0 +1,119 @@
+"""
+Hedged downloads: race yt-dlp strategies instead of trying them one at a time.
+
+download_video walks player-client strategies with the proxy, then without it,
+then Cobalt. Each failure can cost socket_timeout x retries, so while YouTube is
+throttling one client a request spends minutes failing before the one that
+works gets its turn.
+
+With USE_HEDGED_DOWNLOADS, race() starts the best-ranked strategy and, if it has
+shown no download progress after HEDGE_DELAY_SECONDS, launches the next one
+alongside it (up to HEDGE_MAX_ATTEMPTS at once). A failure launches the next
+strategy immediately. The first attempt to finish wins; the others are cancelled
+through their cancel event, which the yt-dlp progress hook turns into
+DownloadCancelled on the next chunk.
+
+Candidates arrive ranked by the strategy scoreboard
+(services/strategy_scoreboard.py), so the client YouTube is currently accepting
+goes first. With max_parallel=1 race() is a plain sequential walk of the
+ranking (USE_ADAPTIVE_STRATEGIES without hedging).
+
+Environment variables:
+    HEDGE_DELAY_SECONDS    - head start before the next strategy launches (default: 8)
+    HEDGE_MAX_ATTEMPTS     - strategies running at once (default: 3)
+"""
+import os
+import time
+import queue
+import threading
+
+
+def strategy_label(strategy):
+    """Scoreboard name of a player client strategy, e.g. 'ios+web'"""
+    return '+'.join(strategy['player_client'])
+
+
+def download_candidates(player_strategies, proxy_url):
+    """(player client strategy, proxy) combinations download_video may try, in the default order
+
+    Every client through the proxy, then the first two direct; without a proxy,
+    every client direct. Each carries 'strategy_label' (scoreboard key) and 'name'.
+    """
+    candidates = [{'strategy': strategy, 'proxy': proxy_url} for strategy in player_strategies]
+    if proxy_url:
+        candidates += [{'strategy': strategy, 'proxy': None} for strategy in player_strategies[:2]]
+    for candidate in candidates:
+        candidate['strategy_label'] = strategy_label(candidate['strategy'])
+        candidate['name'] = f"{candidate['strategy_label']}/{'proxy' if candidate['proxy'] else 'direct'}"
+    return candidates
+
+
+class _Attempt:
+    def __init__(self, candidate):
+        self.candidate = candidate
+        self.cancel = threading.Event()
+        self.progressed = threading.Event()
+        self.started_at = time.monotonic()
+
+
+def race(candidates, run_attempt, skip=None, delay=None, max_parallel=None):
+    """Run candidates hedged -> (winning candidate, its run_attempt result)
+
+    run_attempt(candidate, cancel, progressed) does one download; it should stop
+    when cancel is set and set progressed once bytes arrive. skip(candidate) is
+    checked just before a candidate launches (e.g. proxy strategies after a 403).
+    Raises the last failure if every candidate fails.
+    """
+    delay = delay if delay is not None else float(os.getenv('HEDGE_DELAY_SECONDS', '8'))
+    max_parallel = max_parallel or int(os.getenv('HEDGE_MAX_ATTEMPTS', '3'))
+    pending = list(candidates)
+    running = []
+    results = queue.Queue()
+    last_error = None
+
+    def launch():
+        while pending:
+            candidate = pending.pop(0)
+            if skip and skip(candidate):
+                continue
+            attempt = _Attempt(candidate)
+
+            def work(attempt=attempt):
+                try:
+                    results.put((attempt, run_attempt(attempt.candidate, attempt.cancel, attempt.progressed), None))
+                except Exception as e:
+                    results.put((attempt, None, e))
+
+            print(f"🏁 Starting download strategy {candidate['name']} ({len(running) + 1} running)")
+            threading.Thread(target=work, name=f"download-{candidate['name']}", daemon=True).start()
+            running.append(attempt)
+            return True
+        return False
+
+    launch()
+    while running:
+        # Hedge only while nothing is downloading and there is room for another attempt
+        can_hedge = pending and len(running) < max_parallel and not any(a.progressed.is_set() for a in running)
+        timeout = max(0.0, running[-1].started_at + delay - time.monotonic()) if can_hedge else None
+        try:
+            attempt, result, error = results.get(timeout=timeout)
+        except queue.Empty:
+            if not any(a.progressed.is_set() for a in running):
+                print(f"⏳ No progress after {delay:.0f}s - hedging with the next strategy")
+                launch()
+            continue
+
+        running.remove(attempt)
+        if error is None:
+            for other in running:
+                other.cancel.set()
+            print(f"🏆 Strategy {attempt.candidate['name']} won in {time.monotonic() - attempt.started_at:.1f}s"
+                  + (f", cancelled {len(running)}" if running else ""))
+            return attempt.candidate, result
+
+        last_error = error
+        print(f"   ❌ Strategy {attempt.candidate['name']} failed: {str(error)[:100]}")
+        if len(running) < max_parallel:
+            launch()
+
+    raise last_error or Exception("No download strategy left to try")
@@ -0,0 +1,313 @@
+"""
+Indexed, single-pass claim highlighting.
+
+The old auto_highlight_transcript ran up to five strategies per claim (difflib
+over every sentence, a SequenceMatcher over every 75-word window, a fresh regex
+over the whole transcript) and rebuilt the highlighted string on every
+insertion - quadratic for long transcripts with dozens of claims.
+
+Here the transcript is tokenized once and indexed two ways:
+- word 3-gram (shingle) postings -> token positions, for verbatim/near-verbatim claims
+- content word -> sentence ids, for paraphrased claims
+
+Each claim votes for an alignment diagonal through the shingle postings; the
+best-supported run of tokens becomes its span. Claims with too little shingle
+support fall back to the sentence with the highest content-word overlap.
+Spans are accepted longest-claim-first without overlaps, and tags are applied
+in one final join, in the same "[VERIFIED] text[/VERIFIED]" format as before.
+
+Fact-check analyses keep the spans (highlight_spans: [start, end, verdict,
+claim_index] offsets into the transcript) instead of a tagged copy of the
+transcript; with_highlighted_transcript renders the copy for responses.
+"""
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+CLAIM_TAGS = [
+    ('verified_claims', 'VERIFIED'),
+    ('opinion_claims', 'OPINION'),
+    ('opinion_based_claims', 'OPINION'),
+    ('uncertain_claims', 'UNCERTAIN'),
+    ('false_claims', 'FALSE'),
+]
+
+# Common words to ignore in word overlap scoring
+STOP_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
+    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
+    'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'under', 'again', 'further', 'then', 'once', 'here',
+    'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if', 'or',
+    'because', 'until', 'while', 'although', 'though', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what',
+    'which', 'who', 'whom', 'its', 'his', 'her', 'their', 'my', 'your',
+    'our', 'me', 'him', 'them', 'us', 'also', 'like', 'really', 'actually',
+    'basically', 'literally', 'think', 'know', 'say', 'said', 'says', 'going'
+}
+
+SHINGLE_SIZE = 3
+# Shingles this common ("one of the") say nothing about position - skip them
+MAX_POSTINGS = 64
+# Alignment may drift this many tokens (inserted/dropped words) and stay one match
+DIAGONAL_SLACK = 6
+MIN_SHINGLE_SCORE = 0.35
+MIN_OVERLAP_SCORE = 0.4
+
+_TOKEN = re.compile(r"[0-9A-Za-z]+(?:'[A-Za-z]+)?")
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def tokenize(text):
+    """[(lowercased token, start, end)] - offsets index into the original text"""
+    return [(m.group().lower(), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+
+
+def is_content_word(word):
+    return len(word) >= 3 and word.isalpha() and word not in STOP_WORDS
+
+
+def collect_claims(analysis):
+    """Claims to highlight -> [(claim_text, verdict, list_name, index)], longest first"""
+    claims = []
+    for list_name, verdict in CLAIM_TAGS:
+        for index, claim_obj in enumerate(analysis.get(list_name) or []):
+            if not isinstance(claim_obj, dict):
+                continue
+            claim_text = (claim_obj.get('claim') or '').strip()
+            if len(claim_text) > 10:
+                claims.append((claim_text, verdict, list_name, index))
+    # Longest first so long claims win overlaps against fragments of themselves
+    claims.sort(key=lambda c: len(c[0]), reverse=True)
+    return claims
+
+
+class TranscriptIndex:
+    """Token, shingle and sentence index over one transcript, built once"""
+
+    def __init__(self, transcript):
+        self.text = transcript
+        self.tokens = tokenize(transcript)
+        words = [t[0] for t in self.tokens]
+
+        self.shingles = defaultdict(list)
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            self.shingles[tuple(words[i:i + SHINGLE_SIZE])].append(i)
+
+        # Sentences as (char start, char end), plus content word -> sentence ids
+        self.sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(transcript):
+            self._add_sentence(start, match.start())
+            start = match.end()
+        self._add_sentence(start, len(transcript))
+        self._sentence_starts = [s for s, _ in self.sentences]
+
+        self.word_sentences = defaultdict(set)
+        for word, token_start, _ in self.tokens:
+            if is_content_word(word):
+                self.word_sentences[word].add(self.sentence_at(token_start))
+
+    def _add_sentence(self, start, end):
+        segment = self.text[start:end]
+        stripped = segment.strip()
+        if stripped:
+            offset = start + len(segment) - len(segment.lstrip())
+            self.sentences.append((offset, offset + len(stripped)))
+
+    def sentence_at(self, char_offset):
+        return max(0, bisect_right(self._sentence_starts, char_offset) - 1)
+
+    def match_shingles(self, claim_words):
+        """Best aligned token run for a claim -> (start token, end token, score) or None"""
+        k = min(SHINGLE_SIZE, len(claim_words))
+        if k < SHINGLE_SIZE:
+            return None
+        claim_shingles = [tuple(claim_words[i:i + k]) for i in range(len(claim_words) - k + 1)]
+
+        hits = []  # (diagonal, transcript position, claim shingle offset)
+        for offset, shingle in enumerate(claim_shingles):
+            postings = self.shingles.get(shingle)
+            if not postings or len(postings) > MAX_POSTINGS:
+                continue
+            for position in postings:
+                hits.append((position - offset, position, offset))
+        if not hits:
+            return None
+
+        # Densest diagonal band (two pointers over hits sorted by diagonal)
+        hits.sort()
+        best = None
+        lo = 0
+        for hi in range(len(hits)):
+            while hits[hi][0] - hits[lo][0] > DIAGONAL_SLACK:
+                lo += 1
+            support = len({h[2] for h in hits[lo:hi + 1]})
+            if best is None or support > best[0]:
+                best = (support, lo, hi)
+
+        support, lo, hi = best
+        band = hits[lo:hi + 1]
+        score = support / len(claim_shingles)
+        if score < MIN_SHINGLE_SCORE:
+            return None
+        first = min(h[1] for h in band)
+        last = max(h[1] for h in band) + k - 1
+        return first, last, score
+
+    def match_sentence(self, claim_words):
+        """Sentence sharing the most content words with the claim -> (sentence id, score) or None"""
+        content = {w for w in claim_words if is_content_word(w)}
+        if not content:
+            return None
+        counts = defaultdict(int)
+        for word in content:
+            for sentence_id in self.word_sentences.get(word, ()):
+                counts[sentence_id] += 1
+        if not counts:
+            return None
+        sentence_id = max(counts, key=lambda s: (counts[s], -s))
+        score = counts[sentence_id] / len(content)
+        start, end = self.sentences[sentence_id]
+        if score <= MIN_OVERLAP_SCORE or end - start <= 20:
+            return None
+        return sentence_id, score
+
+
+def match_claims(transcript, analysis, index=None):
+    """Best span for every claim, overlaps allowed -> [{'start', 'end', 'verdict', 'list', 'index', 'method', 'score'}]
+
+    In collect_claims order (longest first). Claims with no match are left out.
+    """
+    if not transcript or not isinstance(analysis, dict):
+        return []
+    claims = collect_claims(analysis)
+    if not claims:
+        return []
+    index = index or TranscriptIndex(transcript)
+
+    matches = []
+    for claim_text, verdict, list_name, claim_index in claims:
+        claim_words = [t[0] for t in tokenize(claim_text)]
+        span = None
+
+        shingle_match = index.match_shingles(claim_words)
+        if shingle_match:
+            first, last, score = shingle_match
+            end = index.tokens[last][2]
+            # Keep the claim's closing punctuation inside the tag, as an exact match would
+            if claim_text[-1] in '.!?' and transcript[end:end + 1] == claim_text[-1]:
+                end += 1
+            span = (index.tokens[first][1], end, f"shingle({score:.2f})", score)
+        else:
+            sentence_match = index.match_sentence(claim_words)
+            if sentence_match:
+                sentence_id, score = sentence_match
+                start, end = index.sentences[sentence_id]
+                span = (start, end, f"word-overlap({score:.2f})", score)
+
+        if not span:
+            continue
+        start, end, method, score = span
+        matches.append({
+            'start': start,
+            'end': end,
+            'verdict': verdict,
+            'list': list_name,
+            'index': claim_index,
+            'method': method,
+            'score': round(score, 3),
+        })
+    return matches
+
+
+def find_highlight_spans(transcript, analysis, index=None, matches=None):
+    """Non-overlapping claim spans -> [{'start', 'end', 'verdict', 'list', 'index', 'method', 'score'}] by start"""
+    if matches is None:
+        matches = match_claims(transcript, analysis, index)
+
+    accepted = []  # sorted, non-overlapping (start, end)
+    spans = []
+    for span in matches:
+        start, end = span['start'], span['end']
+        # Reject overlaps with spans already taken by longer claims
+        position = bisect_right(accepted, (start, end))
+        if position > 0 and accepted[position - 1][1] > start:
+            continue
+        if position < len(accepted) and accepted[position][0] < end:
+            continue
+        accepted.insert(position, (start, end))
+        spans.append(span)
+
+    spans.sort(key=lambda s: s['start'])
+    return spans
+
+
+def render_highlights(transcript, spans):
+    """Apply spans as inline tags in one join: "[VERIFIED] text[/VERIFIED]" """
+    pieces = []
+    cursor = 0
+    for span in spans:
+        pieces.append(transcript[cursor:span['start']])
+        pieces.append(f"[{span['verdict']}] {transcript[span['start']:span['end']]}[/{span['verdict']}]")
+        cursor = span['end']
+    pieces.append(transcript[cursor:])
+    return ''.join(pieces)
+
+
+def span_list(spans):
+    """Spans -> the compact [start, end, verdict, claim_index] rows kept in analysis['highlight_spans']
+
+    claim_index points into the claim list for that verdict (verified_claims, ...).
+    """
+    return [[span['start'], span['end'], span['verdict'], span.get('index')] for span in spans]
+
+
+def render_span_list(transcript, spans):
+    """render_highlights for highlight_spans rows"""
+    return render_highlights(transcript, [{'start': s[0], 'end': s[1], 'verdict': s[2]} for s in spans])
+
+
+def with_highlighted_transcript(analysis, transcript):
+    """Compatibility renderer: fill full_transcript_with_highlights from highlight_spans, in place
+
+    The tagged copy is only built for responses (clients still render it); it is
+    never stored or requested from the model.
+    """
+    if not isinstance(analysis, dict) or not transcript:
+        return analysis
+    spans = analysis.get('highlight_spans')
+    if spans and not analysis.get('full_transcript_with_highlights'):
+        analysis['full_transcript_with_highlights'] = render_span_list(transcript, spans)
+    return analysis
+
+
+_TAGGED = re.compile(r'\[(VERIFIED|OPINION|UNCERTAIN|FALSE)\] ?(.*?)\[/\1\]', re.DOTALL)
+
+
+def spans_from_tagged(tagged):
+    """Inverse of render_highlights -> (plain transcript, spans)"""
+    pieces = []
+    spans = []
+    position = 0
+    cursor = 0
+    for match in _TAGGED.finditer(tagged):
+        pieces.append(tagged[cursor:match.start()])
+        position += match.start() - cursor
+        text = match.group(2)
+        spans.append({'start': position, 'end': position + len(text), 'verdict': match.group(1)})
+        pieces.append(text)
+        position += len(text)
+        cursor = match.end()
+    pieces.append(tagged[cursor:])
+    return ''.join(pieces), spans
+
+
+def highlight_transcript(transcript, analysis):
+    """Highlighted transcript plus the spans used -> (text, spans)"""
+    spans = find_highlight_spans(transcript, analysis)
+    return render_highlights(transcript, spans), spans
@@ -0,0 +1,161 @@
+"""
+Short-lived cache of yt-dlp info dicts, keyed by canonical video id.
+
+The duration estimate, the metadata probe and download_video each used to build
+their own YoutubeDL and call extract_info - a full watch-page and player-response
+fetch through the proxy every time, each one another chance to trip YouTube's
+bot detection. Now the first extraction is kept here and the others reuse it:
+probe_metadata reads duration and creator info from it, and download_video hands
+it to YoutubeDL.process_ie_result, which selects a format and downloads without
+extracting again.
+
+Stream URLs in an info dict are signed and expire (hours on YouTube), so entries
+live for a few minutes only - long enough to cover one request. A download that
+fails on a cached dict drops the entry and falls back to a fresh extraction.
+
+Extractions are single-flight per key: a caller asking for a video whose probe
+is still running waits for it instead of starting a second one.
+
+Environment variables:
+    YTDLP_INFO_TTL         - seconds an info dict is reused (default: 300)
+    YTDLP_INFO_CACHE_SIZE  - entries per process (default: 32)
+"""
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+from services.transcript_cache import canonical_video_key
+
+# Longest a reader waits for someone else's in-flight extraction before doing without
+INFLIGHT_WAIT_SECONDS = 90
+
+
+class InfoDictCache:
+    """TTL + LRU cache of sanitized yt-dlp info dicts with single-flight extraction"""
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv('YTDLP_INFO_TTL', '300'))
+        self.max_entries = max_entries or int(os.getenv('YTDLP_INFO_CACHE_SIZE', '32'))
+        self._entries = OrderedDict()  # key -> (stored_at, info)
+        self._inflight = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'extractions': 0, 'shared_extractions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key_for(video_url):
+        platform, video_id = canonical_video_key(video_url)
+        return (platform, video_id) if video_id else ('url', (video_url or '').strip())
+
+    def _lookup(self, key):
+        """Fresh entry or None; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, info = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return info
+
+    def get(self, video_url, wait=True):
+        """Cached info dict (a copy - yt-dlp mutates what it's given) or None
+
+        With wait, an extraction already running for this video is waited for.
+        """
+        key = self.key_for(video_url)
+        with self._lock:
+            info = self._lookup(key)
+            event = self._inflight.get(key) if info is None else None
+        if info is None and event is not None and wait:
+            event.wait(INFLIGHT_WAIT_SECONDS)
+            with self._lock:
+                info = self._lookup(key)
+        with self._lock:
+            self._stats['hits' if info is not None else 'misses'] += 1
+        return copy.deepcopy(info) if info is not None else None
+
+    def put(self, video_url, info):
+        if not info:
+            return
+        key = self.key_for(video_url)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_url):
+        key = self.key_for(video_url)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def extract(self, video_url, extract_fn):
+        """Cached info dict, or extract_fn() once for all concurrent callers -> copy of the info dict"""
+        key = self.key_for(video_url)
+        while True:
+            with self._lock:
+                info = self._lookup(key)
+                if info is not None:
+                    self._stats['hits'] += 1
+                    return copy.deepcopy(info)
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+                self._stats['shared_extractions'] += 1
+            # Someone else is extracting this video - use theirs (or retry if it failed)
+            event.wait(INFLIGHT_WAIT_SECONDS)
+            with self._lock:
+                info = self._lookup(key)
+                if info is not None:
+                    return copy.deepcopy(info)
+                if self._inflight.get(key) is event and not event.is_set():
+                    # Still running past the wait - extract ourselves rather than block longer
+                    event = threading.Event()
+                    break
+
+        try:
+            with self._lock:
+                self._stats['misses'] += 1
+                self._stats['extractions'] += 1
+            info = extract_fn()
+            self.put(video_url, info)
+            return copy.deepcopy(info)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is event:
+                    del self._inflight[key]
+            event.set()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['inflight'] = len(self._inflight)
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_info_cache():
+    """Process-wide info dict cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InfoDictCache()
+    return _cache
+
+
+def set_info_cache(cache):
+    """Replace the process-wide cache (e.g. ttl=0 to disable reuse)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
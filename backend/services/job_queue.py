@@ -0,0 +1,554 @@
+"""
+Background job queue for long-running video processing.
+
+Jobs are persisted in a pluggable JobStore (SQLite file by default) and drained
+by a pool of worker processes, so HTTP workers can return a job id immediately
+instead of holding a gunicorn worker for the whole pipeline.
+
+Environment variables:
+    JOB_STORE_BACKEND   - job store implementation (default: sqlite)
+    JOB_STORE_PATH      - SQLite database file (default: <tmp>/bs_detector_jobs.sqlite3)
+    JOB_WORKERS         - number of worker processes (default: 2)
+    JOB_POLL_INTERVAL   - seconds between queue polls when idle (default: 1.0)
+    JOB_STALE_SECONDS   - running jobs with no heartbeat for this long are re-queued (default: 900)
+    JOB_HEARTBEAT_SECONDS - how often a running job refreshes its heartbeat (default: 30)
+    JOB_MAX_ATTEMPTS    - a job re-queued this many times is failed instead (default: 3)
+    PREWARM_WHISPER     - load the Whisper model when each worker starts (default: false)
+
+A running job heartbeats from a side thread for as long as its handler runs, so
+only jobs whose worker actually died go stale - a long transcription that
+reports no progress is not picked up a second time. Stale jobs that have used
+up their attempts are failed and the handler's on_abandoned(payload, error)
+hook (if it defines one) cleans up after them.
+
+The pool belongs to the process that started it. Under gunicorn --preload that
+is the master; forked HTTP workers only enqueue, and the master's supervisor
+thread restarts dead workers and re-queues stale jobs.
+"""
+import os
+import sys
+import atexit
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import importlib
+import traceback
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+# Add parent directory to path so spawned workers can import services/config
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+_parent_dir = os.path.dirname(_current_dir)
+if _parent_dir not in sys.path:
+    sys.path.insert(0, _parent_dir)
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+
+class JobStore:
+    """Interface for job persistence backends.
+
+    A job is a dict with: id, handler ("module:function"), payload, user_id,
+    status, stage, progress, result, error, attempts, created_at, updated_at.
+    """
+
+    def enqueue(self, handler, payload, user_id=None):
+        """Persist a new queued job and return its id"""
+        raise NotImplementedError
+
+    def claim_next(self, worker_id):
+        """Atomically move the oldest queued job to running and return it (or None)"""
+        raise NotImplementedError
+
+    def update_progress(self, job_id, stage, progress):
+        """Record the current stage/progress (also acts as a heartbeat)"""
+        raise NotImplementedError
+
+    def complete(self, job_id, result, worker_id=None):
+        """Mark a job completed with a JSON-serializable result -> False if it wasn't updated
+
+        With worker_id, only while that worker still owns the running job (like heartbeat).
+        """
+        raise NotImplementedError
+
+    def fail(self, job_id, error, result=None, worker_id=None):
+        """Mark a job failed with an error message and optional error payload -> False if it wasn't updated
+
+        With worker_id, only while that worker still owns the running job (like heartbeat).
+        """
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Return a job dict or None"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id, worker_id):
+        """Refresh a running job's heartbeat if worker_id still owns it -> False once it doesn't"""
+        raise NotImplementedError
+
+    def requeue_stale(self, stale_seconds, max_attempts):
+        """Re-queue running jobs whose worker stopped heartbeating -> (requeued count, abandoned jobs)
+
+        Jobs that already used max_attempts are failed instead and returned.
+        """
+        raise NotImplementedError
+
+
+class SQLiteJobStore(JobStore):
+    """File-backed job store - safe to share between processes on one host"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('JOB_STORE_PATH') or os.path.join(
+            tempfile.gettempdir(), 'bs_detector_jobs.sqlite3'
+        )
+        self._init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    handler TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    user_id TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    worker_id TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)')
+        finally:
+            conn.close()
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job.get('payload') else {}
+        job['result'] = json.loads(job['result']) if job.get('result') else None
+        return job
+
+    def enqueue(self, handler, payload, user_id=None):
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO jobs (id, handler, payload, user_id, status, stage, progress, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)',
+                (job_id, handler, json.dumps(payload), user_id, STATUS_QUEUED, 'queued', now, now)
+            )
+        finally:
+            conn.close()
+        return job_id
+
+    def claim_next(self, worker_id):
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front so two workers can't claim the same job
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            now = time.time()
+            conn.execute(
+                'UPDATE jobs SET status = ?, stage = ?, attempts = attempts + 1, worker_id = ?, updated_at = ? WHERE id = ?',
+                (STATUS_RUNNING, 'starting', worker_id, now, row['id'])
+            )
+            conn.execute('COMMIT')
+            job = self._row_to_job(row)
+            job.update({'status': STATUS_RUNNING, 'stage': 'starting', 'attempts': job['attempts'] + 1, 'worker_id': worker_id})
+            return job
+        except Exception:
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id, stage, progress):
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ?',
+                (stage, float(progress), time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, worker_id, assignments, values):
+        """UPDATE a job's final state, fenced on its owner when worker_id is given -> updated?"""
+        query = f'UPDATE jobs SET {assignments} WHERE id = ?'
+        params = list(values) + [job_id]
+        if worker_id is not None:
+            query += ' AND worker_id = ? AND status = ?'
+            params += [worker_id, STATUS_RUNNING]
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).rowcount > 0
+        finally:
+            conn.close()
+
+    def complete(self, job_id, result, worker_id=None):
+        return self._finish(
+            job_id, worker_id, 'status = ?, stage = ?, progress = 1, result = ?, updated_at = ?',
+            (STATUS_COMPLETED, 'completed', json.dumps(result), time.time())
+        )
+
+    def fail(self, job_id, error, result=None, worker_id=None):
+        return self._finish(
+            job_id, worker_id, 'status = ?, stage = ?, error = ?, result = ?, updated_at = ?',
+            (STATUS_FAILED, 'failed', str(error)[:2000], json.dumps(result) if result is not None else None, time.time())
+        )
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            return self._row_to_job(row)
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, worker_id):
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                'UPDATE jobs SET updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?',
+                (time.time(), job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def requeue_stale(self, stale_seconds, max_attempts):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            cutoff = now - stale_seconds
+            abandoned = [self._row_to_job(row) for row in conn.execute(
+                'SELECT * FROM jobs WHERE status = ? AND updated_at < ? AND attempts >= ?',
+                (STATUS_RUNNING, cutoff, max_attempts)
+            ).fetchall()]
+            for job in abandoned:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, stage = ?, error = ?, worker_id = NULL, updated_at = ? WHERE id = ?',
+                    (STATUS_FAILED, 'failed', f"Job worker stopped responding ({job['attempts']} attempts)", now, job['id'])
+                )
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, stage = ?, worker_id = NULL, updated_at = ? '
+                'WHERE status = ? AND updated_at < ? AND attempts < ?',
+                (STATUS_QUEUED, 'queued', now, STATUS_RUNNING, cutoff, max_attempts)
+            )
+            requeued = cursor.rowcount
+            conn.execute('COMMIT')
+            return requeued, abandoned
+        except Exception:
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+
+# Registry of available store backends - add new implementations here
+JOB_STORE_BACKENDS = {
+    'sqlite': SQLiteJobStore,
+}
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """Get the process-wide job store configured by JOB_STORE_BACKEND"""
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                backend = os.getenv('JOB_STORE_BACKEND', 'sqlite').lower()
+                store_class = JOB_STORE_BACKENDS.get(backend)
+                if store_class is None:
+                    raise ValueError(f"Unknown JOB_STORE_BACKEND '{backend}' (available: {', '.join(JOB_STORE_BACKENDS)})")
+                _job_store = store_class()
+    return _job_store
+
+
+def set_job_store(store):
+    """Override the process-wide job store (e.g. a temporary SQLite file in tests)"""
+    global _job_store
+    with _job_store_lock:
+        _job_store = store
+
+
+class JobReporter:
+    """Handed to job handlers so they can report stage and progress"""
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+
+    def __call__(self, stage, progress):
+        try:
+            self.store.update_progress(self.job_id, stage, max(0.0, min(1.0, progress)))
+        except Exception as e:
+            print(f"⚠️ Failed to report job progress (non-critical): {str(e)}")
+
+
+class JobFailed(Exception):
+    """Raised by handlers to fail a job with a structured error payload"""
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def _resolve_handler(handler_path):
+    module_name, func_name = handler_path.split(':', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def _heartbeat_loop(store, job, stop, interval):
+    """Keep a running job's heartbeat fresh while its handler works (stages can go minutes without progress)"""
+    while not stop.wait(interval):
+        try:
+            if not store.heartbeat(job['id'], job.get('worker_id')):
+                print(f"⚠️ Job {job['id'][:8]} is no longer owned by this worker")
+                return
+        except Exception as e:
+            print(f"⚠️ Job heartbeat failed (non-critical): {str(e)}")
+
+
+def run_job(store, job, heartbeat_interval=None):
+    """Execute a single claimed job and record its outcome"""
+    job_id = job['id']
+    worker_id = job.get('worker_id')
+    print(f"🛠️ Job {job_id[:8]} started ({job['handler']}, attempt {job['attempts']})")
+    started = time.time()
+    stop_heartbeat = threading.Event()
+    heartbeat_thread = threading.Thread(
+        target=_heartbeat_loop,
+        args=(store, job, stop_heartbeat, heartbeat_interval or float(os.getenv('JOB_HEARTBEAT_SECONDS', '30'))),
+        name=f"heartbeat-{job_id[:8]}",
+        daemon=True,
+    )
+    heartbeat_thread.start()
+    try:
+        handler = _resolve_handler(job['handler'])
+        result = handler(job['payload'], JobReporter(store, job_id))
+        if store.complete(job_id, result, worker_id=worker_id):
+            print(f"✅ Job {job_id[:8]} completed in {time.time() - started:.1f}s")
+        else:
+            print(f"⚠️ Job {job_id[:8]} finished after it was re-queued or abandoned - result not recorded")
+    except JobFailed as e:
+        if store.fail(job_id, str(e), e.result, worker_id=worker_id):
+            print(f"❌ Job {job_id[:8]} failed: {str(e)[:200]}")
+        else:
+            print(f"⚠️ Job {job_id[:8]} failed after it was re-queued or abandoned - failure not recorded")
+    except Exception as e:
+        traceback.print_exc()
+        if store.fail(job_id, str(e), worker_id=worker_id):
+            print(f"❌ Job {job_id[:8]} crashed: {str(e)[:200]}")
+        else:
+            print(f"⚠️ Job {job_id[:8]} crashed after it was re-queued or abandoned - failure not recorded")
+    finally:
+        stop_heartbeat.set()
+
+
+def abandon_job(job):
+    """Let a job's handler clean up after it was failed for running out of attempts (best effort)"""
+    try:
+        hook = getattr(_resolve_handler(job['handler']), 'on_abandoned', None)
+        if hook is not None:
+            hook(job['payload'], job.get('error') or 'Job worker stopped responding')
+    except Exception as e:
+        print(f"⚠️ Cleanup for abandoned job {job['id'][:8]} failed (non-critical): {str(e)}")
+
+
+def _worker_main(worker_id, poll_interval):
+    """Worker process loop: claim jobs from the store and run them until killed"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if os.getenv('PREWARM_WHISPER', 'false').lower() == 'true':
+        # Spawned workers don't inherit the master's prewarmed model - load it before the first job
+        from services.processor_registry import prewarm
+        prewarm()
+
+    store = get_job_store()
+    # Unique per process, so a restarted worker can't heartbeat or finish a job it no longer owns
+    worker_id = f"{worker_id}:{os.getpid()}"
+    print(f"👷 Job worker {worker_id} started")
+    while True:
+        try:
+            job = store.claim_next(worker_id)
+        except Exception as e:
+            print(f"⚠️ Job worker {worker_id} couldn't poll queue: {str(e)}")
+            job = None
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(store, job)
+
+
+class JobWorkerPool:
+    """Supervises a fixed number of worker processes that drain the job store"""
+
+    def __init__(self, num_workers=None, poll_interval=None):
+        self.num_workers = num_workers or int(os.getenv('JOB_WORKERS', '2'))
+        self.poll_interval = poll_interval or float(os.getenv('JOB_POLL_INTERVAL', '1.0'))
+        self.stale_seconds = int(os.getenv('JOB_STALE_SECONDS', '900'))
+        self.max_attempts = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+        # Spawn (not fork) so workers don't inherit gunicorn's threads, sockets or API clients
+        self._ctx = multiprocessing.get_context('spawn')
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._owner_pid = None
+        self._stop = threading.Event()
+
+    @property
+    def is_owner(self):
+        """Only the process that started the workers can supervise them (fork copies the handles)"""
+        return self._owner_pid == os.getpid()
+
+    def start(self, supervise=True):
+        self._owner_pid = os.getpid()
+        atexit.register(self.stop)
+        self.requeue_stale()
+        self.ensure_workers()
+        if supervise:
+            threading.Thread(target=self._supervise, name='job-supervisor', daemon=True).start()
+        print(f"✅ Job worker pool running with {self.num_workers} worker(s)")
+
+    def requeue_stale(self):
+        """Re-queue jobs whose worker died; fail (and clean up) those out of attempts"""
+        try:
+            requeued, abandoned = get_job_store().requeue_stale(self.stale_seconds, self.max_attempts)
+            if requeued:
+                print(f"🔁 Re-queued {requeued} stale job(s)")
+            for job in abandoned:
+                print(f"🪦 Job {job['id'][:8]} failed after {job['attempts']} attempts")
+                abandon_job(job)
+        except Exception as e:
+            print(f"⚠️ Couldn't re-queue stale jobs (non-critical): {str(e)}")
+
+    def _supervise(self):
+        interval = max(5.0, min(60.0, self.stale_seconds / 4))
+        while not self._stop.wait(interval):
+            self.ensure_workers()
+            self.requeue_stale()
+
+    def ensure_workers(self):
+        """Start missing workers and replace any that have died (owner process only)"""
+        if not self.is_owner:
+            return
+        with self._lock:
+            for i in range(self.num_workers):
+                worker_id = f"worker-{i + 1}"
+                process = self._processes.get(worker_id)
+                if process is not None and process.is_alive():
+                    continue
+                if process is not None:
+                    print(f"⚠️ Job {worker_id} exited (code {process.exitcode}) - restarting")
+                # Not daemonic: a job may start its own processes (chunked Whisper pool),
+                # which daemonic processes can't. stop() terminates and joins them at exit.
+                process = self._ctx.Process(
+                    target=_worker_main,
+                    args=(worker_id, self.poll_interval),
+                    name=f"job-{worker_id}",
+                    daemon=False,
+                )
+                process.start()
+                self._processes[worker_id] = process
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if not self.is_owner:
+            return
+        with self._lock:
+            for process in self._processes.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in self._processes.values():
+                process.join(timeout)
+            self._processes = {}
+
+    def status(self):
+        status = {'workers': self.num_workers, 'owner_pid': self._owner_pid}
+        if self.is_owner:
+            status['alive'] = sum(1 for p in self._processes.values() if p.is_alive())
+        return status
+
+
+_worker_pool = None
+
+
+def start_worker_pool(num_workers=None):
+    """Start the embedded worker pool once per process tree (idempotent)"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = JobWorkerPool(num_workers=num_workers)
+        _worker_pool.start()
+    return _worker_pool
+
+
+def enqueue_job(handler, payload, user_id=None):
+    """Queue a job and make sure workers are running to pick it up"""
+    job_id = get_job_store().enqueue(handler, payload, user_id=user_id)
+    if _worker_pool is not None:
+        _worker_pool.ensure_workers()
+    print(f"📬 Job {job_id[:8]} queued ({handler})")
+    return job_id
+
+
+def serialize_job(job):
+    """Public view of a job for the status endpoint"""
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'stage': job.get('stage'),
+        'progress': round(float(job.get('progress') or 0), 3),
+        'attempts': job.get('attempts', 0),
+        'created_at': datetime.utcfromtimestamp(job['created_at']).isoformat(),
+        'updated_at': datetime.utcfromtimestamp(job['updated_at']).isoformat(),
+        'result': job.get('result') if job['status'] in (STATUS_COMPLETED, STATUS_FAILED) else None,
+        'error': job.get('error'),
+    }
+
+
+if __name__ == '__main__':
+    # Standalone worker pool: python -m services.job_queue
+    pool = JobWorkerPool()
+    pool.start()
+    try:
+        while True:
+            time.sleep(10)
+    except KeyboardInterrupt:
+        pool.stop()
@@ -0,0 +1,259 @@
+"""
+Map-reduce fact-checking for transcripts too long for a single prompt.
+
+analyze_with_claude truncates at 50k chars and analyze_with_openai at 100k, so
+the back half of a 2-hour podcast was never fact-checked. Instead:
+
+1. map    - split on sentence boundaries into overlapping chunks and fact-check
+            them concurrently (bounded thread pool; the work is network-bound)
+2. reduce - merge the claim lists, drop duplicates (overlaps and repeats),
+            and recompute fact_score, overall_verdict and bias_analysis
+
+Wall time tracks the slowest chunk instead of the total length.
+
+Environment variables:
+    LONG_TRANSCRIPT_CHARS     - use map-reduce at or above this length (default: 40000)
+    FACTCHECK_CHUNK_CHARS     - target chunk size (default: 24000)
+    FACTCHECK_OVERLAP_CHARS   - text repeated between neighbouring chunks (default: 1000)
+    FACTCHECK_MAX_CONCURRENCY - chunks analyzed at once (default: 4)
+"""
+import os
+import re
+import difflib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CLAIM_LISTS = ('verified_claims', 'opinion_claims', 'uncertain_claims', 'false_claims')
+BIAS_SCORES = ('political_lean', 'emotional_tone', 'source_quality')
+CONFIDENCE_RANK = {'high': 3, 'medium': 2, 'low': 1}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+
+def get_long_transcript_threshold():
+    return int(os.getenv('LONG_TRANSCRIPT_CHARS', '40000'))
+
+
+def sentence_spans(text):
+    """(start, end) offsets of sentences; captions without punctuation fall back to ~300-char runs"""
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+
+    # Auto-captions often have no punctuation at all - split long runs on whitespace
+    result = []
+    for s, e in spans:
+        while e - s > 600:
+            cut = text.rfind(' ', s, s + 300)
+            cut = cut + 1 if cut > s else s + 300
+            result.append((s, cut))
+            s = cut
+        result.append((s, e))
+    return result
+
+
+def chunk_transcript(text, chunk_chars=None, overlap_chars=None):
+    """Overlapping chunks cut on sentence boundaries -> [(start_offset, chunk_text)]"""
+    chunk_chars = chunk_chars or int(os.getenv('FACTCHECK_CHUNK_CHARS', '24000'))
+    overlap_chars = overlap_chars if overlap_chars is not None else int(os.getenv('FACTCHECK_OVERLAP_CHARS', '1000'))
+    if len(text) <= chunk_chars:
+        return [(0, text)]
+
+    spans = sentence_spans(text)
+    chunks = []
+    i = 0
+    while i < len(spans):
+        start = spans[i][0]
+        j = i
+        while j < len(spans) and spans[j][1] - start <= chunk_chars:
+            j += 1
+        j = max(j, i + 1)  # a single over-long sentence still makes progress
+        chunks.append((start, text[start:spans[j - 1][1]]))
+        if j >= len(spans):
+            break
+        # Step back whole sentences until the overlap budget is used
+        next_i = j
+        while next_i - 1 > i and spans[j - 1][1] - spans[next_i - 1][0] <= overlap_chars:
+            next_i -= 1
+        i = next_i
+    return chunks
+
+
+def _normalize_claim(claim):
+    return ' '.join(re.sub(r'[^\w\s]', ' ', str(claim or '').lower()).split())
+
+
+def _claim_strength(claim):
+    """Prefer the copy with higher confidence, then more sources, then more explanation"""
+    confidence = CONFIDENCE_RANK.get(str(claim.get('confidence', '')).lower(), 0)
+    return (confidence, len(claim.get('sources') or []), len(claim.get('explanation') or ''))
+
+
+def _is_duplicate(a, b, threshold=0.85):
+    if a == b:
+        return True
+    if not a or not b:
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    if len(shorter) >= 30 and shorter in longer:
+        return True
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio() >= threshold
+
+
+def merge_claims(chunk_results):
+    """Merge claim lists across chunks, keeping the strongest copy of each duplicated claim"""
+    kept = []  # (normalized, list_name, claim)
+    for result in chunk_results:
+        for list_name in CLAIM_LISTS:
+            for claim in result.get(list_name) or []:
+                if not isinstance(claim, dict) or not claim.get('claim'):
+                    continue
+                normalized = _normalize_claim(claim['claim'])
+                for index, (other, _, other_claim) in enumerate(kept):
+                    if _is_duplicate(normalized, other):
+                        if _claim_strength(claim) > _claim_strength(other_claim):
+                            kept[index] = (normalized, list_name, claim)
+                        break
+                else:
+                    kept.append((normalized, list_name, claim))
+
+    merged = {name: [] for name in CLAIM_LISTS}
+    for _, list_name, claim in kept:
+        merged[list_name].append(claim)
+    return merged
+
+
+def _weighted_mean(values):
+    values = [(v, w) for v, w in values if isinstance(v, (int, float)) and w > 0]
+    total = sum(w for _, w in values)
+    return sum(v * w for v, w in values) / total if total else None
+
+
+def verdict_for_score(score, factual_claims):
+    if score is None or factual_claims == 0:
+        return 'Unable to Verify'
+    if score >= 7:
+        return 'Mostly Accurate'
+    if score >= 4:
+        return 'Mixed Accuracy'
+    return 'Mostly Inaccurate'
+
+
+def merge_bias(chunk_results, weights):
+    """Length-weighted mean of the numeric bias scores; labels from the closest chunk"""
+    analyses = [(r.get('bias_analysis'), w) for r, w in zip(chunk_results, weights) if isinstance(r.get('bias_analysis'), dict)]
+    if not analyses:
+        return None
+
+    merged = {}
+    for field in BIAS_SCORES:
+        mean = _weighted_mean([(b.get(field), w) for b, w in analyses])
+        if mean is None:
+            continue
+        merged[field] = round(mean, 1)
+        closest = min(
+            (b for b, _ in analyses if isinstance(b.get(field), (int, float))),
+            key=lambda b: abs(b[field] - mean)
+        )
+        if closest.get(f'{field}_label'):
+            merged[f'{field}_label'] = closest[f'{field}_label']
+
+    levels = ['Low', 'Moderate', 'High']
+    bias_votes = [(levels.index(b['overall_bias']), w) for b, w in analyses if b.get('overall_bias') in levels]
+    bias_level = _weighted_mean(bias_votes)
+    if bias_level is not None:
+        merged['overall_bias'] = levels[int(round(bias_level))]
+    return merged
+
+
+def reduce_fact_checks(chunk_results, weights=None):
+    """Combine per-chunk fact-check dicts into one result with the usual shape"""
+    weights = weights or [1] * len(chunk_results)
+    merged = merge_claims(chunk_results)
+
+    # Each chunk's score is weighted by its length and by how many factual claims it judged
+    score_inputs = []
+    for result, weight in zip(chunk_results, weights):
+        factual = sum(len(result.get(name) or []) for name in ('verified_claims', 'uncertain_claims', 'false_claims'))
+        score_inputs.append((result.get('fact_score'), weight * (1 + factual)))
+    fact_score = _weighted_mean(score_inputs)
+    fact_score = round(fact_score, 1) if fact_score is not None else None
+    factual_claims = sum(len(merged[name]) for name in ('verified_claims', 'uncertain_claims', 'false_claims'))
+
+    red_flags = []
+    seen_flags = set()
+    for result in chunk_results:
+        for flag in result.get('red_flags') or []:
+            key = _normalize_claim(flag)
+            if key and key not in seen_flags:
+                seen_flags.add(key)
+                red_flags.append(flag)
+
+    summaries = [r.get('summary', '').strip() for r in chunk_results if r.get('summary')]
+
+    reduced = {
+        'fact_score': fact_score,
+        'overall_verdict': verdict_for_score(fact_score, factual_claims),
+        'summary': ' '.join(summaries),
+        **merged,
+        'red_flags': red_flags,
+        'analysis_mode': 'map-reduce',
+        'chunks_analyzed': len(chunk_results),
+    }
+    bias = merge_bias(chunk_results, weights)
+    if bias:
+        reduced['bias_analysis'] = bias
+    return reduced
+
+
+def fact_check_long_transcript(transcription, analyze_chunk, max_workers=None, on_chunk_done=None):
+    """Fact-check a long transcript chunk-by-chunk -> merged fact-check dict
+
+    analyze_chunk(chunk_text) must return a parsed fact-check dict. Chunks that
+    fail are skipped; if every chunk fails the last error is raised.
+    on_chunk_done(done, total) is called as chunks finish (in any order).
+    """
+    max_workers = max_workers or int(os.getenv('FACTCHECK_MAX_CONCURRENCY', '4'))
+    chunks = chunk_transcript(transcription)
+    print(f"🧩 Map-reduce fact-check: {len(transcription)} chars in {len(chunks)} chunks ({max_workers} at a time)")
+
+    done = [0]
+    done_lock = threading.Lock()
+
+    def finished():
+        if on_chunk_done:
+            with done_lock:
+                done[0] += 1
+                count = done[0]
+            on_chunk_done(count, len(chunks))
+
+    def run(chunk):
+        offset, text = chunk
+        try:
+            result = analyze_chunk(text)
+            if not isinstance(result, dict):
+                raise Exception("Chunk analysis was not valid JSON")
+            return result, len(text), None
+        except Exception as e:
+            print(f"⚠️ Chunk at offset {offset} failed: {str(e)[:200]}")
+            return None, len(text), e
+        finally:
+            finished()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        outcomes = list(pool.map(run, chunks))
+
+    results = [(r, w) for r, w, _ in outcomes if r is not None]
+    if not results:
+        raise outcomes[-1][2]
+    if len(results) < len(chunks):
+        print(f"⚠️ {len(chunks) - len(results)} of {len(chunks)} chunks failed - result covers the rest")
+
+    reduced = reduce_fact_checks([r for r, _ in results], [w for _, w in results])
+    reduced['chunks_failed'] = len(chunks) - len(results)
+    print(f"✅ Map-reduce complete: {sum(len(reduced[n]) for n in CLAIM_LISTS)} unique claims, score {reduced['fact_score']}")
+    return reduced
@@ -0,0 +1,138 @@
+"""
+Minute ledger: reserve when a video is accepted, settle when it completes.
+
+The pipeline used to read minutes_used_this_month, add the charge in Python and
+write it back - two concurrent videos from one account lost an update, and the
+limit check only saw minutes already charged, not videos still in flight.
+
+Now (database/migrations/add_minute_ledger.sql):
+- reserve_minutes holds the estimated charge with one conditional UPDATE on the
+  users row (used + reserved < limit), so the check and the hold are atomic
+- record_video_result releases the hold and charges the actual minutes in the
+  same transaction that saves the video
+- failed videos release their hold; holds older than 6 hours are released the
+  next time the user reserves
+- every step appends a row to minute_transactions
+
+Until the migration is applied, reserve_minutes falls back to the old
+read-only limit check and returns a reservation with no id.
+"""
+from services.supabase_client import get_supabase_client
+
+# PGRST202: PostgREST has no function with that name/signature
+_MISSING_FUNCTION = ('PGRST202', 'Could not find the function')
+# Raised by the reserve_minutes function in add_minute_ledger.sql
+_USER_NOT_FOUND = 'reserve_minutes: user'
+_ledger_missing = False
+
+
+class UserNotFound(LookupError):
+    """reserve_minutes was asked to hold minutes for a user that doesn't exist"""
+
+
+def _is_missing_function(error):
+    return getattr(error, 'code', None) == _MISSING_FUNCTION[0] or _MISSING_FUNCTION[1] in str(error)
+
+
+def _is_user_not_found(error):
+    message = getattr(error, 'message', None) or str(error)
+    return _USER_NOT_FOUND in message and 'not found' in message
+
+
+class MinuteReservation:
+    """Minutes held for one video; id is None when the ledger isn't installed"""
+
+    def __init__(self, reservation_id=None, minutes=0):
+        self.id = reservation_id
+        self.minutes = minutes
+        self.settled = False
+
+    def release(self, supabase=None):
+        """Give the held minutes back (failed video) - best effort, idempotent"""
+        if not self.id or self.settled:
+            return
+        self.settled = True
+        try:
+            (supabase or get_supabase_client()).rpc('release_minute_reservation', {
+                'p_reservation_id': self.id
+            }).execute()
+            print(f"↩️ Released {self.minutes} reserved minutes")
+        except Exception as e:
+            print(f"⚠️ Couldn't release minute reservation {self.id} (non-critical): {str(e)}")
+
+    def __repr__(self):
+        return f"MinuteReservation(id={self.id!r}, minutes={self.minutes}, settled={self.settled})"
+
+
+def reserve_minutes(user_id, minutes, video_id=None, supabase=None):
+    """Hold minutes for a video -> (MinuteReservation or None if over the limit, usage dict)
+
+    usage: {'used', 'reserved', 'limit', 'tier'} as seen by the check.
+    Raises UserNotFound (a LookupError) for an unknown user_id.
+    """
+    global _ledger_missing
+    supabase = supabase or get_supabase_client()
+
+    if not _ledger_missing:
+        try:
+            response = supabase.rpc('reserve_minutes', {
+                'p_user_id': user_id,
+                'p_minutes': minutes,
+                'p_video_id': video_id
+            }).execute()
+            state = response.data or {}
+            usage = {
+                'used': float(state.get('minutes_used_this_month') or 0),
+                'reserved': float(state.get('minutes_reserved') or 0),
+                'limit': state.get('monthly_minute_limit', 60),
+                'tier': state.get('subscription_tier', 'free')
+            }
+            if not state.get('reserved'):
+                return None, usage
+            print(f"🔒 Reserved {minutes} minutes ({usage['used']} used, {usage['reserved']} reserved of {usage['limit']})")
+            return MinuteReservation(state['reservation_id'], minutes), usage
+        except Exception as e:
+            if _is_user_not_found(e):
+                raise UserNotFound(f'User {user_id} not found') from e
+            if not _is_missing_function(e):
+                raise
+            print("⚠️ reserve_minutes RPC not installed - using plain limit check (run add_minute_ledger.sql)")
+            _ledger_missing = True
+
+    # Pre-migration: check only, nothing is held
+    user_response = supabase.table('users').select('minutes_used_this_month, monthly_minute_limit, subscription_tier').eq('id', user_id).execute()
+    if not user_response.data:
+        raise UserNotFound(f'User {user_id} not found')
+    user = user_response.data[0]
+    usage = {
+        'used': float(user.get('minutes_used_this_month') or 0),
+        'reserved': 0.0,
+        'limit': user.get('monthly_minute_limit', 60),
+        'tier': user.get('subscription_tier', 'free')
+    }
+    if usage['used'] >= usage['limit']:
+        return None, usage
+    return MinuteReservation(None, minutes), usage
+
+
+def charge_minutes(user_id, minutes, supabase=None):
+    """Atomic in-database increment of minutes_used_this_month -> new total"""
+    supabase = supabase or get_supabase_client()
+    response = supabase.rpc('increment_minute_usage', {
+        'p_user_id': user_id,
+        'p_minutes': minutes
+    }).execute()
+    return float(response.data or 0)
+
+
+def limit_exceeded_response(usage):
+    """403 payload for a user with no minutes left (same shape the frontend already handles)"""
+    return {
+        'success': False,
+        'error': f"You have used all {usage['limit']} minutes this month. Upgrade to continue analyzing videos.",
+        'upgrade_required': True,
+        'current_tier': usage['tier'],
+        'used': usage['used'],
+        'reserved': usage['reserved'],
+        'limit': usage['limit']
+    }
@@ -0,0 +1,161 @@
+"""
+Process-wide registry for heavy, reusable processing resources.
+
+Building a VideoProcessor per request threw away the lazily loaded Whisper model
+and rebuilt the Anthropic/OpenAI clients every time. This registry keeps:
+
+- Whisper models, loaded once per process and kept across gunicorn forks
+  (so with --preload and PREWARM_WHISPER=true they load once in the master;
+  spawned job workers load their own at startup - services/job_queue.py)
+- one VideoProcessor per worker process (API clients are not fork-safe, so a
+  forked worker builds its own instead of reusing the master's)
+
+Environment variables:
+    PREWARM_WHISPER      - load the Whisper model at boot (default: false)
+    WHISPER_MODEL        - default local Whisper model name (default: base)
+"""
+import os
+import time
+import threading
+
+DEFAULT_WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+
+_lock = threading.RLock()
+_processor = None
+_processor_pid = None
+
+_whisper_models = {}
+_whisper_lock = threading.Lock()
+_stats = {
+    'processors_built': 0,
+    'processor_build_seconds': None,
+    'whisper_models': {},
+}
+
+
+def _current_rss_mb():
+    """Resident memory of this process in MB (best effort)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except Exception:
+        try:
+            import resource
+            # ru_maxrss is KB on Linux (peak, not current - still useful as an upper bound)
+            return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except Exception:
+            return None
+
+
+def get_video_processor():
+    """Get this worker's shared VideoProcessor, building it on first use"""
+    global _processor, _processor_pid
+    pid = os.getpid()
+    if _processor is not None and _processor_pid == pid:
+        return _processor
+
+    with _lock:
+        if _processor is None or _processor_pid != pid:
+            from services.video_processor import VideoProcessor
+            started = time.time()
+            _processor = VideoProcessor()
+            _processor_pid = pid
+            _stats['processors_built'] += 1
+            _stats['processor_build_seconds'] = round(time.time() - started, 3)
+            print(f"✅ Shared VideoProcessor ready for pid {pid} ({_stats['processor_build_seconds']}s)")
+    return _processor
+
+
+def _load_once(key, label, loader):
+    """Load a model once per process, recording load time and memory"""
+    model = _whisper_models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _whisper_models.get(key)
+        if model is None:
+            rss_before = _current_rss_mb()
+            started = time.time()
+            print(f"🎤 Loading {label}...")
+            model = loader()
+            load_seconds = round(time.time() - started, 2)
+            rss_after = _current_rss_mb()
+            _whisper_models[key] = model
+            _stats['whisper_models'][key] = {
+                'load_seconds': load_seconds,
+                'rss_before_mb': rss_before,
+                'rss_after_mb': rss_after,
+                'rss_delta_mb': round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+                'loaded_in_pid': os.getpid(),
+            }
+            print(f"✅ {label} loaded in {load_seconds}s (RSS {rss_before} MB → {rss_after} MB)")
+    return model
+
+
+def get_whisper_model(name=None):
+    """Load a local openai-whisper model once per process and return it"""
+    name = name or DEFAULT_WHISPER_MODEL
+
+    def load():
+        import whisper
+        return whisper.load_model(name)
+
+    return _load_once(name, f"Whisper model '{name}'", load)
+
+
+def get_faster_whisper_model(name=None, compute_type='int8', cpu_threads=0):
+    """Load a CTranslate2 (faster-whisper) model once per process and return it"""
+    name = name or DEFAULT_WHISPER_MODEL
+
+    def load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(name, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads)
+
+    return _load_once(f"faster-whisper:{name}:{compute_type}", f"faster-whisper model '{name}' ({compute_type})", load)
+
+
+def get_whisper_lock():
+    """Lock serializing inference on shared Whisper models (gunicorn runs 2 threads per worker)"""
+    return _whisper_lock
+
+
+def prewarm(whisper_model=None):
+    """Load heavy resources ahead of the first request.
+
+    Called at boot when PREWARM_WHISPER=true. Under gunicorn --preload this runs in
+    the master, so forked workers share the model's memory pages copy-on-write.
+    The VideoProcessor itself is not built here - each worker builds its own.
+
+    Without whisper_model, loads what the first available local backend's model
+    policy (WHISPER_MODEL_POLICY) picks for short audio - the model most requests use.
+    """
+    try:
+        from services.transcription import (
+            FasterWhisperBackend, LocalWhisperBackend, TRANSCRIPTION_BACKENDS, choose_model_size, get_backend_order
+        )
+        for name in get_backend_order(use_openai_api=False):
+            backend_class = TRANSCRIPTION_BACKENDS.get(name)
+            if backend_class not in (FasterWhisperBackend, LocalWhisperBackend) or not backend_class().is_available():
+                continue
+            model_name = whisper_model or choose_model_size(0, backend_class.model_policy)
+            if backend_class is FasterWhisperBackend:
+                get_faster_whisper_model(model_name, compute_type=os.getenv('WHISPER_COMPUTE_TYPE', 'int8'))
+            else:
+                get_whisper_model(model_name)
+            return
+    except Exception as e:
+        print(f"⚠️ Whisper pre-warm failed (non-critical, will load on first use): {str(e)}")
+
+
+def get_registry_stats():
+    """Load times and memory for monitoring"""
+    return {
+        'pid': os.getpid(),
+        'processor_ready': _processor is not None and _processor_pid == os.getpid(),
+        'processors_built': _stats['processors_built'],
+        'processor_build_seconds': _stats['processor_build_seconds'],
+        'whisper_models': dict(_stats['whisper_models']),
+        'rss_mb': _current_rss_mb(),
+    }
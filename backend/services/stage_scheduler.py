@@ -0,0 +1,157 @@
+"""
+Stage scheduler for the network-bound first stages of a video request.
+
+A request used to run, one after another: YouTube captions (for the minute
+estimate), a yt-dlp probe for the duration (estimate again), then inside
+process() the captions (a cache hit by then) and a second yt-dlp probe for
+title/creator. Each is a round trip through the proxy, so latency was their sum.
+
+A StageScheduler belongs to one request. Stages are named and run at most once;
+every step that asks for a stage gets the same result (the minute estimate and
+process() both read 'transcript' and 'metadata'). With USE_PARALLEL_PROCESSING
+the first stages start together on a thread pool shared by the worker, so the
+request waits for the slowest stage instead of all of them. Without it a stage
+runs in the caller's thread the first time it is needed - sharing still applies.
+
+If a caller needs a stage the pool hasn't picked up yet, it runs the stage
+itself rather than wait in the queue.
+
+timings() reports when each stage started (relative to the request), how long
+it ran and how long callers were blocked waiting for it.
+
+Environment variables:
+    STAGE_POOL_SIZE - threads shared by all requests in a worker (default: 8)
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_stage_executor():
+    """Worker-wide pool (rebuilt after fork - threads don't survive it)"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('STAGE_POOL_SIZE', '8')),
+                    thread_name_prefix='stage'
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _parallel_enabled():
+    try:
+        from config import FeatureFlags
+        return FeatureFlags.USE_PARALLEL_PROCESSING
+    except ImportError:
+        return os.getenv('USE_PARALLEL_PROCESSING', 'false').lower() == 'true'
+
+
+class _Stage:
+    """One named unit of work; execute() runs it once, later calls return/raise the same outcome"""
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.lock = threading.Lock()
+        self.done = False
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.seconds = None
+        self.waited = 0.0
+
+    def execute(self):
+        with self.lock:
+            if not self.done:
+                self.started_at = time.perf_counter()
+                try:
+                    self.result = self.fn(*self.args, **self.kwargs)
+                except Exception as e:
+                    self.error = e
+                finally:
+                    self.seconds = time.perf_counter() - self.started_at
+                    self.done = True
+                    self.fn = self.args = self.kwargs = None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class StageScheduler:
+    """Named, run-once stages for one request, optionally started concurrently"""
+
+    def __init__(self, parallel=None):
+        self.parallel = _parallel_enabled() if parallel is None else parallel
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._created_at = time.perf_counter()
+
+    def start(self, name, fn, *args, **kwargs):
+        """Register a stage; in parallel mode it begins on the pool right away. No-op if already known."""
+        with self._lock:
+            if name in self._stages:
+                return
+            stage = self._stages[name] = _Stage(fn, args, kwargs)
+        if self.parallel:
+            # Failures are kept on the stage and re-raised to whoever asks for the result
+            get_stage_executor().submit(stage.execute)
+
+    def has(self, name):
+        return name in self._stages
+
+    def result(self, name):
+        """Wait for (or run) a registered stage -> its result; re-raises its exception"""
+        stage = self._stages[name]
+        waited_from = time.perf_counter()
+        try:
+            return stage.execute()
+        finally:
+            if stage.started_at is not None and stage.started_at < waited_from:
+                # Started elsewhere (pool or another caller) - the time we were blocked
+                stage.waited += time.perf_counter() - waited_from
+
+    def run(self, name, fn, *args, **kwargs):
+        """start() + result()"""
+        self.start(name, fn, *args, **kwargs)
+        return self.result(name)
+
+    @contextmanager
+    def timed(self, name):
+        """Time inline work (download, transcription, analysis) alongside the scheduled stages"""
+        stage = _Stage(None, (), {})
+        stage.started_at = time.perf_counter()
+        with self._lock:
+            self._stages.setdefault(name, stage)
+        try:
+            yield
+        finally:
+            stage.seconds = time.perf_counter() - stage.started_at
+            stage.done = True
+
+    def timings(self):
+        """{stage: {'started', 'seconds', 'waited'}} in seconds since the request began"""
+        with self._lock:
+            stages = list(self._stages.items())
+        report = {}
+        for name, stage in stages:
+            if stage.started_at is None:
+                continue  # Registered but never needed
+            report[name] = {
+                'started': round(stage.started_at - self._created_at, 3),
+                'seconds': round(stage.seconds, 3) if stage.seconds is not None else None,
+                'waited': round(stage.waited, 3),
+            }
+            if stage.error is not None:
+                report[name]['error'] = type(stage.error).__name__
+        return report
@@ -0,0 +1,313 @@
+"""
+Download strategy scoreboard: learn which yt-dlp player client works right now.
+
+download_video's strategies (player client x proxy/direct) used to run in a
+fixed order, with one hard-coded rule ("403 through the proxy -> go direct").
+Which client YouTube accepts changes week to week, so the fixed order kept
+spending timeouts on the one currently blocked.
+
+Every attempt is recorded per (platform, strategy, proxy|direct):
+- success or failure, with the failure class (bot_check, forbidden,
+  rate_limited, timeout, other). 'unavailable' (private/removed video) says
+  nothing about the strategy and isn't counted; cancelled race losers aren't
+  recorded at all
+- time to audio for successes (EWMA for ranking, recent samples for p50/p90)
+
+Counts decay exponentially (STRATEGY_HALF_LIFE_HOURS), so a client that was
+blocked yesterday and works today climbs back within a few requests.
+
+rank() orders a request's candidates by success probability. Time to audio
+only breaks ties: it grows with video length and failures don't have one, so
+it says little about the strategy itself. With USE_ADAPTIVE_STRATEGIES the
+probability is a Thompson sample from each strategy's Beta posterior - a
+bandit that mostly exploits the best strategy but still tries the others now
+and then, so it notices when they recover. Without it, rank() uses the
+posterior mean (deterministic) and only hedged downloads use it; the
+sequential path keeps its fixed order.
+
+The board is saved to a JSON file (at most every STRATEGY_SAVE_INTERVAL
+seconds) and loaded on start, so restarts and deploys don't forget. Workers
+share the file: a save takes a file lock, re-reads the file, adds only the
+observations this process made since its last save (decayed to now), writes
+the result and adopts it - so every worker also picks up what the others
+learned.
+
+Environment variables:
+    STRATEGY_SCOREBOARD_PATH  - JSON file (default: <tmp>/bs_detector_strategies.json)
+    STRATEGY_HALF_LIFE_HOURS  - observation half-life (default: 6)
+    STRATEGY_SAVE_INTERVAL    - seconds between saves (default: 30)
+    STRATEGY_DEFAULT_LATENCY  - assumed seconds to audio for an untried strategy (default: 30)
+"""
+import os
+import json
+import time
+import atexit
+import random
+import tempfile
+import threading
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines - saves are unlocked there
+    fcntl = None
+
+LATENCY_SAMPLES = 50  # Recent successes kept per strategy for p50/p90
+LATENCY_FLOOR = 2.0   # Seconds - keeps a lucky fast sample from dominating
+
+
+def classify_failure(error):
+    """Failure class of a download exception; 'unavailable' and 'cancelled' aren't the strategy's fault"""
+    text = str(error).lower()
+    if type(error).__name__ == 'DownloadCancelled' or 'finished first' in text:
+        return 'cancelled'
+    if 'private video' in text or 'video unavailable' in text or 'has been removed' in text or 'members-only' in text:
+        return 'unavailable'
+    if 'bot' in text or 'sign in' in text:
+        return 'bot_check'
+    if '403' in text or 'forbidden' in text:
+        return 'forbidden'
+    if '429' in text or 'too many requests' in text:
+        return 'rate_limited'
+    if 'timed out' in text or 'timeout' in text:
+        return 'timeout'
+    return 'other'
+
+
+def _key(platform, strategy, proxy):
+    return f"{platform or 'other'}|{strategy}|{'proxy' if proxy else 'direct'}"
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Score:
+    """Decayed outcome counts and latency for one (platform, strategy, proxy) key"""
+
+    def __init__(self):
+        self.successes = 0.0
+        self.failures = 0.0
+        self.failure_classes = {}
+        self.latency_ewma = None
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.updated_at = time.time()
+
+    def decay(self, now, half_life):
+        factor = 0.5 ** (max(0.0, now - self.updated_at) / half_life)
+        self.successes *= factor
+        self.failures *= factor
+        self.failure_classes = {name: weight * factor for name, weight in self.failure_classes.items()}
+        self.updated_at = now
+
+    def add(self, failure=None, seconds=None):
+        if failure is None:
+            self.successes += 1
+            if seconds is not None:
+                self.latencies.append(round(seconds, 2))
+                self.latency_ewma = seconds if self.latency_ewma is None else 0.7 * self.latency_ewma + 0.3 * seconds
+        else:
+            self.failures += 1
+            self.failure_classes[failure] = self.failure_classes.get(failure, 0.0) + 1
+
+    def absorb(self, delta, now, half_life):
+        """Add another process's unsaved observations (both decayed to now)"""
+        self.decay(now, half_life)
+        delta.decay(now, half_life)
+        self.successes += delta.successes
+        self.failures += delta.failures
+        for name, weight in delta.failure_classes.items():
+            self.failure_classes[name] = self.failure_classes.get(name, 0.0) + weight
+        self.latencies.extend(delta.latencies)
+        if delta.latency_ewma is not None:
+            self.latency_ewma = delta.latency_ewma if self.latency_ewma is None else 0.5 * (self.latency_ewma + delta.latency_ewma)
+
+    def to_dict(self):
+        return {
+            'successes': self.successes,
+            'failures': self.failures,
+            'failure_classes': self.failure_classes,
+            'latency_ewma': self.latency_ewma,
+            'latencies': list(self.latencies),
+            'updated_at': self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        score = cls()
+        score.successes = float(data.get('successes') or 0)
+        score.failures = float(data.get('failures') or 0)
+        score.failure_classes = {k: float(v) for k, v in (data.get('failure_classes') or {}).items()}
+        score.latency_ewma = data.get('latency_ewma')
+        score.latencies.extend(data.get('latencies') or [])
+        score.updated_at = float(data.get('updated_at') or time.time())
+        return score
+
+
+class StrategyScoreboard:
+    """Per-(platform, strategy, proxy) outcomes with decay, bandit ranking and file persistence"""
+
+    def __init__(self, path=None, half_life_hours=None, save_interval=None, default_latency=None):
+        self.path = path or os.getenv('STRATEGY_SCOREBOARD_PATH') or os.path.join(tempfile.gettempdir(), 'bs_detector_strategies.json')
+        self.half_life = 3600 * float(half_life_hours or os.getenv('STRATEGY_HALF_LIFE_HOURS', '6'))
+        self.save_interval = float(save_interval if save_interval is not None else os.getenv('STRATEGY_SAVE_INTERVAL', '30'))
+        self.default_latency = float(default_latency or os.getenv('STRATEGY_DEFAULT_LATENCY', '30'))
+        self._scores = {}
+        self._pending = {}  # key -> _Score of observations not yet written to the file
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saved_at = 0.0
+        self._scores = self._read_file()
+        if self._scores:
+            print(f"📈 Loaded download strategy scoreboard ({len(self._scores)} strategies)")
+
+    # -- persistence ----------------------------------------------------------
+
+    def _read_file(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {key: _Score.from_dict(value) for key, value in (data.get('strategies') or {}).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Couldn't load strategy scoreboard from {self.path} (non-critical): {str(e)}")
+            return {}
+
+    def save(self, force=False):
+        """Merge this process's new observations into the file and adopt the merged board
+
+        Runs at most every save_interval seconds and only with something new, unless forced.
+        """
+        with self._lock:
+            if not force and (not self._pending or time.time() - self._saved_at < self.save_interval):
+                return
+            self._saved_at = time.time()
+        with self._save_lock:
+            try:
+                lock_file = open(self.path + '.lock', 'a')
+            except Exception as e:
+                print(f"⚠️ Couldn't save strategy scoreboard (non-critical): {str(e)}")
+                return
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                with self._lock:
+                    pending, self._pending = self._pending, {}
+                now = time.time()
+                merged = self._read_file()
+                for key, delta in pending.items():
+                    merged.setdefault(key, _Score()).absorb(delta, now, self.half_life)
+                data = {'version': 1, 'strategies': {key: score.to_dict() for key, score in merged.items()}}
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.strategies-')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+                with self._lock:
+                    # Observations recorded while we were writing stay pending and apply on top
+                    for key, delta in self._pending.items():
+                        late = _Score.from_dict(delta.to_dict())
+                        merged.setdefault(key, _Score()).absorb(late, now, self.half_life)
+                    self._scores = merged
+            except Exception as e:
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending.setdefault(key, _Score()).absorb(delta, time.time(), self.half_life)
+                print(f"⚠️ Couldn't save strategy scoreboard (non-critical): {str(e)}")
+            finally:
+                lock_file.close()  # Releases the flock
+
+    # -- recording and ranking --------------------------------------------------
+
+    def record(self, platform, strategy, proxy, error=None, seconds=None):
+        """One attempt: error=None for a success (seconds = time to audio), else the exception"""
+        failure = classify_failure(error) if error is not None else None
+        if failure in ('cancelled', 'unavailable'):
+            return
+        now = time.time()
+        key = _key(platform, strategy, proxy)
+        with self._lock:
+            for board in (self._scores, self._pending):
+                score = board.setdefault(key, _Score())
+                score.decay(now, self.half_life)
+                score.add(failure, seconds)
+        self.save()
+
+    def _score(self, platform, candidate, explore, now):
+        """(success probability, -time to audio) - latency only breaks ties"""
+        score = self._scores.get(_key(platform, candidate['strategy_label'], candidate['proxy']))
+        successes = failures = 0.0
+        latency = self.default_latency
+        if score is not None:
+            factor = 0.5 ** (max(0.0, now - score.updated_at) / self.half_life)
+            successes, failures = score.successes * factor, score.failures * factor
+            if score.latency_ewma is not None:
+                latency = score.latency_ewma
+        if explore:
+            probability = random.betavariate(successes + 1, failures + 1)
+        else:
+            probability = (successes + 1) / (successes + failures + 2)
+        return probability, -max(latency, LATENCY_FLOOR)
+
+    def rank(self, platform, candidates, explore=None):
+        """Candidates (dicts with 'strategy_label' and 'proxy') best first; ties keep their order
+
+        explore: Thompson-sample instead of using the posterior mean
+        (default: USE_ADAPTIVE_STRATEGIES).
+        """
+        if explore is None:
+            explore = adaptive_strategies_enabled()
+        now = time.time()
+        with self._lock:
+            scores = [self._score(platform, candidate, explore, now) for candidate in candidates]
+        order = sorted(range(len(candidates)), key=lambda i: (-scores[i][0], -scores[i][1]))
+        return [candidates[i] for i in order]
+
+    def get_stats(self):
+        now = time.time()
+        stats = {}
+        with self._lock:
+            for key, score in self._scores.items():
+                factor = 0.5 ** (max(0.0, now - score.updated_at) / self.half_life)
+                successes, failures = score.successes * factor, score.failures * factor
+                stats[key] = {
+                    'successes': round(successes, 2),
+                    'failures': round(failures, 2),
+                    'success_rate': round((successes + 1) / (successes + failures + 2), 3),
+                    'failure_classes': {name: round(weight * factor, 2) for name, weight in score.failure_classes.items() if weight * factor >= 0.01},
+                    'p50_seconds': _percentile(score.latencies, 0.5) if score.latencies else None,
+                    'p90_seconds': _percentile(score.latencies, 0.9) if score.latencies else None,
+                }
+        return {'path': self.path, 'half_life_hours': self.half_life / 3600, 'strategies': stats}
+
+
+def adaptive_strategies_enabled():
+    try:
+        from config import FeatureFlags
+        return FeatureFlags.USE_ADAPTIVE_STRATEGIES
+    except ImportError:
+        return os.getenv('USE_ADAPTIVE_STRATEGIES', 'false').lower() == 'true'
+
+
+_scoreboard = None
+_scoreboard_lock = threading.Lock()
+
+
+def get_strategy_scoreboard():
+    """Process-wide scoreboard (loaded from STRATEGY_SCOREBOARD_PATH on first use)"""
+    global _scoreboard
+    if _scoreboard is None:
+        with _scoreboard_lock:
+            if _scoreboard is None:
+                _scoreboard = StrategyScoreboard()
+                atexit.register(lambda: _scoreboard and _scoreboard.save(force=True))
+    return _scoreboard
+
+
+def set_strategy_scoreboard(scoreboard):
+    """Replace the process-wide scoreboard (e.g. one with its own path for local runs)"""
+    global _scoreboard
+    with _scoreboard_lock:
+        _scoreboard = scoreboard
@@ -1,14 +1,176 @@
-from supabase import create_client, Client
+"""
+Supabase client management.
+
+get_supabase_client() used to call create_client() every time, and handlers call
+it several times per request - each call built fresh HTTP sessions, so every
+query paid a new TLS handshake to Supabase. Now each worker process keeps one
+service-role client whose PostgREST session is an httpx client with a bounded,
+keep-alive connection pool (httpx clients are thread-safe, so gthread workers
+share it).
+
+Fork safety: under gunicorn --preload the master may create a client before
+forking. The client remembers the pid that built it; a worker that inherits one
+drops it (without closing the parent's sockets) and builds its own.
+
+Flows that change the client's auth session (sign in/up/out) must not touch the
+shared client - use create_supabase_client() for those.
+
+Environment variables:
+    SUPABASE_POOL_SIZE        - max HTTP connections per worker (default: 20)
+    SUPABASE_POOL_KEEPALIVE   - idle keep-alive connections kept open (default: 10)
+    SUPABASE_KEEPALIVE_EXPIRY - seconds an idle connection is kept (default: 60)
+    SUPABASE_TIMEOUT          - request timeout in seconds (default: 30)
+    SUPABASE_CONNECT_TIMEOUT  - connect timeout in seconds (default: 5)
+"""
 import os
+import time
+import threading
 
-def get_supabase_client() -> Client:
-    """Get Supabase client instance - uses service role key for backend operations"""
+import httpx
+from supabase import create_client, Client, ClientOptions
+
+
+def _credentials():
     url = os.getenv('SUPABASE_URL')
     # Try SUPABASE_SERVICE_ROLE_KEY first (Railway), then SUPABASE_KEY (local dev)
     key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_KEY')
-    
+
     if not url or not key:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (or SUPABASE_KEY) must be set")
-    
+    return url, key
+
+
+def create_supabase_client() -> Client:
+    """A new, unshared client - for auth flows that store a user session on the client"""
+    url, key = _credentials()
     return create_client(url, key)
 
+
+class SupabaseClientManager:
+    """One pooled service-role client per process"""
+
+    def __init__(self, pool_size=None, keepalive=None, keepalive_expiry=None, timeout=None, connect_timeout=None):
+        self.pool_size = pool_size or int(os.getenv('SUPABASE_POOL_SIZE', '20'))
+        self.keepalive = keepalive or int(os.getenv('SUPABASE_POOL_KEEPALIVE', '10'))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', '60'))
+        self.timeout = timeout or float(os.getenv('SUPABASE_TIMEOUT', '30'))
+        self.connect_timeout = connect_timeout or float(os.getenv('SUPABASE_CONNECT_TIMEOUT', '5'))
+        self._client = None
+        self._client_pid = None
+        self._created_at = None
+        self._lock = threading.Lock()
+        self._stats = {'gets': 0, 'clients_created': 0, 'requests': 0, 'errors': 0, 'forks_detected': 0}
+
+    def get(self) -> Client:
+        pid = os.getpid()
+        client = self._client
+        if client is None or self._client_pid != pid:
+            with self._lock:
+                if self._client is None or self._client_pid != pid:
+                    if self._client is not None:
+                        # Inherited across fork - its sockets belong to the parent, so just drop it
+                        self._stats['forks_detected'] += 1
+                    self._client = self._build()
+                    self._client_pid = pid
+                    self._created_at = time.time()
+                    self._stats['clients_created'] += 1
+                client = self._client
+        self._count('gets')
+        return client
+
+    def _build(self):
+        url, key = _credentials()
+        options = ClientOptions(
+            postgrest_client_timeout=self.timeout,
+            storage_client_timeout=self.timeout,
+            auto_refresh_token=False,  # Service role - there is no user session to refresh
+            persist_session=False,
+        )
+        client = create_client(url, key, options=options)
+
+        # Swap the PostgREST session for one with our pool limits; same base URL and headers.
+        # Touching .postgrest here also builds it under the lock instead of racing on first use.
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = type(default_session)(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            follow_redirects=True,
+            event_hooks={'request': [self._on_request], 'response': [self._on_response]},
+        )
+        default_session.close()
+        return client
+
+    def _on_request(self, request):
+        self._count('requests')
+
+    def _on_response(self, response):
+        if response.status_code >= 500:
+            self._count('errors')
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _open_connections(self):
+        """Connections currently held by the pool (httpcore internals - best effort)"""
+        try:
+            pool = self._client.postgrest.session._transport._pool
+            connections = list(pool.connections)
+            return {
+                'open': len(connections),
+                'idle': sum(1 for c in connections if c.is_idle()),
+            }
+        except Exception:
+            return None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        active = self._client is not None and self._client_pid == os.getpid()
+        stats.update({
+            'pid': os.getpid(),
+            'client_ready': active,
+            'client_age_seconds': round(time.time() - self._created_at, 1) if active else None,
+            'connections': self._open_connections() if active else None,
+            'pool_size': self.pool_size,
+            'keepalive_connections': self.keepalive,
+            'timeout_seconds': self.timeout,
+            'connect_timeout_seconds': self.connect_timeout,
+        })
+        return stats
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_client_manager():
+    """Process-wide client manager"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SupabaseClientManager()
+    return _manager
+
+
+def set_client_manager(manager):
+    """Replace the process-wide manager (e.g. one with different pool limits)"""
+    global _manager
+    with _manager_lock:
+        _manager = manager
+
+
+def get_supabase_client() -> Client:
+    """Get Supabase client instance - uses service role key for backend operations
+
+    Shared by every request in this worker; don't sign in/out with it (see create_supabase_client).
+    """
+    return get_client_manager().get()
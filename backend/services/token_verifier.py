@@ -0,0 +1,271 @@
+"""
+Local verification of Supabase access tokens.
+
+verify_token used to call supabase.auth.get_user(token) on every authenticated
+request - a ~100ms round trip before any handler ran. Supabase access tokens
+are ordinary JWTs, so they can be checked locally instead:
+
+- HS256 tokens against the project's JWT secret (SUPABASE_JWT_SECRET)
+- RS256/ES256 tokens against the project's JWKS
+  ({SUPABASE_URL}/auth/v1/.well-known/jwks.json), cached in memory and
+  refreshed on a background thread; an unknown `kid` triggers an immediate
+  (rate-limited) refresh so key rotation doesn't lock anyone out
+
+Decoded claims are cached by token hash (never the raw token) for a short TTL,
+capped at the token's own expiry, so repeat requests cost a dict lookup.
+
+A locally verified token is not checked for revocation (sign-out, deleted
+user) until it expires. Routes where that matters use
+@verify_token(strict=True), which still asks Supabase.
+
+Environment variables:
+    SUPABASE_JWT_SECRET    - HS256 secret (Project Settings -> API -> JWT Secret)
+    SUPABASE_JWKS_URL      - override the JWKS location
+    SUPABASE_JWT_AUDIENCE  - expected `aud` (default: authenticated)
+    SUPABASE_JWT_ISSUER    - expected `iss` (default: {SUPABASE_URL}/auth/v1)
+    JWKS_REFRESH_SECONDS   - background JWKS refresh interval (default: 600)
+    JWT_LEEWAY_SECONDS     - clock skew allowed on exp/iat (default: 10)
+    AUTH_CLAIMS_CACHE_TTL  - seconds decoded claims are reused (default: 60)
+    AUTH_CLAIMS_CACHE_SIZE - cached tokens per process (default: 1024)
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import jwt
+import requests
+
+HMAC_ALGORITHMS = ('HS256',)
+ASYMMETRIC_ALGORITHMS = ('RS256', 'ES256')
+# Don't hammer the JWKS endpoint when tokens with unknown kids arrive
+MIN_JWKS_REFETCH_SECONDS = 30
+
+
+class TokenVerificationError(Exception):
+    """Token rejected locally; `fallback` means we couldn't decide and Supabase should be asked"""
+
+    def __init__(self, message, fallback=False):
+        super().__init__(message)
+        self.fallback = fallback
+
+
+class TokenUser:
+    """The parts of a Supabase User that handlers read, built from token claims"""
+
+    def __init__(self, claims):
+        self.id = claims.get('sub')
+        self.email = claims.get('email')
+        self.phone = claims.get('phone')
+        self.role = claims.get('role')
+        self.aud = claims.get('aud')
+        self.app_metadata = claims.get('app_metadata') or {}
+        self.user_metadata = claims.get('user_metadata') or {}
+        self.claims = claims
+
+    def __repr__(self):
+        return f"TokenUser(id={self.id!r}, email={self.email!r})"
+
+
+class JWKSCache:
+    """Project signing keys by kid, refreshed periodically in the background"""
+
+    def __init__(self, url, interval=None, timeout=5):
+        self.url = url
+        self.interval = interval or int(os.getenv('JWKS_REFRESH_SECONDS', '600'))
+        self.timeout = timeout
+        self._keys = {}
+        self._fetched_at = 0
+        self._last_error = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def refresh(self):
+        """Fetch the key set now -> number of usable keys"""
+        with self._fetch_lock:
+            try:
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                keys = {}
+                for key in jwt.PyJWKSet.from_dict(response.json()).keys:
+                    if key.key_id:
+                        keys[key.key_id] = key
+                with self._lock:
+                    self._keys = keys
+                    self._fetched_at = time.time()
+                    self._last_error = None
+                return len(keys)
+            except Exception as e:
+                with self._lock:
+                    # Keep serving the previous keys; only note when we last tried
+                    self._fetched_at = time.time()
+                    self._last_error = str(e)[:200]
+                print(f"⚠️ JWKS refresh failed (non-critical): {str(e)[:100]}")
+                return 0
+
+    def get_key(self, kid):
+        self.ensure_started()
+        with self._lock:
+            key = self._keys.get(kid)
+            fetched_at = self._fetched_at
+        if key is None and time.time() - fetched_at >= MIN_JWKS_REFETCH_SECONDS:
+            # Unknown kid: probably a rotation - refetch once instead of waiting for the timer
+            self.refresh()
+            with self._lock:
+                key = self._keys.get(kid)
+        return key
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def ensure_started(self):
+        """Start the refresh thread if it isn't running in this process (threads don't survive fork)"""
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='jwks-refresh', daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self):
+        with self._lock:
+            age = round(time.time() - self._fetched_at, 1) if self._fetched_at else None
+            return {
+                'url': self.url,
+                'keys': sorted(self._keys),
+                'age_seconds': age,
+                'last_error': self._last_error,
+            }
+
+
+class TokenVerifier:
+    """Verifies access tokens locally and caches the decoded claims"""
+
+    def __init__(self, jwt_secret=None, jwks_url=None, issuer=None, audience=None,
+                 leeway=None, cache_ttl=None, cache_size=None):
+        self.jwt_secret = jwt_secret
+        self.jwks = JWKSCache(jwks_url) if jwks_url else None
+        self.issuer = issuer
+        self.audience = audience or os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated')
+        self.leeway = leeway if leeway is not None else int(os.getenv('JWT_LEEWAY_SECONDS', '10'))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else int(os.getenv('AUTH_CLAIMS_CACHE_TTL', '60'))
+        self.cache_size = cache_size or int(os.getenv('AUTH_CLAIMS_CACHE_SIZE', '1024'))
+        self._cache = OrderedDict()  # sha256(token) -> (claims, cache expiry)
+        self._lock = threading.Lock()
+        self._stats = {'cache_hits': 0, 'verified': 0, 'rejected': 0, 'fallbacks': 0}
+
+    def verify(self, token):
+        """Token -> decoded claims, or raise TokenVerificationError"""
+        cache_key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached and cached[1] > now:
+                self._cache.move_to_end(cache_key)
+                self._stats['cache_hits'] += 1
+                return cached[0]
+
+        try:
+            claims = self._decode(token)
+        except TokenVerificationError as e:
+            self._count('fallbacks' if e.fallback else 'rejected')
+            raise
+
+        expires_at = min(now + self.cache_ttl, float(claims.get('exp', now)))
+        with self._lock:
+            self._cache[cache_key] = (claims, expires_at)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._stats['verified'] += 1
+        return claims
+
+    def _decode(self, token):
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f'Malformed token: {e}')
+
+        algorithm = header.get('alg')
+        if algorithm in HMAC_ALGORITHMS:
+            if not self.jwt_secret:
+                raise TokenVerificationError('SUPABASE_JWT_SECRET not configured', fallback=True)
+            key = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            if not self.jwks:
+                raise TokenVerificationError('JWKS URL not configured', fallback=True)
+            jwk = self.jwks.get_key(header.get('kid'))
+            if jwk is None:
+                raise TokenVerificationError(f"Unknown signing key {header.get('kid')!r}", fallback=True)
+            key = jwk.key
+        else:
+            raise TokenVerificationError(f'Unsupported token algorithm {algorithm!r}')
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options={'require': ['exp', 'sub'], 'verify_iss': bool(self.issuer)},
+            )
+        except jwt.ExpiredSignatureError:
+            raise TokenVerificationError('Token has expired')
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f'Invalid token: {e}')
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_tokens'] = len(self._cache)
+        stats['hmac_configured'] = bool(self.jwt_secret)
+        stats['jwks'] = self.jwks.get_stats() if self.jwks else None
+        return stats
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier():
+    """Process-wide verifier configured from the environment"""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                supabase_url = (os.getenv('SUPABASE_URL') or '').rstrip('/')
+                jwks_url = os.getenv('SUPABASE_JWKS_URL') or (
+                    f'{supabase_url}/auth/v1/.well-known/jwks.json' if supabase_url else None
+                )
+                _verifier = TokenVerifier(
+                    jwt_secret=os.getenv('SUPABASE_JWT_SECRET'),
+                    jwks_url=jwks_url,
+                    issuer=os.getenv('SUPABASE_JWT_ISSUER') or (f'{supabase_url}/auth/v1' if supabase_url else None),
+                )
+    return _verifier
+
+
+def set_token_verifier(verifier):
+    """Replace the process-wide verifier (e.g. one with a fixed test secret)"""
+    global _verifier
+    with _verifier_lock:
+        _verifier = verifier
@@ -0,0 +1,302 @@
+"""
+Transcript cache keyed by (platform, canonical video id, language).
+
+`youtu.be/X`, `watch?v=X&t=30`, `m.youtube.com/watch?v=X` and `shorts/X` all
+resolve to ('youtube', 'X'), so repeat submissions of the same video skip
+YouTube captions and Whisper entirely, whichever URL form was pasted.
+
+Two tiers:
+- an in-process LRU (per gunicorn worker) for hot videos
+- a persistent Supabase table (`transcript_cache`, see
+  database/migrations/add_transcript_cache.sql) shared by all workers
+
+Entries carry text, timestamped segments and whatever metadata was known
+(title, duration, creator) so a full hit can skip the metadata probe too.
+With USE_BLOB_STORAGE, text and segments are stored as compressed blobs shared
+with the videos rows (services/blob_store.py).
+With USE_GLOBAL_CACHE, a persistent miss also checks older `videos` rows for
+the same canonical id (transcripts saved before this table existed).
+
+Environment variables:
+    TRANSCRIPT_CACHE_SIZE     - LRU entries per process (default: 128)
+    TRANSCRIPT_CACHE_PERSIST  - use the Supabase tier (default: true)
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+YOUTUBE_ID = r'[0-9A-Za-z_-]{11}'
+
+_YOUTUBE_PATTERNS = [
+    re.compile(rf'youtu\.be/({YOUTUBE_ID})'),
+    re.compile(rf'youtube(?:-nocookie)?\.com/(?:shorts|embed|live|v)/({YOUTUBE_ID})'),
+]
+_INSTAGRAM_PATTERN = re.compile(r'instagram\.com/(?:[^/]+/)?(?:reel|reels|p|tv)/([0-9A-Za-z_-]+)')
+
+# Fields stored alongside the transcript
+METADATA_FIELDS = ('title', 'duration_minutes', 'creator_info')
+
+
+def canonical_video_key(video_url):
+    """(platform, canonical id) for a video URL, or (None, None) if unrecognized"""
+    if not video_url:
+        return None, None
+    url = video_url.strip()
+
+    if 'youtube' in url or 'youtu.be' in url:
+        parsed = urlparse(url if '://' in url else f'https://{url}')
+        video_ids = parse_qs(parsed.query).get('v')
+        if video_ids and re.fullmatch(YOUTUBE_ID, video_ids[0]):
+            return 'youtube', video_ids[0]
+        for pattern in _YOUTUBE_PATTERNS:
+            match = pattern.search(url)
+            if match:
+                return 'youtube', match.group(1)
+        return None, None
+
+    match = _INSTAGRAM_PATTERN.search(url)
+    if match:
+        return 'instagram', match.group(1)
+
+    if re.fullmatch(YOUTUBE_ID, url):
+        return 'youtube', url
+    return None, None
+
+
+class TranscriptCache:
+    """LRU tier in front of a persistent Supabase tier"""
+
+    def __init__(self, max_entries=None, persist=None):
+        self.max_entries = max_entries or int(os.getenv('TRANSCRIPT_CACHE_SIZE', '128'))
+        self.persist = persist if persist is not None else os.getenv('TRANSCRIPT_CACHE_PERSIST', 'true').lower() == 'true'
+        # (platform, video_id) -> {language: entry}
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'persistent_hits': 0, 'legacy_hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+
+    # -- LRU tier -------------------------------------------------------------
+
+    def _memory_get(self, key, language):
+        with self._lock:
+            languages = self._lru.get(key)
+            if not languages:
+                return None
+            self._lru.move_to_end(key)
+            return _pick_language(languages, language)
+
+    def _memory_put(self, key, entry):
+        with self._lock:
+            languages = self._lru.setdefault(key, {})
+            languages[entry['language']] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    # -- persistent tier ------------------------------------------------------
+
+    def _persistent_get(self, key, language):
+        from services.supabase_client import get_supabase_client
+        from services.blob_store import hydrate_rows, payload_columns
+        platform, video_id = key
+        query = get_supabase_client().table('transcript_cache') \
+            .select(payload_columns('platform, video_id, language, transcription, segments, title, duration_minutes, creator_info, source')) \
+            .eq('platform', platform).eq('video_id', video_id)
+        if language:
+            query = query.eq('language', language)
+        rows = query.execute().data or []
+        if not rows:
+            return None
+        rows = [row for row in hydrate_rows(rows) if row.get('transcription')]
+        if not rows:
+            return None
+        return _pick_language({row['language']: _row_to_entry(row) for row in rows}, language)
+
+    def _persistent_put(self, entry):
+        from services.supabase_client import get_supabase_client
+        from services.blob_store import blob_storage_enabled, store_payload
+        row = {
+            'platform': entry['platform'],
+            'video_id': entry['video_id'],
+            'language': entry['language'],
+            'transcription': entry['text'],
+            'segments': entry.get('segments') or [],
+            'title': entry.get('title'),
+            'duration_minutes': entry.get('duration_minutes'),
+            'creator_info': entry.get('creator_info'),
+            'source': entry.get('source'),
+        }
+        if blob_storage_enabled():
+            # Shared with the videos rows for the same transcript (services/blob_store.py)
+            row.update(store_payload(entry['text'], entry.get('segments')))
+            row['transcription'] = None
+            row['segments'] = []
+        get_supabase_client().table('transcript_cache').upsert(row, on_conflict='platform,video_id,language').execute()
+
+    def _legacy_get(self, key):
+        """Transcript from an older `videos` row for the same canonical id"""
+        from services.supabase_client import get_supabase_client
+        from services.blob_store import hydrate_video, payload_columns
+        platform, video_id = key
+        rows = get_supabase_client().table('videos') \
+            .select(payload_columns('video_url', 'transcription', 'title', 'duration_minutes')) \
+            .ilike('video_url', f'%{video_id}%') \
+            .order('created_at', desc=True).limit(5).execute().data or []
+        for row in rows:
+            if canonical_video_key(row['video_url']) != key:
+                continue
+            hydrate_video(row)
+            if row.get('transcription'):
+                return {
+                    'platform': platform,
+                    'video_id': video_id,
+                    'language': 'en',
+                    'text': row['transcription'],
+                    'segments': row.get('transcript_segments') or [],
+                    'title': row.get('title'),
+                    'duration_minutes': float(row['duration_minutes']) if row.get('duration_minutes') else None,
+                    'creator_info': None,
+                    'source': 'videos',
+                }
+        return None
+
+    # -- public API -----------------------------------------------------------
+
+    def get(self, video_url, language=None):
+        """Cached entry for a URL (any URL form of the same video) or None"""
+        key = canonical_video_key(video_url)
+        if key[0] is None:
+            return None
+
+        entry = self._memory_get(key, language)
+        if entry:
+            self._count('memory_hits')
+            return entry
+
+        if self.persist:
+            try:
+                entry = self._persistent_get(key, language)
+                if entry:
+                    self._count('persistent_hits')
+                elif _legacy_lookup_enabled():
+                    entry = self._legacy_get(key)
+                    if entry:
+                        self._count('legacy_hits')
+                        self._safe_persist(entry)
+            except Exception as e:
+                self._count('errors')
+                print(f"⚠️ Transcript cache lookup failed (non-critical): {str(e)[:200]}")
+                entry = None
+
+        if entry:
+            self._memory_put(key, entry)
+            print(f"✅ Transcript cache hit for {key[0]}:{key[1]} ({len(entry['text'])} chars, {entry.get('source') or 'cache'})")
+            return entry
+
+        self._count('misses')
+        return None
+
+    def put(self, video_url, text, segments=None, language='en', source=None, **metadata):
+        """Store (or enrich) the transcript for a URL; metadata fields that are None keep existing values"""
+        key = canonical_video_key(video_url)
+        if key[0] is None or not text:
+            return None
+
+        existing = self._memory_get(key, language or 'en')
+        entry = dict(existing) if existing and existing['language'] == (language or 'en') else {}
+        entry.update({
+            'platform': key[0],
+            'video_id': key[1],
+            'language': language or 'en',
+            'text': text,
+            'segments': segments or entry.get('segments') or [],
+            'source': source or entry.get('source'),
+        })
+        for field in METADATA_FIELDS:
+            if metadata.get(field) is not None:
+                entry[field] = metadata[field]
+            else:
+                entry.setdefault(field, None)
+
+        if existing == entry:
+            return entry
+        self._memory_put(key, entry)
+        self._safe_persist(entry)
+        return entry
+
+    def invalidate(self, video_url):
+        key = canonical_video_key(video_url)
+        with self._lock:
+            self._lru.pop(key, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._lru)
+        stats['max_entries'] = self.max_entries
+        stats['persistent'] = self.persist
+        return stats
+
+    def _safe_persist(self, entry):
+        if not self.persist:
+            return
+        try:
+            self._persistent_put(entry)
+            self._count('writes')
+        except Exception as e:
+            self._count('errors')
+            print(f"⚠️ Transcript cache write failed (non-critical): {str(e)[:200]}")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _pick_language(languages, language):
+    if language:
+        return languages.get(language)
+    return languages.get('en') or next(iter(languages.values()), None)
+
+
+def _row_to_entry(row):
+    return {
+        'platform': row['platform'],
+        'video_id': row['video_id'],
+        'language': row['language'],
+        'text': row['transcription'],
+        'segments': row.get('segments') or row.get('transcript_segments') or [],
+        'title': row.get('title'),
+        'duration_minutes': float(row['duration_minutes']) if row.get('duration_minutes') is not None else None,
+        'creator_info': row.get('creator_info'),
+        'source': row.get('source'),
+    }
+
+
+def _legacy_lookup_enabled():
+    try:
+        from config import FeatureFlags
+        return FeatureFlags.USE_GLOBAL_CACHE
+    except ImportError:
+        return os.getenv('USE_GLOBAL_CACHE', 'false').lower() == 'true'
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """Process-wide transcript cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranscriptCache()
+    return _cache
+
+
+def set_transcript_cache(cache):
+    """Replace the process-wide cache (e.g. one with persist=False for local runs)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
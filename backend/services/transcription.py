@@ -0,0 +1,448 @@
+"""
+Local Whisper transcription engine with chunked, multi-process decoding.
+
+`model.transcribe()` on a whole file is a single-threaded pass, so long videos
+take many times real time on CPU-only torch. This engine:
+
+1. decodes the audio once (16 kHz mono float32, via whisper/ffmpeg)
+2. splits it into ~WHISPER_CHUNK_SECONDS chunks, cutting at the quietest frame
+   near each target boundary so words aren't split (deterministic for a given file)
+3. transcribes chunks in a persistent process pool (one model copy per worker)
+4. stitches segments back together with global timestamps
+
+Segments use the same {'start', 'duration', 'text'} shape as get_youtube_transcript.
+
+Backends (tried in order, falling back to the next on failure):
+    openai-api      - OpenAI whisper-1 API (only when USE_OPENAI_WHISPER is on)
+    faster-whisper  - CTranslate2 int8 on CPU (if faster-whisper is installed)
+    openai-whisper  - local openai-whisper, chunked as above
+
+With use_vad (USE_VAD flag) non-speech is cut first (services/vad.py) and
+segment timestamps are mapped back onto the original timeline.
+
+Environment variables:
+    TRANSCRIPTION_BACKENDS - comma-separated preference order (default: see above)
+    WHISPER_MODEL_POLICY   - model size by audio duration, e.g. "1200:small,3600:base,inf:tiny"
+    WHISPER_WORKERS        - worker processes; 1 = single in-process pass (default: 1)
+    WHISPER_CHUNK_SECONDS  - target chunk length (default: 120)
+    WHISPER_SPLIT_SEARCH_SECONDS - window either side of a boundary searched for silence (default: 5)
+"""
+import os
+import json
+import time
+import threading
+import subprocess
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+# Per-worker-process model (set by _init_worker)
+_worker_model = None
+
+
+def get_worker_count():
+    return max(1, int(os.getenv('WHISPER_WORKERS', '1')))
+
+
+def load_audio(audio_path):
+    """Decode any ffmpeg-readable file to 16 kHz mono float32"""
+    import whisper
+    return whisper.load_audio(audio_path)
+
+
+def _frame_energy(audio, frame_samples):
+    import numpy as np
+    usable = (len(audio) // frame_samples) * frame_samples
+    if usable == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:usable].reshape(-1, frame_samples)
+    return np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+
+def find_chunk_boundaries(audio, chunk_seconds=None, search_seconds=None, sample_rate=SAMPLE_RATE):
+    """Split points (start, end) in samples, cut at the quietest frame near each target.
+
+    Pure function of the audio samples, so the same file always yields the same chunks.
+    """
+    import numpy as np
+
+    chunk_seconds = chunk_seconds or float(os.getenv('WHISPER_CHUNK_SECONDS', '120'))
+    search_seconds = search_seconds if search_seconds is not None else float(os.getenv('WHISPER_SPLIT_SEARCH_SECONDS', '5'))
+
+    total = len(audio)
+    chunk_samples = int(chunk_seconds * sample_rate)
+    if total <= chunk_samples * 1.5:
+        return [(0, total)]
+
+    frame_samples = int(FRAME_SECONDS * sample_rate)
+    energy = _frame_energy(audio, frame_samples)
+    search_frames = int(search_seconds / FRAME_SECONDS)
+
+    boundaries = []
+    start = 0
+    while total - start > chunk_samples * 1.5:
+        target_frame = (start + chunk_samples) // frame_samples
+        lo = max(target_frame - search_frames, start // frame_samples + 1)
+        hi = min(target_frame + search_frames, len(energy) - 1)
+        if hi <= lo:
+            cut_frame = target_frame
+        else:
+            # argmin returns the first minimum, which keeps ties deterministic
+            cut_frame = lo + int(np.argmin(energy[lo:hi + 1]))
+        cut = cut_frame * frame_samples
+        boundaries.append((start, cut))
+        start = cut
+    boundaries.append((start, total))
+    return boundaries
+
+
+def _init_worker(model_name, threads):
+    """Load the model once per pool process"""
+    global _worker_model
+    import torch
+    import whisper
+    torch.set_num_threads(max(1, threads))
+    _worker_model = whisper.load_model(model_name)
+
+
+def _transcribe_array(model, audio, offset_seconds, language=None):
+    result = model.transcribe(audio, fp16=False, language=language)
+    segments = []
+    for seg in result.get('segments', []):
+        text = seg.get('text', '').strip()
+        if not text:
+            continue
+        start = round(float(seg['start']) + offset_seconds, 3)
+        end = round(float(seg['end']) + offset_seconds, 3)
+        segments.append({'start': start, 'duration': round(max(0.0, end - start), 3), 'text': text})
+    return {'segments': segments, 'language': result.get('language', 'en')}
+
+
+def _transcribe_chunk(task):
+    index, offset_seconds, audio, language = task
+    result = _transcribe_array(_worker_model, audio, offset_seconds, language)
+    result['index'] = index
+    return result
+
+
+def _get_pool(workers, model_name):
+    """Persistent pool so workers load the model once, not once per video"""
+    global _pool, _pool_key
+    key = (workers, model_name, os.getpid())
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None and _pool_key[2] == os.getpid():
+                _pool.shutdown(wait=False)
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(model_name, threads),
+            )
+            _pool_key = key
+            print(f"🧵 Whisper pool started: {workers} workers x {threads} threads ('{model_name}')")
+        return _pool
+
+
+def _stitch(results):
+    """Merge per-chunk results (already in chunk order) into one transcript"""
+    segments = []
+    language_seconds = {}
+    for result in results:
+        segments.extend(result['segments'])
+        speech = sum(s['duration'] for s in result['segments'])
+        language_seconds[result['language']] = language_seconds.get(result['language'], 0) + speech
+    language = max(language_seconds, key=language_seconds.get) if language_seconds else 'en'
+    return {
+        'text': ' '.join(s['text'] for s in segments),
+        'segments': segments,
+        'language': language,
+    }
+
+
+def transcribe_serial(audio, model, language=None, lock=None):
+    """Single pass over the whole audio in this process"""
+    if lock is not None:
+        with lock:
+            result = _transcribe_array(model, audio, 0.0, language)
+    else:
+        result = _transcribe_array(model, audio, 0.0, language)
+    return _stitch([result])
+
+
+def transcribe_chunked(audio, workers, model_name, chunk_seconds=None, language=None):
+    """Transcribe silence-aligned chunks across a process pool and stitch the result"""
+    boundaries = find_chunk_boundaries(audio, chunk_seconds=chunk_seconds)
+    tasks = [
+        (i, start / SAMPLE_RATE, audio[start:end], language)
+        for i, (start, end) in enumerate(boundaries)
+    ]
+    print(f"✂️ Split {len(audio) / SAMPLE_RATE:.0f}s of audio into {len(tasks)} chunks for {workers} workers")
+    pool = _get_pool(workers, model_name)
+    results = sorted(pool.map(_transcribe_chunk, tasks), key=lambda r: r['index'])
+    return _stitch(results)
+
+
+def transcribe_file(audio_path, model_name=None, workers=None, language=None):
+    """Transcribe a file with local Whisper -> {'text', 'segments', 'language'}"""
+    from services.processor_registry import get_whisper_model, get_whisper_lock, DEFAULT_WHISPER_MODEL
+
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    workers = workers or get_worker_count()
+    audio = load_audio(audio_path)
+
+    if workers > 1 and multiprocessing.current_process().daemon:
+        # Daemonic processes can't have children - transcribe in this process instead
+        print("⚠️ Running in a daemonic process - transcribing chunks serially")
+        workers = 1
+
+    chunk_samples = float(os.getenv('WHISPER_CHUNK_SECONDS', '120')) * SAMPLE_RATE
+    if workers > 1 and len(audio) > chunk_samples * 1.5:
+        return transcribe_chunked(audio, workers, model_name, language=language)
+
+    return transcribe_serial(audio, get_whisper_model(model_name), language=language, lock=get_whisper_lock())
+
+
+def probe_duration(audio_path):
+    """Audio duration in seconds via ffprobe (None if unavailable)"""
+    try:
+        output = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', audio_path],
+            capture_output=True, text=True, timeout=30
+        ).stdout
+        return float(json.loads(output)['format']['duration'])
+    except Exception:
+        return None
+
+
+def parse_model_policy(policy):
+    """"600:small,3600:base,inf:tiny" -> [(600.0, 'small'), (3600.0, 'base'), (inf, 'tiny')]"""
+    rules = []
+    for part in policy.split(','):
+        if ':' not in part:
+            continue
+        limit, model = part.split(':', 1)
+        rules.append((float(limit.strip()), model.strip()))
+    return sorted(rules)
+
+
+def choose_model_size(duration_seconds, policy):
+    """Largest model the policy allows for this duration (longer audio -> smaller model)"""
+    rules = parse_model_policy(os.getenv('WHISPER_MODEL_POLICY') or policy)
+    if not rules:
+        return None
+    if duration_seconds is None:
+        # Unknown length: be conservative and use the policy's middle entry
+        return rules[len(rules) // 2][1]
+    for limit, model in rules:
+        if duration_seconds <= limit:
+            return model
+    return rules[-1][1]
+
+
+class TranscriptionBackend:
+    """Interface for speech-to-text engines used by VideoProcessor.transcribe_audio_detailed"""
+
+    name = None
+    # Default model-size policy keyed on audio duration (seconds)
+    model_policy = None
+
+    def is_available(self):
+        return True
+
+    def transcribe(self, audio_path, model_size, duration_seconds):
+        """Return {'text', 'segments', 'language'}"""
+        raise NotImplementedError
+
+
+class OpenAIAPIBackend(TranscriptionBackend):
+    """Hosted whisper-1 - fastest wall time, billed per minute"""
+
+    name = 'openai-api'
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def is_available(self):
+        return self.client is not None and bool(os.getenv('OPENAI_API_KEY'))
+
+    def transcribe(self, audio_path, model_size, duration_seconds):
+        with open(audio_path, 'rb') as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                model='whisper-1',
+                file=audio_file,
+                language='en',
+                response_format='verbose_json'
+            )
+        segments = []
+        for seg in getattr(transcript, 'segments', None) or []:
+            start = float(seg['start'] if isinstance(seg, dict) else seg.start)
+            end = float(seg['end'] if isinstance(seg, dict) else seg.end)
+            text = (seg['text'] if isinstance(seg, dict) else seg.text).strip()
+            if text:
+                segments.append({'start': round(start, 3), 'duration': round(max(0.0, end - start), 3), 'text': text})
+        return {'text': transcript.text, 'segments': segments, 'language': 'en'}
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 engine with int8 weights - several times faster than fp32 torch on CPU"""
+
+    name = 'faster-whisper'
+    model_policy = '1200:small,3600:base,inf:tiny'
+
+    def is_available(self):
+        try:
+            import faster_whisper  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def transcribe(self, audio_path, model_size, duration_seconds):
+        from services.processor_registry import get_faster_whisper_model, get_whisper_lock
+
+        model = get_faster_whisper_model(model_size, compute_type=os.getenv('WHISPER_COMPUTE_TYPE', 'int8'))
+        with get_whisper_lock():
+            seg_iter, info = model.transcribe(audio_path, beam_size=1)
+            segments = []
+            for seg in seg_iter:
+                text = seg.text.strip()
+                if text:
+                    segments.append({
+                        'start': round(seg.start, 3),
+                        'duration': round(max(0.0, seg.end - seg.start), 3),
+                        'text': text
+                    })
+        return {
+            'text': ' '.join(s['text'] for s in segments),
+            'segments': segments,
+            'language': getattr(info, 'language', None) or 'en',
+        }
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """openai-whisper on torch CPU, chunked across WHISPER_WORKERS processes"""
+
+    name = 'openai-whisper'
+    model_policy = '3600:base,inf:tiny'
+
+    def is_available(self):
+        try:
+            import whisper  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def transcribe(self, audio_path, model_size, duration_seconds):
+        return transcribe_file(audio_path, model_name=model_size)
+
+
+TRANSCRIPTION_BACKENDS = {
+    'openai-api': OpenAIAPIBackend,
+    'faster-whisper': FasterWhisperBackend,
+    'openai-whisper': LocalWhisperBackend,
+}
+
+# Recent real-time factors per backend (processing seconds / audio seconds)
+_rtf_history = {}
+_rtf_lock = threading.Lock()
+
+
+def _record_rtf(backend_name, model_size, rtf):
+    with _rtf_lock:
+        history = _rtf_history.setdefault(f"{backend_name}:{model_size}", deque(maxlen=50))
+        history.append(rtf)
+
+
+def get_transcription_stats():
+    """Average/last real-time factor per backend+model for monitoring"""
+    with _rtf_lock:
+        return {
+            key: {
+                'jobs': len(values),
+                'avg_rtf': round(sum(values) / len(values), 3),
+                'last_rtf': round(values[-1], 3),
+            }
+            for key, values in _rtf_history.items() if values
+        }
+
+
+def get_backend_order(use_openai_api=False):
+    """Backend names in preference order"""
+    configured = os.getenv('TRANSCRIPTION_BACKENDS')
+    if configured:
+        return [name.strip() for name in configured.split(',') if name.strip()]
+    order = ['faster-whisper', 'openai-whisper']
+    if use_openai_api:
+        order.insert(0, 'openai-api')
+    return order
+
+
+def _strip_silence(audio_path):
+    """VAD pre-pass -> (path to transcribe, TimeMap, vad stats); never fatal"""
+    from services.vad import strip_silence, TimeMap
+    try:
+        return strip_silence(audio_path)
+    except Exception as e:
+        print(f"⚠️ VAD pre-pass failed (non-critical, transcribing full audio): {str(e)[:200]}")
+        return audio_path, TimeMap(), None
+
+
+def transcribe(audio_path, openai_client=None, use_openai_api=False, use_vad=False):
+    """Transcribe with the first working backend -> {'text', 'segments', 'language', 'stats'}"""
+    original_duration = probe_duration(audio_path)
+    time_map = None
+    vad_stats = None
+    if use_vad:
+        audio_path, time_map, vad_stats = _strip_silence(audio_path)
+    # Model size and RTF follow the audio Whisper actually decodes
+    duration = vad_stats['speech_seconds'] if vad_stats and vad_stats['applied'] else original_duration
+    last_error = None
+
+    for name in get_backend_order(use_openai_api):
+        backend_class = TRANSCRIPTION_BACKENDS.get(name)
+        if backend_class is None:
+            print(f"⚠️ Unknown transcription backend '{name}' - skipping")
+            continue
+        backend = backend_class(openai_client) if backend_class is OpenAIAPIBackend else backend_class()
+        if not backend.is_available():
+            continue
+
+        model_size = choose_model_size(duration, backend.model_policy) if backend.model_policy else 'whisper-1'
+        duration_label = f"{duration:.0f}s" if duration else 'unknown length'
+        print(f"🎤 Transcribing with {name} ({model_size}, {duration_label})")
+        started = time.time()
+        try:
+            result = backend.transcribe(audio_path, model_size, duration)
+        except Exception as e:
+            last_error = e
+            print(f"⚠️ {name} transcription failed: {str(e)[:200]} - trying next backend")
+            continue
+
+        elapsed = time.time() - started
+        if time_map is not None:
+            result['segments'] = time_map.remap_segments(result['segments'])
+        audio_seconds = duration or (result['segments'][-1]['start'] + result['segments'][-1]['duration'] if result['segments'] else None)
+        rtf = round(elapsed / audio_seconds, 3) if audio_seconds else None
+        if rtf is not None:
+            _record_rtf(name, model_size, rtf)
+        result['stats'] = {
+            'backend': name,
+            'model': model_size,
+            'elapsed_seconds': round(elapsed, 2),
+            'audio_seconds': round(audio_seconds, 1) if audio_seconds else None,
+            'rtf': rtf,
+            'original_audio_seconds': round(original_duration, 1) if original_duration else None,
+            'vad': vad_stats,
+        }
+        print(f"✅ Transcribed with {name}/{model_size} in {elapsed:.1f}s (RTF {rtf})")
+        return result
+
+    raise Exception(f"No transcription backend succeeded. Last error: {str(last_error)[:300] if last_error else 'no backend available'}")
@@ -0,0 +1,179 @@
+"""
+Voice-activity detection pre-pass for Whisper.
+
+Podcasts and reaction videos carry long stretches of silence, intros and music
+beds that Whisper still decodes at full cost. This stage finds speech regions,
+writes a speech-only 16 kHz WAV next to the download, and keeps a TimeMap so
+segment timestamps from the shortened audio line up with the original video.
+
+Detector: Silero VAD bundled with faster-whisper when installed (separates
+speech from music), otherwise an adaptive RMS-energy detector (silence only).
+
+Environment variables:
+    VAD_MIN_SILENCE_MS  - gaps shorter than this stay in the audio (default: 1000)
+    VAD_SPEECH_PAD_MS   - padding kept around each speech region (default: 300)
+    VAD_MIN_SAVINGS     - skip the cut unless it removes at least this fraction (default: 0.1)
+"""
+import os
+import wave
+from bisect import bisect_right
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+
+
+class TimeMap:
+    """Maps times in speech-only audio back to times in the original audio"""
+
+    def __init__(self, pieces=None):
+        # (start in speech-only audio, start in original audio, length) - all seconds
+        self.pieces = pieces or []
+        self._starts = [p[0] for p in self.pieces]
+
+    @classmethod
+    def from_regions(cls, regions, sample_rate=SAMPLE_RATE):
+        """Build from kept (start, end) sample regions in original-audio order"""
+        pieces = []
+        cursor = 0.0
+        for start, end in regions:
+            length = (end - start) / sample_rate
+            pieces.append((cursor, start / sample_rate, length))
+            cursor += length
+        return cls(pieces)
+
+    def is_identity(self):
+        return not self.pieces
+
+    def to_original(self, t):
+        if not self.pieces:
+            return t
+        index = max(0, bisect_right(self._starts, t) - 1)
+        speech_start, original_start, length = self.pieces[index]
+        # Clamp into the piece so times past its end don't leak into the removed gap
+        return original_start + min(max(0.0, t - speech_start), length)
+
+    def remap_segments(self, segments):
+        """Rewrite {'start', 'duration', 'text'} segments onto the original timeline"""
+        if not self.pieces:
+            return segments
+        remapped = []
+        for seg in segments:
+            start = self.to_original(seg['start'])
+            end = self.to_original(seg['start'] + seg['duration'])
+            remapped.append(dict(seg, start=round(start, 3), duration=round(max(0.0, end - start), 3)))
+        return remapped
+
+
+def decode_audio(audio_path):
+    """Decode any ffmpeg-readable file to 16 kHz mono float32"""
+    try:
+        from faster_whisper import decode_audio as fw_decode
+        return fw_decode(audio_path, sampling_rate=SAMPLE_RATE)
+    except ImportError:
+        import whisper
+        return whisper.load_audio(audio_path)
+
+
+def _silero_regions(audio, min_silence_ms, speech_pad_ms):
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    options = VadOptions(min_silence_duration_ms=min_silence_ms, speech_pad_ms=speech_pad_ms)
+    return [(ts['start'], ts['end']) for ts in get_speech_timestamps(audio, options)]
+
+
+def _energy_regions(audio, min_silence_ms, speech_pad_ms, min_speech_ms=250):
+    """Frames well above the noise floor, merged across short gaps and padded"""
+    import numpy as np
+
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    usable = (len(audio) // frame) * frame
+    if usable == 0:
+        return [(0, len(audio))]
+    energy = np.sqrt(np.mean(audio[:usable].reshape(-1, frame).astype(np.float32) ** 2, axis=1))
+    noise_floor = float(np.percentile(energy, 10))
+    threshold = max(noise_floor * 3.0, 0.005)
+    voiced = energy > threshold
+
+    regions = []
+    start = None
+    for i, is_voiced in enumerate(voiced):
+        if is_voiced and start is None:
+            start = i
+        elif not is_voiced and start is not None:
+            regions.append([start, i])
+            start = None
+    if start is not None:
+        regions.append([start, len(voiced)])
+
+    gap_frames = int(min_silence_ms / 1000 / FRAME_SECONDS)
+    merged = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < gap_frames:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    min_frames = int(min_speech_ms / 1000 / FRAME_SECONDS)
+    pad = int(speech_pad_ms / 1000 * SAMPLE_RATE)
+    return [
+        (max(0, s * frame - pad), min(len(audio), e * frame + pad))
+        for s, e in merged if e - s >= min_frames
+    ]
+
+
+def detect_speech(audio, min_silence_ms=None, speech_pad_ms=None):
+    """Speech regions as sorted, non-overlapping (start, end) sample pairs"""
+    min_silence_ms = min_silence_ms or int(os.getenv('VAD_MIN_SILENCE_MS', '1000'))
+    speech_pad_ms = speech_pad_ms if speech_pad_ms is not None else int(os.getenv('VAD_SPEECH_PAD_MS', '300'))
+    try:
+        regions = _silero_regions(audio, min_silence_ms, speech_pad_ms)
+    except ImportError:
+        regions = _energy_regions(audio, min_silence_ms, speech_pad_ms)
+
+    # Padding can make neighbours overlap - merge so the time map stays monotonic
+    merged = []
+    for start, end in sorted(regions):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _write_wav(path, audio):
+    import numpy as np
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(pcm.tobytes())
+
+
+def strip_silence(audio_path, min_savings=None):
+    """Write speech-only audio next to audio_path -> (path, TimeMap, stats)
+
+    Returns the original path with an identity map when there is too little to cut.
+    """
+    import numpy as np
+
+    min_savings = min_savings if min_savings is not None else float(os.getenv('VAD_MIN_SAVINGS', '0.1'))
+    audio = decode_audio(audio_path)
+    total_seconds = len(audio) / SAMPLE_RATE
+    regions = detect_speech(audio)
+    speech_samples = sum(end - start for start, end in regions)
+    speech_seconds = speech_samples / SAMPLE_RATE
+    stats = {
+        'original_seconds': round(total_seconds, 1),
+        'speech_seconds': round(speech_seconds, 1),
+        'regions': len(regions),
+        'applied': False,
+    }
+
+    if not regions or total_seconds == 0 or 1 - speech_seconds / total_seconds < min_savings:
+        return audio_path, TimeMap(), stats
+
+    speech_path = os.path.splitext(audio_path)[0] + '.speech.wav'
+    _write_wav(speech_path, np.concatenate([audio[start:end] for start, end in regions]))
+    stats['applied'] = True
+    print(f"🔇 VAD kept {speech_seconds:.0f}s of {total_seconds:.0f}s ({len(regions)} speech regions)")
+    return speech_path, TimeMap.from_regions(regions), stats
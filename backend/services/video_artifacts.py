@@ -0,0 +1,112 @@
+"""
+Request-scoped artifacts: what one request has learned about its video.
+
+A request used to fetch the same things more than once - captions for the
+minute estimate and again in process(), a yt-dlp probe at enqueue time and
+again in the job worker, a transcript-cache lookup in the pipeline and again
+in process(). VideoArtifacts holds each result the first time it's produced:
+
+    transcript, segments, language  - cache, YouTube captions or Whisper
+    metadata                        - title, duration, creator (yt-dlp probe or cache)
+    audio_path                      - downloaded audio while it exists on disk
+
+VideoProcessor stage methods (load_transcript, load_metadata, process) read
+what is already here and write what they fetch. The fetches themselves run as
+StageScheduler stages (services/stage_scheduler.py), so concurrent readers
+share one in-flight call.
+
+Queued jobs carry the artifacts in their payload (to_payload/from_payload):
+what the enqueue-time estimate fetched is not fetched again by the worker.
+"""
+from services.stage_scheduler import StageScheduler
+
+
+class VideoArtifacts:
+    """Transcript, segments, metadata, audio path and language for one request"""
+
+    def __init__(self, video_url, stages=None):
+        self.video_url = video_url
+        self.stages = stages or StageScheduler()
+        self.transcript = None
+        self.segments = None
+        self.language = None
+        self.source = None  # 'cache', 'captions', 'whisper' or 'job' (carried from enqueue)
+        self.metadata = None  # {'title', 'duration_seconds', 'duration_minutes', 'creator_info'}
+        self.audio_path = None
+        self._cache_checked = False
+
+    @property
+    def is_youtube(self):
+        return 'youtube.com' in self.video_url or 'youtu.be' in self.video_url
+
+    @property
+    def platform(self):
+        return 'youtube' if self.is_youtube else 'instagram'
+
+    @property
+    def has_transcript(self):
+        return bool(self.transcript)
+
+    @property
+    def has_metadata(self):
+        return self.metadata is not None
+
+    @property
+    def complete(self):
+        """Transcript and a known duration - nothing left to fetch before analysis"""
+        return self.has_transcript and self.has_metadata and bool(self.metadata.get('duration_minutes'))
+
+    def set_transcript(self, text, segments=None, language=None, source=None):
+        self.transcript = text
+        self.segments = segments or None
+        self.language = language or self.language or 'en'
+        self.source = source
+
+    def load_cached(self, cache=None):
+        """Fill from the transcript cache (any URL form of the video) - one lookup per request"""
+        if self._cache_checked:
+            return self
+        self._cache_checked = True
+        if self.has_transcript:
+            return self
+        if cache is None:
+            from services.transcript_cache import get_transcript_cache
+            cache = get_transcript_cache()
+        cached = cache.get(self.video_url)
+        if not cached:
+            return self
+        self.set_transcript(cached['text'], cached.get('segments'), cached.get('language'), 'cache')
+        if cached.get('title') and cached.get('duration_minutes') and not self.has_metadata:
+            duration_minutes = float(cached['duration_minutes'])
+            self.metadata = {
+                'title': cached['title'],
+                'duration_seconds': duration_minutes * 60,
+                'duration_minutes': duration_minutes,
+                'creator_info': cached.get('creator_info'),
+            }
+        return self
+
+    # -- job hand-off ---------------------------------------------------------
+
+    def to_payload(self):
+        """JSON-serializable snapshot for a queued job (the audio file stays behind)"""
+        payload = {}
+        if self.has_transcript:
+            payload.update(transcript=self.transcript, segments=self.segments, language=self.language)
+        if self.metadata:
+            payload['metadata'] = self.metadata
+        return payload
+
+    @classmethod
+    def from_payload(cls, video_url, payload, stages=None):
+        artifacts = cls(video_url, stages=stages)
+        payload = payload or {}
+        if payload.get('transcript'):
+            artifacts.set_transcript(payload['transcript'], payload.get('segments'), payload.get('language'), 'job')
+        if payload.get('metadata'):
+            artifacts.metadata = payload['metadata']
+        return artifacts
+
+    def __repr__(self):
+        return (f"VideoArtifacts({self.video_url!r}, transcript={len(self.transcript or '')} chars, "
+                f"source={self.source!r}, metadata={bool(self.metadata)}, audio={bool(self.audio_path)})")
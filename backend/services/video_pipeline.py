@@ -0,0 +1,646 @@
+"""
+Video processing pipeline shared by the synchronous /process route and the
+background job workers.
+
+Everything here is independent of the Flask request context so it can run in
+a worker process: callers pass the user id explicitly and get back a
+(response_payload, status_code) tuple.
+"""
+from services.supabase_client import get_supabase_client
+from services.slack_notifier import notify_video_upload
+from services.minute_ledger import MinuteReservation, reserve_minutes, charge_minutes, limit_exceeded_response
+from services.blob_store import blob_storage_enabled, store_payload, hydrate_video
+from services.highlighting import with_highlighted_transcript
+from services.video_artifacts import VideoArtifacts
+from datetime import datetime
+import math
+import os
+import json
+
+
+def _noop_report(stage, progress):
+    pass
+
+
+def get_video_processor():
+    """Shared per-worker VideoProcessor (lazy import to avoid startup crashes)"""
+    from services.processor_registry import get_video_processor as get_shared_processor
+    return get_shared_processor()
+
+
+def charge_multiplier(analysis_type):
+    """Minutes charged per video minute
+    
+    Summarize: 1x multiplier (standard)
+    Fact-check: 2.5x multiplier (premium - reflects higher AI costs)
+    """
+    return 2.5 if analysis_type == 'fact-check' else 1.0
+
+
+def estimate_video_minutes(processor, video_url, artifacts=None):
+    """Video length in whole minutes, as cheaply as possible (cached < captions < yt-dlp)
+    
+    With the request's VideoArtifacts, the captions and the metadata probe are the
+    same ones process() uses afterwards (and may already be running in parallel).
+    Only what the estimate needs is fetched here.
+    """
+    artifacts = artifacts or VideoArtifacts(video_url)
+    artifacts.load_cached()
+    if (artifacts.metadata or {}).get('duration_minutes'):
+        estimated_minutes = math.ceil(artifacts.metadata['duration_minutes'])
+        print(f"✅ Using known duration: {estimated_minutes} minutes")
+        return estimated_minutes
+    
+    # Try to get YouTube transcript first (works without proxy, fast!)
+    if artifacts.is_youtube:
+        print("🎯 Checking for YouTube transcript (no proxy needed)...")
+        transcript_text = processor.load_transcript(artifacts)
+        if transcript_text:
+            print(f"✅ Found YouTube transcript! Estimating from transcript length...")
+            # Estimate: ~150 words per minute speaking rate
+            word_count = len(transcript_text.split())
+            estimated_minutes = math.ceil(word_count / 150)
+            print(f"📊 Estimated {estimated_minutes} minutes based on transcript ({word_count} words)")
+            return estimated_minutes
+        print("⚠️ No YouTube transcript - will need to download video")
+    
+    if 'instagram.com' in video_url:
+        # Same default as processor.estimate_duration - most reels are 30-90 seconds
+        print("📱 Instagram URL detected - using default estimate of 1 minute")
+        return 1
+    
+    # Only estimate duration with yt-dlp if we couldn't get transcript
+    try:
+        print("⏱️ Estimating video duration with yt-dlp...")
+        estimated_duration = processor.load_metadata(artifacts)['duration_seconds']
+        print(f"✅ Estimated duration: {estimated_duration}s ({estimated_duration/60:.1f} min)")
+        return math.ceil(estimated_duration / 60)
+    except Exception as est_error:
+        print(f"⚠️ Duration estimation failed (not critical): {str(est_error)}")
+        print("   Will use default estimate of 15 minutes")
+        return 15
+
+
+def process_video_for_user(user_id, video_url, analysis_type, report=None, video_id=None, bypass_cache=False, on_event=None, reservation_id=None, artifacts=None):
+    """Run the full pipeline for one user and return (response_payload, status_code).
+
+    report(stage, progress) is called as the pipeline advances. If video_id is
+    given, that placeholder videos row is completed instead of inserting a new one.
+    bypass_cache forces a fresh AI analysis, and only takes effect for admins.
+    on_event(event, data) receives the analysis as it streams (tokens/claims).
+    reservation_id is the minute hold taken at enqueue time (queued jobs); without
+    one, minutes are reserved here. A failed video releases its hold.
+    artifacts is a VideoArtifacts with whatever is already known about the video
+    (queued jobs carry what the enqueue-time estimate fetched).
+    """
+    reservation = MinuteReservation(reservation_id) if reservation_id else None
+    holder = {'reservation': reservation}
+    response_data, status_code = _process_video_for_user(
+        user_id, video_url, analysis_type, report, video_id, bypass_cache, on_event, holder, artifacts
+    )
+    reservation = holder['reservation']
+    if status_code >= 400 and reservation is not None:
+        reservation.release()
+    return response_data, status_code
+
+
+def _process_video_for_user(user_id, video_url, analysis_type, report, video_id, bypass_cache, on_event, holder, artifacts):
+    report = report or _noop_report
+    reservation = holder['reservation']
+    try:
+        print("\n" + "="*80)
+        print("🎬 VIDEO PROCESS: STARTING")
+        print("="*80)
+    
+        print(f"Video URL: {video_url}")
+        print(f"Analysis type: {analysis_type}")
+    
+        if not video_url:
+            return {'success': False, 'error': 'Video URL is required'}, 400
+    
+        if analysis_type not in ['summarize', 'fact-check']:
+            return {'success': False, 'error': 'Invalid analysis type'}, 400
+    
+        supabase = get_supabase_client()
+    
+        print(f"User ID: {user_id}")
+    
+        # Get user to check limits
+        user_response = supabase.table('users').select('*').eq('id', user_id).execute()
+        if not user_response.data:
+            print(f"❌ User not found: {user_id}")
+            return {'success': False, 'error': 'User not found'}, 404
+    
+        user = user_response.data[0]
+        user_email = user.get('email', 'Unknown')
+        print(f"✅ User found: {user_email}")
+    
+        if bypass_cache:
+            from services.analysis_cache import can_bypass_cache
+            bypass_cache = can_bypass_cache(user.get('email'))
+            if not bypass_cache:
+                print("⚠️ Ignoring bypass_cache - not an admin")
+    
+        report('checking_cache', 0.05)
+    
+        # Check the transcript cache (matches any URL form of the same video). Everything
+        # learned about the video from here on lives in one VideoArtifacts, so each
+        # external fetch happens at most once (services/video_artifacts.py)
+        print(f"Checking for existing transcript for URL: {video_url}")
+        artifacts = artifacts or VideoArtifacts(video_url)
+        artifacts.load_cached()
+    
+        # Reuse only full entries - without a duration we still need to estimate the charge
+        cached_in_full = artifacts.source == 'cache' and artifacts.complete
+        if cached_in_full:
+            print(f"✅ Found existing transcript ({len(artifacts.transcript)} chars) - will reuse!")
+            print(f"   Title: {artifacts.metadata['title']}")
+            print(f"   Duration: {artifacts.metadata['duration_minutes']} minutes")
+    
+        # Initialize processor (lazy import)
+        print("Initializing VideoProcessor...")
+        try:
+            processor = get_video_processor()
+            print("✅ VideoProcessor initialized")
+        except Exception as proc_error:
+            print(f"❌ VideoProcessor initialization failed: {proc_error}")
+            import traceback
+            traceback.print_exc()
+            return {'success': False, 'error': f'Video processor initialization failed: {str(proc_error)}'}, 500
+    
+        # Whatever is still missing (captions, metadata) starts now - concurrently with
+        # USE_PARALLEL_PROCESSING (services/stage_scheduler.py)
+        if not cached_in_full:
+            processor.start_first_stages(artifacts)
+    
+        # Hold the estimated charge (atomic limit check - see services/minute_ledger.py).
+        # Queued jobs already reserved at enqueue time.
+        multiplier = charge_multiplier(analysis_type)
+        if reservation is None:
+            report('estimating', 0.1)
+            estimated_minutes = estimate_video_minutes(processor, video_url, artifacts)
+            print(f"📊 Will charge {estimated_minutes} minutes for this video")
+            reservation, usage = reserve_minutes(user_id, math.ceil(estimated_minutes * multiplier), supabase=supabase)
+            if reservation is None:
+                print(f"❌ User has exhausted their limit: {usage['used']} used + {usage['reserved']} reserved >= {usage['limit']}")
+                return limit_exceeded_response(usage), 403
+            holder['reservation'] = reservation
+        used = float(user.get('minutes_used_this_month', 0))
+        limit = user.get('monthly_minute_limit', 60)
+    
+        # Process video (use cached transcript if available)
+        if cached_in_full:
+            print("🔄 Reusing cached transcript - only running new analysis!")
+            report('analyzing', 0.5)
+            # Choose AI model based on transcript length (repeats come from the analysis cache)
+            analysis = processor.analyze_transcript(artifacts.transcript, analysis_type, bypass_cache=bypass_cache, on_event=on_event)
+        
+            # For fact-checks, locate the claims in the transcript (spans, not a tagged copy)
+            if analysis_type == 'fact-check' and isinstance(analysis, dict):
+                processor.highlight_claims(artifacts.transcript, artifacts.segments, analysis)
+
+            result = {
+                'title': artifacts.metadata.get('title') or 'Untitled',
+                'platform': artifacts.platform,
+                'duration_minutes': float(artifacts.metadata['duration_minutes']),
+                'transcription': artifacts.transcript,
+                'transcript_segments': artifacts.segments,
+                'analysis': analysis,
+                'creator_info': artifacts.metadata.get('creator_info'),
+                'language': artifacts.language or 'en'
+            }
+        else:
+            print("📥 No cached transcript - fetching new transcript and analyzing...")
+            result = processor.process(video_url, analysis_type, progress=report, bypass_cache=bypass_cache, on_event=on_event, artifacts=artifacts)
+    
+        report('saving', 0.9)
+    
+        # Calculate actual minutes charged with multiplier (round up)
+        actual_minutes = math.ceil(result['duration_minutes'] * multiplier)
+    
+        # Prepare analysis for storage - ensure it's a JSON string
+        analysis_to_store = result['analysis']
+        if isinstance(analysis_to_store, dict):
+            # Convert dict to JSON string for storage in TEXT column
+            try:
+                analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=False)
+                print("✅ Converted analysis dict to JSON string for storage")
+            
+                # VALIDATE: Try parsing it back to ensure it's valid JSON
+                json.loads(analysis_to_store)
+                print("✅ Validated: Analysis is valid JSON")
+            except Exception as e:
+                print(f"❌ CRITICAL: Failed to serialize analysis to JSON: {e}")
+                import traceback
+                traceback.print_exc()
+                # Try with ascii encoding as last resort
+                try:
+                    analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=True)
+                    json.loads(analysis_to_store)  # Validate
+                    print("✅ Fallback: Converted with ensure_ascii=True")
+                except Exception as e2:
+                    print(f"❌ CRITICAL: All JSON serialization attempts failed: {e2}")
+                    # DON'T charge user for corrupted analysis - return error
+                    return {
+                        'success': False,
+                        'error': 'Analysis processing failed due to data corruption. Your minutes have NOT been charged. Please try again.'
+                    }, 500
+        elif not isinstance(analysis_to_store, str):
+            # This shouldn't happen, but handle it properly if it does
+            try:
+                analysis_to_store = json.dumps(analysis_to_store, ensure_ascii=False)
+                json.loads(analysis_to_store)  # Validate
+                print("✅ Converted non-dict/non-string analysis to JSON")
+            except:
+                # If it's truly not JSON-serializable, don't charge the user
+                print(f"❌ Analysis is not JSON-serializable: {type(analysis_to_store)}")
+                return {
+                    'success': False,
+                    'error': 'Analysis processing failed. Your minutes have NOT been charged. Please try again.'
+                }, 500
+    
+        # Save video, creator stats, minute charge and transaction log (one transactional RPC)
+        video_data = {
+            'user_id': user_id,
+            'video_url': video_url,
+            'title': result.get('title', 'Untitled'),
+            'platform': result.get('platform', 'unknown'),
+            'duration_minutes': result['duration_minutes'],
+            'transcription': result['transcription'],
+            'analysis': analysis_to_store,  # Now guaranteed to be a string
+            'analysis_type': analysis_type,
+            'processing_status': 'completed',
+            'minutes_charged': actual_minutes,
+            'completed_at': datetime.utcnow().isoformat()
+        }
+        if blob_storage_enabled():
+            # Compressed, deduplicated blobs instead of TEXT columns (services/blob_store.py)
+            try:
+                hashes = store_payload(
+                    result['transcription'], result.get('transcript_segments'), analysis_to_store, supabase=supabase
+                )
+                video_data.update(hashes)
+                video_data['transcription'] = None
+                video_data['analysis'] = None
+            except Exception as e:
+                print(f"⚠️ Blob storage failed - saving payload inline (non-critical): {str(e)[:200]}")
+        creator_info = result.get('creator_info') if (result.get('creator_info') or {}).get('name') else None
+        fact_score = _fact_score(result['analysis']) if analysis_type == 'fact-check' else None
+    
+        video_id, new_used, creator_data = record_video_result(
+            supabase, user_id, video_data, actual_minutes,
+            video_id=video_id, creator_info=creator_info, fact_score=fact_score, used=used,
+            reservation=reservation
+        )
+        if fact_score is None:
+            creator_data = None  # Creator scores are only shown alongside fact-checks
+    
+        remaining = max(0, limit - new_used)
+    
+        # Parse analysis if it's a JSON string (from database TEXT column)
+        analysis = result['analysis']
+        if isinstance(analysis, str) and analysis_type == 'fact-check':
+            try:
+                analysis = json.loads(analysis)
+                print("✅ Parsed analysis string to object for response")
+            except:
+                print("⚠️ Analysis is plain text (probably from summarize mode)")
+    
+        # Tagged transcript for the frontend, rendered from the stored spans
+        with_highlighted_transcript(analysis, result['transcription'])
+    
+        response_data = {
+            'success': True,
+            'video_id': video_id,
+            'video_url': video_url,
+            'title': result.get('title', 'Untitled'),
+            'platform': result.get('platform', 'unknown'),
+            'duration_minutes': result['duration_minutes'],
+            'minutes_charged': actual_minutes,
+            'minute_multiplier': multiplier,
+            'transcription': result['transcription'],
+            'transcript_segments': result.get('transcript_segments'),  # Timestamped segments (YouTube only)
+            'analysis': analysis,  # Now guaranteed to be object for fact-check, string for summarize
+            'analysis_type': analysis_type,  # CRITICAL: Frontend needs this to determine UI rendering
+            'minutes_remaining': remaining,
+            'transcription_stats': result.get('transcription_stats'),  # Backend/model/RTF when audio was transcribed
+            'stage_timings': result.get('stage_timings') or artifacts.stages.timings()
+        }
+    
+        # Add creator data if available (only if 10+ videos analyzed)
+        if creator_data and creator_data.get('total_videos_analyzed', 0) >= 10:
+            response_data['creator'] = {
+                'name': creator_data['name'],
+                'total_videos': creator_data['total_videos_analyzed'],
+                'avg_score': float(creator_data['avg_fact_score']) if creator_data.get('avg_fact_score') else None,
+                'last_score': float(creator_data['last_fact_score']) if creator_data.get('last_fact_score') else None,
+                'category': creator_data.get('category')
+            }
+    
+        # Send Slack notification AFTER everything is complete (DB stored, minutes deducted, response ready)
+        try:
+            notify_video_upload(
+                email=user_email,
+                video_url=video_url,
+                video_title=result.get('title', 'Untitled'),
+                duration_minutes=result['duration_minutes'],
+                analysis_type=analysis_type,
+                user_id=user_id
+            )
+            print("✅ Slack notification sent (processing fully complete)")
+        except Exception as slack_error:
+            print(f"⚠️ Slack notification failed (non-critical): {str(slack_error)}")
+    
+        return response_data, 200
+    
+    except Exception as e:
+        error_msg = str(e)
+        print(f"❌ VIDEO PROCESS ERROR: {error_msg}")
+        import traceback
+        traceback.print_exc()
+    
+        # Specific error messages for common issues
+        if 'transcriptsdisabled' in error_msg.lower() or 'subtitles are disabled' in error_msg.lower():
+            print("⚠️ Detected YouTube transcript disabled error")
+            return {
+                'success': False,
+                'error': 'This YouTube video has subtitles/transcripts disabled by the creator. We cannot process videos without transcripts.',
+                'suggestion': 'Please try a different video that has subtitles enabled. Most YouTube videos have transcripts available.',
+                'error_type': 'transcripts_disabled'
+            }, 400
+        elif 'instagram' in error_msg.lower() and ('login required' in error_msg.lower() or 'rate-limit' in error_msg.lower() or 'format has changed' in error_msg.lower()):
+            print("⚠️ Detected Instagram access error")
+            return {
+                'success': False,
+                'error': 'Unable to access this Instagram video. Instagram support is experimental and may not work for all videos.',
+                'suggestion': 'Instagram has strict access controls. For more reliable processing, we recommend using YouTube videos instead. If the Instagram video is important, try again later or ensure it\'s public.',
+                'error_type': 'instagram_access_error'
+            }, 400
+        elif 'bot' in error_msg.lower() or 'sign in' in error_msg.lower() or 'ipblocked' in error_msg.lower() or 'ip blocked' in error_msg.lower():
+            print("⚠️ Detected YouTube IP blocking/bot detection")
+            return {
+                'success': False,
+                'error': 'YouTube is temporarily blocking access. This video may require authentication to access.',
+                'suggestion': 'Please try: 1) A different video, 2) Waiting a few minutes and trying again, 3) A video with subtitles/transcripts enabled. Videos that have available transcripts are more likely to work.',
+                'error_type': 'youtube_blocked'
+            }, 400
+        elif 'proxy' in error_msg.lower() or 'tunnel connection' in error_msg.lower():
+            print("⚠️ Detected proxy/network error")
+            return {
+                'success': False,
+                'error': 'Network connection issue. Please try again in a moment.',
+                'error_type': 'network_error'
+            }, 400
+        elif 'download' in error_msg.lower() or 'couldn\'t' in error_msg.lower() or 'duration' in error_msg.lower():
+            print("⚠️ Detected download/duration error")
+            return {
+                'success': False,
+                'error': 'Couldn\'t access video. Make sure it\'s public, has captions/transcripts, and the URL is correct.',
+                'suggestion': 'Check if the video has transcripts by clicking "..." under the video and looking for "Show transcript".',
+                'debug_info': error_msg if os.getenv('FLASK_ENV') == 'development' else None
+            }, 400
+    
+        print(f"⚠️ Unexpected error type - returning 500")
+        return {'success': False, 'error': error_msg}, 500
+
+
+def _fact_score(analysis):
+    """fact_score from an analysis dict or JSON string, else None"""
+    if isinstance(analysis, str):
+        try:
+            analysis = json.loads(analysis)
+        except ValueError:
+            return None
+    if isinstance(analysis, dict) and analysis.get('fact_score') is not None:
+        try:
+            return float(analysis['fact_score'])
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+# Flips to True when the record_video_result migration isn't applied yet
+_record_rpc_missing = False
+
+
+def record_video_result(supabase, user_id, video_data, minutes, video_id=None, creator_info=None, fact_score=None, used=0, reservation=None):
+    """Persist a finished video -> (video_id, minutes_used_this_month, creator row or None)
+
+    One call to the record_video_result function
+    (database/migrations/add_record_video_result.sql) upserts the creator,
+    tracks the upload, updates creator stats, inserts/completes the videos row,
+    deducts minutes and logs the transaction in a single transaction. With a
+    reservation it also releases the hold (add_minute_ledger.sql). Until the
+    migration is applied, falls back to sequential calls.
+    """
+    global _record_rpc_missing
+    creator = None
+    if creator_info:
+        creator = {
+            'name': creator_info['name'],
+            'platform_id': creator_info.get('platform_id') or 'unknown',
+            'platform': video_data.get('platform') or 'youtube',
+            'channel_url': creator_info.get('channel_url'),
+            'subscriber_count': creator_info.get('subscriber_count'),
+            'category': creator_info.get('category')
+        }
+
+    if not _record_rpc_missing:
+        params = {
+            'p_user_id': user_id,
+            'p_video': video_data,
+            'p_minutes': minutes,
+            'p_video_id': video_id,
+            'p_creator': creator,
+            'p_fact_score': fact_score
+        }
+        if reservation is not None and reservation.id:
+            params['p_reservation_id'] = reservation.id
+        try:
+            response = supabase.rpc('record_video_result', params).execute()
+            if reservation is not None:
+                reservation.settled = True
+            saved = response.data or {}
+            if saved.get('creator'):
+                print(f"✅ Creator tracked: {saved['creator'].get('name')} (ID: {saved['creator'].get('id')})")
+            return saved.get('video_id'), float(saved.get('minutes_used_this_month') or 0), saved.get('creator')
+        except Exception as e:
+            # PGRST202: PostgREST has no function with that name/signature
+            if getattr(e, 'code', None) != 'PGRST202' and 'Could not find the function' not in str(e):
+                raise
+            print("⚠️ record_video_result RPC not installed - using sequential writes (run add_record_video_result.sql)")
+            _record_rpc_missing = True
+
+    saved = _record_video_result_sequential(supabase, user_id, video_data, minutes, video_id, creator, fact_score, used)
+    if reservation is not None:
+        reservation.release(supabase)  # Charged above - the hold is no longer needed
+    return saved
+
+
+def _record_video_result_sequential(supabase, user_id, video_data, minutes, video_id, creator, fact_score, used):
+    """Pre-migration path: one round trip per write, no transaction"""
+    creator_id = None
+    creator_data = None
+    if creator:
+        try:
+            print("👤 Tracking creator...")
+            creator_response = supabase.rpc('upsert_creator', {
+                'p_name': creator['name'],
+                'p_platform_id': creator['platform_id'],
+                'p_platform': creator['platform'],
+                'p_channel_url': creator['channel_url'],
+                'p_subscriber_count': creator['subscriber_count'],
+                'p_category': creator['category']
+            }).execute()
+        
+            if creator_response.data:
+                creator_id = creator_response.data
+                print(f"✅ Creator tracked: {creator['name']} (ID: {creator_id})")
+            
+                # Track video upload globally
+                supabase.rpc('track_video_upload', {
+                    'p_video_url': video_data['video_url'],
+                    'p_creator_id': creator_id
+                }).execute()
+            
+                if fact_score is not None:
+                    print(f"📊 Updating creator stats with score: {fact_score}")
+                    supabase.rpc('update_creator_stats', {
+                        'p_creator_id': creator_id,
+                        'p_new_fact_score': fact_score
+                    }).execute()
+                
+                    # Fetch updated creator data for response
+                    creator_query = supabase.table('creators').select('*').eq('id', creator_id).execute()
+                    if creator_query.data:
+                        creator_data = creator_query.data[0]
+                        print(f"✅ Creator stats updated: {creator_data['total_videos_analyzed']} videos, avg score: {creator_data['avg_fact_score']}")
+        except Exception as e:
+            print(f"⚠️ Creator tracking failed (non-critical): {str(e)}")
+            # Continue processing even if creator tracking fails
+
+    video_data = dict(
+        video_data,
+        creator_id=creator_id,
+        creator_name=creator['name'] if creator else None,
+        creator_platform_id=creator['platform_id'] if creator else None,
+        category=creator['category'] if creator else None
+    )
+    if video_id:
+        # Background job: complete the placeholder row created at enqueue time
+        supabase.table('videos').update(video_data).eq('id', video_id).execute()
+    else:
+        video_response = supabase.table('videos').insert(video_data).execute()
+        video_id = video_response.data[0]['id'] if video_response.data else None
+
+    # Update user minutes (in-database increment - concurrent videos can't lose an update)
+    new_used = charge_minutes(user_id, minutes, supabase) or used + minutes
+
+    # Create transaction record
+    supabase.table('minute_transactions').insert({
+        'user_id': user_id,
+        'video_id': video_id,
+        'minutes_used': minutes,
+        'transaction_type': 'video_processing'
+    }).execute()
+
+    return video_id, new_used, creator_data
+
+
+def create_pending_video(user_id, video_url, analysis_type):
+    """Insert a placeholder videos row (processing_status='pending') for a queued job"""
+    supabase = get_supabase_client()
+    response = supabase.table('videos').insert({
+        'user_id': user_id,
+        'video_url': video_url,
+        'analysis_type': analysis_type,
+        'processing_status': 'pending'
+    }).execute()
+    return response.data[0]['id'] if response.data else None
+
+
+def set_video_status(video_id, status, error_message=None):
+    """Update processing_status on a placeholder videos row (best effort)"""
+    if not video_id:
+        return
+    try:
+        update = {'processing_status': status}
+        if error_message:
+            update['error_message'] = error_message[:1000]
+        get_supabase_client().table('videos').update(update).eq('id', video_id).execute()
+    except Exception as e:
+        print(f"⚠️ Couldn't update processing_status for {video_id} (non-critical): {str(e)}")
+
+
+def completed_video_response(video_id):
+    """Response for a queued video an earlier attempt already saved (and charged), or None
+
+    A worker can die between saving the video and marking its job done; the re-queued
+    job must return what was saved, not process and charge the video again.
+    """
+    if not video_id:
+        return None
+    response = get_supabase_client().table('videos').select('*').eq('id', video_id).execute()
+    row = response.data[0] if response.data else None
+    if not row or row.get('processing_status') != 'completed':
+        return None
+    hydrate_video(row)
+    analysis = row.get('analysis')
+    if isinstance(analysis, str) and row.get('analysis_type') == 'fact-check':
+        try:
+            analysis = json.loads(analysis)
+        except ValueError:
+            pass
+    with_highlighted_transcript(analysis, row.get('transcription'))
+    return {
+        'success': True,
+        'video_id': video_id,
+        'video_url': row.get('video_url'),
+        'title': row.get('title') or 'Untitled',
+        'platform': row.get('platform') or 'unknown',
+        'duration_minutes': row.get('duration_minutes'),
+        'minutes_charged': row.get('minutes_charged'),
+        'transcription': row.get('transcription'),
+        'transcript_segments': row.get('transcript_segments'),
+        'analysis': analysis,
+        'analysis_type': row.get('analysis_type'),
+    }
+
+
+def run_video_job(payload, report):
+    """Job handler for queued /process requests (runs in a job worker process)"""
+    from services.job_queue import JobFailed
+    
+    video_id = payload.get('video_id')
+    completed = completed_video_response(video_id)
+    if completed is not None:
+        print(f"♻️ Video {video_id} was already saved by an earlier attempt - not charging again")
+        return completed
+    set_video_status(video_id, 'processing')
+    
+    response_data, status_code = process_video_for_user(
+        payload['user_id'],
+        payload['url'],
+        payload.get('analysis_type', 'summarize'),
+        report=report,
+        video_id=video_id,
+        bypass_cache=payload.get('bypass_cache', False),
+        reservation_id=payload.get('reservation_id'),
+        artifacts=VideoArtifacts.from_payload(payload['url'], payload.get('artifacts'))
+    )
+    
+    if status_code >= 400:
+        set_video_status(video_id, 'failed', response_data.get('error'))
+        raise JobFailed(response_data.get('error', 'Video processing failed'), dict(response_data, status_code=status_code))
+    
+    return response_data
+
+
+def abandon_video_job(payload, error):
+    """run_video_job ran out of attempts: give the held minutes back and fail the placeholder row"""
+    if payload.get('reservation_id'):
+        MinuteReservation(payload['reservation_id']).release()
+    set_video_status(payload.get('video_id'), 'failed', error)
+
+
+run_video_job.on_abandoned = abandon_video_job
@@ -0,0 +1,80 @@
+"""
+Shared fixtures. Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest table query or rpc call"""
+
+    def __init__(self, client, table=None, rpc=None, params=None):
+        self.client = client
+        self.table = table
+        self.rpc = rpc
+        self.params = params
+        self.update_values = None
+        self.filters = {}
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def update(self, values):
+        self.update_values = values
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.client.calls.append(self)
+        if self.rpc is not None:
+            return FakeResponse(self.client.rpc_results.get(self.rpc))
+        if self.update_values is not None:
+            return FakeResponse([])
+        rows = self.client.tables.get(self.table, [])
+        return FakeResponse([row for row in rows if all(row.get(k) == v for k, v in self.filters.items())])
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeSupabase:
+    """Records every table/rpc call; tables maps name -> rows, rpc_results maps name -> data"""
+
+    def __init__(self, tables=None, rpc_results=None):
+        self.tables = tables or {}
+        self.rpc_results = rpc_results or {}
+        self.calls = []
+
+    def table(self, name):
+        return FakeQuery(self, table=name)
+
+    def rpc(self, name, params):
+        return FakeQuery(self, rpc=name, params=params)
+
+    def rpc_calls(self, name):
+        return [call.params for call in self.calls if call.rpc == name]
+
+    def updates(self, table):
+        return [(call.update_values, call.filters) for call in self.calls
+                if call.table == table and call.update_values is not None]
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """FakeSupabase wired into the pipeline and the minute ledger"""
+    import services.minute_ledger as minute_ledger
+    import services.video_pipeline as video_pipeline
+
+    client = FakeSupabase()
+    monkeypatch.setattr(minute_ledger, 'get_supabase_client', lambda: client)
+    monkeypatch.setattr(video_pipeline, 'get_supabase_client', lambda: client)
+    return client
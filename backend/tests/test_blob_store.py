@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from services.blob_store import decode_segments, encode_segments, pack_analysis
+from services.highlighting import render_highlights
+
+TRANSCRIPT = 'The Eiffel Tower is 330 meters tall. I love Paris in the spring. Water boils at 90 degrees.'
+
+
+@pytest.mark.parametrize('segments', [
+    [],
+    [{'start': 0.0, 'duration': 1.5, 'text': 'hello'}],
+    [
+        {'start': 0.0, 'duration': 2.25, 'text': 'Ça va, señor? 日本語のテキスト 🎤'},
+        {'start': 2.25, 'duration': 0.5, 'text': ''},
+        {'start': 2.75, 'duration': 1.0, 'text': 'Привет мир'},
+    ],
+    # Past an hour and well into a long podcast (int32 milliseconds)
+    [{'start': 3600.5, 'duration': 4.321, 'text': 'after the first hour'},
+     {'start': 5 * 3600 + 59 * 60 + 59.999, 'duration': 7200.0, 'text': 'late'}],
+], ids=['empty', 'one', 'non-ascii-and-empty-text', 'over-an-hour'])
+def test_segments_round_trip(segments):
+    data = encode_segments(segments)
+    assert data[:4] == b'SEG1'
+    assert decode_segments(data) == segments
+
+
+def test_none_text_and_missing_fields_decode_as_empty():
+    decoded = decode_segments(encode_segments([{'start': 1.0, 'duration': None, 'text': None}, {}]))
+    assert decoded == [{'start': 1.0, 'duration': 0.0, 'text': ''}, {'start': 0.0, 'duration': 0.0, 'text': ''}]
+
+
+def test_segment_times_are_kept_to_the_millisecond():
+    decoded = decode_segments(encode_segments([{'start': 12.3456, 'duration': 0.0004, 'text': 'x'}]))
+    assert decoded == [{'start': 12.346, 'duration': 0.0, 'text': 'x'}]
+
+
+def test_no_segments_and_empty_blob():
+    assert decode_segments(encode_segments(None)) == []
+    assert decode_segments(b'') == []
+
+
+def test_decode_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode_segments(b'{"not": "segments"}')
+
+
+def _tagged_analysis(tagged):
+    return json.dumps({'fact_score': 6, 'full_transcript_with_highlights': tagged})
+
+
+def test_pack_analysis_converts_an_exact_tagged_copy_to_spans():
+    spans = [{'start': 0, 'end': 36, 'verdict': 'VERIFIED'}, {'start': 65, 'end': 91, 'verdict': 'FALSE'}]
+    tagged = render_highlights(TRANSCRIPT, spans)
+
+    packed = json.loads(pack_analysis(_tagged_analysis(tagged), TRANSCRIPT))
+
+    assert 'full_transcript_with_highlights' not in packed
+    assert packed['highlight_spans'] == [[0, 36, 'VERIFIED', None], [65, 91, 'FALSE', None]]
+    assert packed['fact_score'] == 6
+
+
+def test_pack_analysis_keeps_an_edited_tagged_copy():
+    # The model "fixed" the transcript while tagging it - spans would point at the wrong text
+    tagged = '[VERIFIED] The Eiffel Tower is 330 metres tall.[/VERIFIED] I love Paris in the spring.'
+    analysis = _tagged_analysis(tagged)
+    assert pack_analysis(analysis, TRANSCRIPT) == analysis
+
+
+def test_pack_analysis_drops_the_copy_when_spans_exist():
+    analysis = json.dumps({'highlight_spans': [[0, 36, 'VERIFIED', 0]], 'full_transcript_with_highlights': 'stale'})
+    assert json.loads(pack_analysis(analysis, TRANSCRIPT)) == {'highlight_spans': [[0, 36, 'VERIFIED', 0]]}
+
+
+@pytest.mark.parametrize('analysis', ['plain summary text', json.dumps(['a', 'list']), json.dumps({'fact_score': 3}), None])
+def test_pack_analysis_leaves_other_payloads_alone(analysis):
+    assert pack_analysis(analysis, TRANSCRIPT) == analysis
@@ -0,0 +1,86 @@
+import pytest
+
+from services.claim_alignment import SegmentIndex, align_claims, format_timestamp
+
+SEGMENTS = [
+    {'start': 0.0, 'duration': 4.0, 'text': 'Welcome back to the show.'},
+    {'start': 4.0, 'duration': 5.5, 'text': 'The Pacific Ocean covers more than'},
+    {'start': 9.5, 'duration': 4.5, 'text': 'sixty million square miles of the planet.'},
+    {'start': 3725.0, 'duration': 6.0, 'text': 'Honestly summer is the best season for a beach holiday.'},
+]
+TRANSCRIPT = ' '.join(segment['text'] for segment in SEGMENTS)
+SEGMENT_STARTS = [TRANSCRIPT.index(segment['text']) for segment in SEGMENTS]
+
+
+@pytest.fixture
+def index():
+    return SegmentIndex(TRANSCRIPT, SEGMENTS)
+
+
+def test_segment_starts_are_found_in_the_transcript(index):
+    assert index.starts == SEGMENT_STARTS
+
+
+def test_segment_at_boundaries(index):
+    for number, start in enumerate(SEGMENT_STARTS):
+        assert index.segment_at(start) == number
+        if start:
+            # The separating space belongs to the segment before
+            assert index.segment_at(start - 1) == number - 1
+    assert index.segment_at(0) == 0
+    assert index.segment_at(len(TRANSCRIPT) + 100) == len(SEGMENTS) - 1
+
+
+def test_time_range_across_segments(index):
+    start = TRANSCRIPT.index('The Pacific')
+    end = TRANSCRIPT.index('planet.') + len('planet.')
+    assert index.time_range(start, end) == (1, 2, 4.0, 14.0)
+
+
+def test_time_range_ending_on_a_boundary_stays_in_the_segment(index):
+    start, end = SEGMENT_STARTS[1], SEGMENT_STARTS[1] + len(SEGMENTS[1]['text'])
+    assert index.time_range(start, end) == (1, 1, 4.0, 9.5)
+
+
+@pytest.mark.parametrize('seconds, expected', [
+    (0, '00:00'),
+    (59.9, '00:59'),
+    (754, '12:34'),
+    (3599, '59:59'),
+    (3600, '1:00:00'),
+    (3725, '1:02:05'),
+    (36000, '10:00:00'),
+])
+def test_format_timestamp(seconds, expected):
+    assert format_timestamp(seconds) == expected
+
+
+def test_align_claims_writes_segment_timestamps():
+    analysis = {
+        'verified_claims': [{'claim': 'The Pacific Ocean covers more than sixty million square miles of the planet.',
+                             'timestamp': 'Throughout'}],
+        'opinion_claims': [{'claim': 'Honestly summer is the best season for a beach holiday.', 'timestamp': '12:30'}],
+    }
+
+    assert align_claims(TRANSCRIPT, SEGMENTS, analysis) == 2
+
+    verified = analysis['verified_claims'][0]
+    assert (verified['timestamp'], verified['start_seconds'], verified['end_seconds']) == ('00:04', 4.0, 14.0)
+    assert verified['segment_range'] == [1, 2]
+    opinion = analysis['opinion_claims'][0]
+    assert (opinion['timestamp'], opinion['segment_range']) == ('1:02:05', [3, 3])
+
+
+def test_unmatched_claims_keep_the_llm_timestamp():
+    claim = {'claim': 'Quantum computers factor large primes in polynomial time today', 'timestamp': '05:00'}
+    analysis = {'false_claims': [claim]}
+
+    assert align_claims(TRANSCRIPT, SEGMENTS, analysis) == 0
+    assert claim == {'claim': 'Quantum computers factor large primes in polynomial time today', 'timestamp': '05:00'}
+
+
+def test_nothing_to_align_without_segments():
+    analysis = {'verified_claims': [{'claim': 'Welcome back to the show everyone.', 'timestamp': '00:10'}]}
+    assert align_claims(TRANSCRIPT, [], analysis) == 0
+    assert align_claims(TRANSCRIPT, SEGMENTS, None) == 0
+    assert analysis['verified_claims'][0]['timestamp'] == '00:10'
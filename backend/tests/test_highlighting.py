@@ -0,0 +1,120 @@
+from services.highlighting import (
+    TranscriptIndex, find_highlight_spans, match_claims, render_span_list, span_list, spans_from_tagged,
+    with_highlighted_transcript,
+)
+
+TRANSCRIPT = (
+    "Welcome back to the show. Today we are talking about the ocean and climate. "
+    "The Pacific Ocean covers more than sixty million square miles of the planet. "
+    "Honestly I think summer is the best season for a beach holiday with the family. "
+    "so the great wall of china is visible from the moon with the naked eye according to my uncle "
+    "and that is why we should all go and see it for ourselves next year "
+    "Thanks for watching and see you next time."
+)
+
+
+def _analysis(**claims):
+    return {name: [{'claim': text} for text in texts] for name, texts in claims.items()}
+
+
+def _spans(analysis):
+    return find_highlight_spans(TRANSCRIPT, analysis, TranscriptIndex(TRANSCRIPT))
+
+
+def _assert_non_overlapping(spans):
+    for before, after in zip(spans, spans[1:]):
+        assert before['end'] <= after['start']
+
+
+def test_exact_claim_is_highlighted_verbatim():
+    claim = "The Pacific Ocean covers more than sixty million square miles of the planet."
+    spans = _spans(_analysis(verified_claims=[claim]))
+
+    assert len(spans) == 1
+    assert TRANSCRIPT[spans[0]['start']:spans[0]['end']] == claim
+    assert (spans[0]['verdict'], spans[0]['list'], spans[0]['index']) == ('VERIFIED', 'verified_claims', 0)
+
+
+def test_paraphrased_claim_falls_back_to_its_sentence():
+    spans = _spans(_analysis(opinion_claims=["The speaker believes summer is the best beach holiday season"]))
+
+    assert len(spans) == 1
+    assert spans[0]['verdict'] == 'OPINION'
+    assert spans[0]['method'].startswith('word-overlap')
+    assert TRANSCRIPT[spans[0]['start']:spans[0]['end']] == \
+        "Honestly I think summer is the best season for a beach holiday with the family."
+
+
+def test_caption_style_claim_without_punctuation():
+    claim = "the Great Wall of China is visible from the Moon with the naked eye"
+    spans = _spans(_analysis(false_claims=[claim]))
+
+    assert len(spans) == 1
+    assert spans[0]['verdict'] == 'FALSE'
+    assert spans[0]['method'].startswith('shingle')
+    assert TRANSCRIPT[spans[0]['start']:spans[0]['end']].lower() == claim.lower()
+
+
+def test_every_verdict_in_one_pass_without_overlaps():
+    analysis = _analysis(
+        verified_claims=["The Pacific Ocean covers more than sixty million square miles of the planet."],
+        opinion_claims=["Summer is the best season for a beach holiday with the family"],
+        false_claims=["the great wall of china is visible from the moon with the naked eye"],
+        uncertain_claims=["The Pacific Ocean covers more than sixty million square miles"],  # Inside the first
+    )
+    spans = _spans(analysis)
+
+    assert [span['verdict'] for span in spans] == ['VERIFIED', 'OPINION', 'FALSE']
+    _assert_non_overlapping(spans)
+    # The shorter, overlapping claim still matched - it just lost the overlap
+    assert len(match_claims(TRANSCRIPT, analysis)) == 4
+
+
+def test_unmatched_claim_has_no_span():
+    analysis = _analysis(verified_claims=["Quantum computers factor large primes in polynomial time today"])
+    assert match_claims(TRANSCRIPT, analysis) == []
+    assert _spans(analysis) == []
+
+
+def test_short_and_malformed_claims_are_skipped():
+    analysis = {'verified_claims': [{'claim': 'Too short'}, 'not a dict', {'claim': None}]}
+    assert match_claims(TRANSCRIPT, analysis) == []
+    assert match_claims('', analysis) == []
+    assert match_claims(TRANSCRIPT, None) == []
+
+
+# -- compatibility rendering (full_transcript_with_highlights) ----------------
+
+def test_rendered_spans_strip_back_to_the_transcript():
+    analysis = _analysis(
+        verified_claims=["The Pacific Ocean covers more than sixty million square miles of the planet."],
+        false_claims=["the great wall of china is visible from the moon with the naked eye"],
+    )
+    rows = span_list(_spans(analysis))
+
+    plain, spans = spans_from_tagged(render_span_list(TRANSCRIPT, rows))
+
+    assert plain == TRANSCRIPT
+    assert [[s['start'], s['end'], s['verdict']] for s in spans] == [row[:3] for row in rows]
+
+
+def test_rendering_keeps_the_baseline_tag_format():
+    transcript = 'Water boils at 100 degrees. Cats are the best pets.'
+    rendered = render_span_list(transcript, [[0, 27, 'VERIFIED', 0], [28, 51, 'OPINION', 0]])
+    assert rendered == '[VERIFIED] Water boils at 100 degrees.[/VERIFIED] [OPINION] Cats are the best pets.[/OPINION]'
+    assert spans_from_tagged(rendered)[0] == transcript
+
+
+def test_with_highlighted_transcript_fills_the_copy_once():
+    transcript = 'Water boils at 100 degrees. Cats are the best pets.'
+    analysis = {'highlight_spans': [[0, 27, 'VERIFIED', 0]]}
+
+    with_highlighted_transcript(analysis, transcript)
+    assert analysis['full_transcript_with_highlights'] == \
+        '[VERIFIED] Water boils at 100 degrees.[/VERIFIED] Cats are the best pets.'
+
+    # A copy that is already there (older rows) is left alone; no spans, nothing rendered
+    stored = {'highlight_spans': [[0, 27, 'VERIFIED', 0]], 'full_transcript_with_highlights': 'stored copy'}
+    assert with_highlighted_transcript(stored, transcript)['full_transcript_with_highlights'] == 'stored copy'
+    assert 'full_transcript_with_highlights' not in with_highlighted_transcript({}, transcript)
+    assert with_highlighted_transcript('summary text', transcript) == 'summary text'
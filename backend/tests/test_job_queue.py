@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from services.job_queue import (
+    SQLiteJobStore, STATUS_QUEUED, STATUS_RUNNING, STATUS_COMPLETED, STATUS_FAILED, abandon_job, run_job
+)
+
+abandoned_payloads = []
+
+
+def handler(payload, report):
+    return {'ok': True}
+
+
+handler.on_abandoned = lambda payload, error: abandoned_payloads.append((payload, error))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / 'jobs.sqlite3'))
+
+
+def _age(store, job_id, seconds):
+    """Pretend the job's last heartbeat was `seconds` ago"""
+    conn = sqlite3.connect(store.path)
+    try:
+        conn.execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (time.time() - seconds, job_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_claim_next_hands_each_job_to_one_worker(store):
+    job_ids = {store.enqueue('test_job_queue:handler', {'n': n}) for n in range(40)}
+    claimed = []
+    claimed_lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            job = store.claim_next(name)
+            if job is None:
+                return
+            with claimed_lock:
+                claimed.append(job['id'])
+
+    threads = [threading.Thread(target=worker, args=(f'w{i}',)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+    for job_id in job_ids:
+        job = store.get(job_id)
+        assert job['status'] == STATUS_RUNNING
+        assert job['attempts'] == 1
+
+
+def test_claim_next_is_fifo_and_empty_queue_returns_none(store):
+    first = store.enqueue('test_job_queue:handler', {})
+    second = store.enqueue('test_job_queue:handler', {})
+    assert store.claim_next('w')['id'] == first
+    assert store.claim_next('w')['id'] == second
+    assert store.claim_next('w') is None
+
+
+def test_requeue_stale_requeues_silent_jobs_only(store):
+    stale_id = store.enqueue('test_job_queue:handler', {})
+    fresh_id = store.enqueue('test_job_queue:handler', {})
+    store.claim_next('w1:100')
+    store.claim_next('w2:200')
+    _age(store, stale_id, 600)
+
+    requeued, abandoned = store.requeue_stale(stale_seconds=300, max_attempts=3)
+
+    assert (requeued, abandoned) == (1, [])
+    assert store.get(stale_id)['status'] == STATUS_QUEUED
+    assert store.get(stale_id)['worker_id'] is None
+    assert store.get(fresh_id)['status'] == STATUS_RUNNING
+
+
+def test_heartbeat_keeps_a_job_and_is_fenced_on_its_worker(store):
+    job_id = store.enqueue('test_job_queue:handler', {})
+    store.claim_next('w1:100')
+    _age(store, job_id, 600)
+    assert store.heartbeat(job_id, 'w1:100')
+    assert store.requeue_stale(stale_seconds=300, max_attempts=3) == (0, [])
+
+    _age(store, job_id, 600)
+    store.requeue_stale(stale_seconds=300, max_attempts=3)
+    store.claim_next('w2:200')
+    # The first worker lost the job; its heartbeat must not touch the new owner's run
+    assert not store.heartbeat(job_id, 'w1:100')
+    assert store.heartbeat(job_id, 'w2:200')
+
+
+def test_complete_and_fail_are_fenced_on_the_owning_worker(store):
+    job_id = store.enqueue('test_job_queue:handler', {})
+    store.claim_next('w1:100')
+    _age(store, job_id, 600)
+    store.requeue_stale(stale_seconds=300, max_attempts=3)
+    store.claim_next('w2:200')
+
+    # The slow first worker finishes late: neither outcome may overwrite the new owner's run
+    assert not store.complete(job_id, {'from': 'w1'}, worker_id='w1:100')
+    assert not store.fail(job_id, 'late failure', worker_id='w1:100')
+    assert store.get(job_id)['status'] == STATUS_RUNNING
+
+    assert store.complete(job_id, {'from': 'w2'}, worker_id='w2:200')
+    job = store.get(job_id)
+    assert (job['status'], job['result']) == (STATUS_COMPLETED, {'from': 'w2'})
+    assert not store.fail(job_id, 'after completion', worker_id='w2:200')
+
+
+def test_abandoned_job_stays_failed_when_its_worker_finishes(store):
+    job_id = store.enqueue('test_job_queue:handler', {})
+    store.claim_next('w1:100')
+    _age(store, job_id, 600)
+    store.requeue_stale(stale_seconds=300, max_attempts=1)
+
+    assert not store.complete(job_id, {'ok': True}, worker_id='w1:100')
+    assert store.get(job_id)['status'] == STATUS_FAILED
+
+
+def test_run_job_records_its_outcome_only_while_it_owns_the_job(store):
+    job_id = store.enqueue('test_job_queue:handler', {})
+    job = store.claim_next('w1:100')
+    run_job(store, job)
+    assert store.get(job_id)['status'] == STATUS_COMPLETED
+
+    other_id = store.enqueue('test_job_queue:handler', {})
+    job = store.claim_next('w1:100')
+    _age(store, other_id, 600)
+    store.requeue_stale(stale_seconds=300, max_attempts=1)
+    run_job(store, job)
+    assert store.get(other_id)['status'] == STATUS_FAILED
+
+
+def test_requeue_stale_fails_jobs_out_of_attempts(store):
+    job_id = store.enqueue('test_job_queue:handler', {'video_id': 'v1'})
+    for attempt in range(3):
+        assert store.claim_next(f'w:{attempt}')['id'] == job_id
+        _age(store, job_id, 600)
+        requeued, abandoned = store.requeue_stale(stale_seconds=300, max_attempts=3)
+
+    assert requeued == 0
+    assert [job['id'] for job in abandoned] == [job_id]
+    job = store.get(job_id)
+    assert job['status'] == STATUS_FAILED
+    assert job['attempts'] == 3
+    assert store.claim_next('w:3') is None
+
+
+def test_abandon_job_calls_the_handlers_cleanup_hook():
+    abandoned_payloads.clear()
+    abandon_job({'id': 'job-1', 'handler': 'test_job_queue:handler', 'payload': {'video_id': 'v1'},
+                 'error': 'Job worker stopped responding (3 attempts)'})
+    assert abandoned_payloads == [({'video_id': 'v1'}, 'Job worker stopped responding (3 attempts)')]
+
+
+def test_abandon_job_never_raises():
+    abandon_job({'id': 'job-2', 'handler': 'no_such_module:handler', 'payload': {}})
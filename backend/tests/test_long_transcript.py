@@ -0,0 +1,119 @@
+import pytest
+
+import services.analysis_cache as analysis_cache
+from services.analysis_cache import AnalysisCache
+from services.long_transcript import chunk_transcript, reduce_fact_checks, sentence_spans
+from services.video_processor import VideoProcessor
+
+
+def _sentences(count):
+    return ' '.join(f"Sentence number {n} says the tower is {n} meters tall." for n in range(count))
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setattr(analysis_cache, '_cache', AnalysisCache())
+    monkeypatch.setenv('LONG_TRANSCRIPT_CHARS', '1000')
+    monkeypatch.setenv('FACTCHECK_CHUNK_CHARS', '600')
+    monkeypatch.setenv('FACTCHECK_OVERLAP_CHARS', '100')
+    return VideoProcessor.__new__(VideoProcessor)  # No API clients - analysis is stubbed per test
+
+
+def _chunk_result(chunk):
+    return {'fact_score': 8, 'verified_claims': [{'claim': chunk[:40], 'verdict': 'True'}]}
+
+
+def test_map_reduce_with_failed_chunks_is_not_cached(processor, monkeypatch):
+    transcript = _sentences(60)
+    calls = []
+
+    def analyze(chunk, analysis_type, provider, on_event=None):
+        calls.append(chunk)
+        if len(calls) == 2:
+            raise Exception('HTTP Error 429: Too Many Requests')
+        return _chunk_result(chunk)
+
+    monkeypatch.setattr(processor, '_analyze_with_provider', analyze)
+    first = processor.analyze_transcript(transcript, 'fact-check')
+    assert first['chunks_failed'] == 1
+
+    calls_before = len(calls)
+    second = processor.analyze_transcript(transcript, 'fact-check')
+    assert len(calls) > calls_before  # Analyzed again instead of served from the cache
+    assert second['chunks_failed'] == 0
+
+
+def test_complete_map_reduce_is_cached(processor, monkeypatch):
+    transcript = _sentences(60)
+    calls = []
+
+    def analyze(chunk, analysis_type, provider, on_event=None):
+        calls.append(chunk)
+        return _chunk_result(chunk)
+
+    monkeypatch.setattr(processor, '_analyze_with_provider', analyze)
+    first = processor.analyze_transcript(transcript, 'fact-check')
+    calls_before = len(calls)
+    assert processor.analyze_transcript(transcript, 'fact-check') == first
+    assert len(calls) == calls_before
+
+
+# -- chunking -----------------------------------------------------------------
+
+def test_chunks_cover_the_text_and_overlap_on_sentence_boundaries():
+    text = _sentences(80)
+    chunks = chunk_transcript(text, chunk_chars=600, overlap_chars=150)
+
+    assert len(chunks) > 3
+    assert chunks[0][0] == 0
+    assert chunks[-1][0] + len(chunks[-1][1]) == len(text)
+    sentence_starts = {start for start, _ in sentence_spans(text)}
+    for (start, chunk), (next_start, next_chunk) in zip(chunks, chunks[1:]):
+        assert text[start:start + len(chunk)] == chunk
+        assert len(chunk) <= 600
+        assert next_start in sentence_starts
+        end = start + len(chunk)
+        assert start < next_start < end  # Overlaps the previous chunk...
+        assert end - next_start <= 150  # ...by at most the overlap budget
+        assert chunk.rstrip().endswith('.')
+
+
+def test_unpunctuated_captions_still_chunk():
+    text = ' '.join(f'word{n}' for n in range(2000))
+    chunks = chunk_transcript(text, chunk_chars=1000, overlap_chars=100)
+    assert chunks[-1][0] + len(chunks[-1][1]) == len(text)
+    assert all(len(chunk) <= 1000 for _, chunk in chunks)
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_transcript('Just one sentence.', chunk_chars=600) == [(0, 'Just one sentence.')]
+
+
+# -- reduce -------------------------------------------------------------------
+
+def test_claim_repeated_in_the_overlap_is_kept_once():
+    claim = 'The Eiffel Tower is 330 meters tall including its antennas'
+    first = {'fact_score': 8, 'verified_claims': [{'claim': claim, 'confidence': 'medium'}]}
+    second = {'fact_score': 8, 'verified_claims': [
+        {'claim': claim + '.', 'confidence': 'high', 'sources': ['https://www.toureiffel.paris']},
+        {'claim': 'Water boils at 100 degrees Celsius at sea level', 'confidence': 'high'},
+    ]}
+
+    reduced = reduce_fact_checks([first, second], [1000, 1000])
+
+    claims = [c['claim'] for c in reduced['verified_claims']]
+    assert claims == [claim + '.', 'Water boils at 100 degrees Celsius at sea level']
+    assert reduced['verified_claims'][0]['confidence'] == 'high'  # The stronger copy wins
+
+
+def test_fact_score_is_weighted_by_chunk_length():
+    one_claim = [{'claim': 'A claim that appears in this chunk only', 'confidence': 'high'}]
+    long_chunk = {'fact_score': 9, 'verified_claims': one_claim}
+    short_chunk = {'fact_score': 3, 'false_claims': [{'claim': 'A different claim from the short chunk'}]}
+
+    reduced = reduce_fact_checks([long_chunk, short_chunk], [3000, 1000])
+    assert reduced['fact_score'] == 7.5  # (9 * 3000 + 3 * 1000) / 4000
+    assert reduced['overall_verdict'] == 'Mostly Accurate'
+    assert reduced['chunks_analyzed'] == 2
+
+    assert reduce_fact_checks([long_chunk, short_chunk], [1000, 3000])['fact_score'] == 4.5
@@ -0,0 +1,76 @@
+import pytest
+
+from services.minute_ledger import MinuteReservation, UserNotFound, reserve_minutes
+from services.video_pipeline import abandon_video_job, process_video_for_user, run_video_job
+
+
+def test_release_is_idempotent(fake_supabase):
+    reservation = MinuteReservation('res-1', 5)
+    reservation.release()
+    reservation.release()
+    assert fake_supabase.rpc_calls('release_minute_reservation') == [{'p_reservation_id': 'res-1'}]
+
+
+def test_release_without_ledger_is_a_no_op(fake_supabase):
+    MinuteReservation(None, 5).release()
+    assert fake_supabase.calls == []
+
+
+def test_failed_video_releases_its_reservation(fake_supabase):
+    # No users row -> 404 before any processing; the queued job's hold must be given back
+    response, status = process_video_for_user('missing-user', 'https://youtu.be/dQw4w9WgXcQ', 'summarize',
+                                              reservation_id='res-2')
+    assert status == 404
+    assert fake_supabase.rpc_calls('release_minute_reservation') == [{'p_reservation_id': 'res-2'}]
+
+
+def test_failed_job_releases_and_marks_the_video_failed(fake_supabase):
+    from services.job_queue import JobFailed
+
+    payload = {'user_id': 'missing-user', 'url': 'https://youtu.be/dQw4w9WgXcQ', 'analysis_type': 'summarize',
+               'video_id': 'video-1', 'reservation_id': 'res-3'}
+    with pytest.raises(JobFailed):
+        run_video_job(payload, lambda stage, progress: None)
+
+    assert fake_supabase.rpc_calls('release_minute_reservation') == [{'p_reservation_id': 'res-3'}]
+    assert ({'processing_status': 'failed', 'error_message': 'User not found'}, {'id': 'video-1'}) \
+        in fake_supabase.updates('videos')
+
+
+def test_abandoned_job_releases_and_marks_the_video_failed(fake_supabase):
+    abandon_video_job({'video_id': 'video-2', 'reservation_id': 'res-4'}, 'Job worker stopped responding (3 attempts)')
+
+    assert fake_supabase.rpc_calls('release_minute_reservation') == [{'p_reservation_id': 'res-4'}]
+    assert fake_supabase.updates('videos') == [
+        ({'processing_status': 'failed', 'error_message': 'Job worker stopped responding (3 attempts)'},
+         {'id': 'video-2'})
+    ]
+
+
+def test_completed_video_is_not_processed_or_charged_again(fake_supabase):
+    fake_supabase.tables['videos'] = [{
+        'id': 'video-3', 'processing_status': 'completed', 'video_url': 'https://youtu.be/dQw4w9WgXcQ',
+        'analysis_type': 'summarize', 'analysis': 'summary', 'transcription': 'text', 'minutes_charged': 4,
+    }]
+    result = run_video_job({'user_id': 'u1', 'url': 'https://youtu.be/dQw4w9WgXcQ', 'video_id': 'video-3',
+                            'reservation_id': 'res-5'}, lambda stage, progress: None)
+
+    assert result['success'] and result['minutes_charged'] == 4
+    assert fake_supabase.rpc_calls('reserve_minutes') == []
+    assert fake_supabase.updates('videos') == []
+
+
+def test_reserve_minutes_unknown_user_raises_lookup_error():
+    class MissingUserError(Exception):
+        message = 'reserve_minutes: user u404 not found'
+
+    class Client:
+        def rpc(self, name, params):
+            return self
+
+        def execute(self):
+            raise MissingUserError(self)
+
+    with pytest.raises(UserNotFound):
+        reserve_minutes('u404', 3, supabase=Client())
+    assert issubclass(UserNotFound, LookupError)
@@ -0,0 +1,140 @@
+import time
+
+import jwt
+import pytest
+from flask import Flask, jsonify, request
+
+import middleware.auth_middleware as auth_middleware
+from config import FeatureFlags
+from services.token_verifier import TokenVerificationError, TokenVerifier, set_token_verifier
+
+SECRET = 'test'
+USER_ID = '6f1c1a52-9a1e-4a84-a2a4-5b3c2f4f8e10'
+
+
+def make_token(secret=SECRET, **overrides):
+    claims = {'sub': USER_ID, 'email': 'user@example.com', 'aud': 'authenticated', 'role': 'authenticated',
+              'exp': int(time.time()) + 3600}
+    claims.update(overrides)
+    return jwt.encode(claims, secret, algorithm='HS256')
+
+
+@pytest.fixture
+def verifier():
+    verifier = TokenVerifier(jwt_secret=SECRET, audience='authenticated', cache_ttl=60)
+    set_token_verifier(verifier)
+    yield verifier
+    set_token_verifier(None)
+
+
+def test_accepts_a_valid_token(verifier):
+    claims = verifier.verify(make_token())
+    assert claims['sub'] == USER_ID
+    assert verifier.get_stats()['verified'] == 1
+
+
+@pytest.mark.parametrize('token', [
+    make_token(exp=int(time.time()) - 3600),
+    make_token(aud='anon'),
+    make_token(secret='some-other-secret'),
+    'not.a.jwt',
+], ids=['expired', 'wrong-audience', 'bad-signature', 'malformed'])
+def test_rejects_bad_tokens_without_falling_back(verifier, token):
+    with pytest.raises(TokenVerificationError) as excinfo:
+        verifier.verify(token)
+    assert not excinfo.value.fallback
+
+
+def test_missing_secret_falls_back():
+    with pytest.raises(TokenVerificationError) as excinfo:
+        TokenVerifier(jwt_secret=None).verify(make_token())
+    assert excinfo.value.fallback
+
+
+def test_claims_cache_expires_with_the_token(verifier):
+    token = make_token(exp=int(time.time()) + 5)
+    verifier.verify(token)
+    (_, expires_at), = verifier._cache.values()
+    assert expires_at <= time.time() + 5
+
+    verifier.verify(token)
+    assert verifier.get_stats()['cache_hits'] == 1
+
+
+def test_claims_cache_is_capped_by_its_ttl(verifier):
+    verifier.verify(make_token())
+    (_, expires_at), = verifier._cache.values()
+    assert expires_at <= time.time() + verifier.cache_ttl
+
+
+# -- middleware ---------------------------------------------------------------
+
+class SupabaseUser:
+    id = 'supabase-user'
+    email = 'supabase@example.com'
+
+
+@pytest.fixture
+def client(monkeypatch, verifier):
+    monkeypatch.setattr(FeatureFlags, 'USE_LOCAL_JWT', True)
+    supabase_calls = []
+
+    def verify_with_supabase(token):
+        supabase_calls.append(token)
+        return SupabaseUser()
+
+    monkeypatch.setattr(auth_middleware, '_verify_with_supabase', verify_with_supabase)
+
+    app = Flask(__name__)
+
+    @app.route('/me')
+    @auth_middleware.verify_token
+    def me():
+        return jsonify({'user_id': request.user_id})
+
+    @app.route('/strict')
+    @auth_middleware.verify_token(strict=True)
+    def strict():
+        return jsonify({'user_id': request.user_id})
+
+    test_client = app.test_client()
+    test_client.supabase_calls = supabase_calls
+    return test_client
+
+
+def _get(client, path, token):
+    return client.get(path, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_middleware_accepts_a_local_token_without_supabase(client):
+    response = _get(client, '/me', make_token())
+    assert response.status_code == 200
+    assert response.get_json() == {'user_id': USER_ID}
+    assert client.supabase_calls == []
+
+
+def test_middleware_rejects_bad_tokens_without_asking_supabase(client):
+    response = _get(client, '/me', make_token(secret='some-other-secret'))
+    assert response.status_code == 401
+    assert client.supabase_calls == []
+
+
+def test_middleware_falls_back_to_supabase_without_a_key(client):
+    set_token_verifier(TokenVerifier(jwt_secret=None))
+    token = make_token()
+    response = _get(client, '/me', token)
+    assert response.status_code == 200
+    assert response.get_json() == {'user_id': 'supabase-user'}
+    assert client.supabase_calls == [token]
+
+
+def test_strict_routes_always_ask_supabase(client, verifier):
+    token = make_token()
+    response = _get(client, '/strict', token)
+    assert response.get_json() == {'user_id': 'supabase-user'}
+    assert client.supabase_calls == [token]
+    assert verifier.get_stats()['verified'] == 0
+
+
+def test_middleware_requires_a_token(client):
+    assert client.get('/me').status_code == 401
@@ -0,0 +1,82 @@
+import pytest
+
+from services.transcript_cache import TranscriptCache, canonical_video_key
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+@pytest.mark.parametrize('url', [
+    f'https://www.youtube.com/watch?v={VIDEO_ID}',
+    f'https://youtu.be/{VIDEO_ID}',
+    f'https://youtu.be/{VIDEO_ID}?si=abc123&t=42',
+    f'https://www.youtube.com/watch?v={VIDEO_ID}&t=30',
+    f'https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&list=PL123',
+    f'https://m.youtube.com/watch?v={VIDEO_ID}',
+    f'youtube.com/watch?v={VIDEO_ID}',
+    f'https://www.youtube.com/shorts/{VIDEO_ID}',
+    f'https://www.youtube.com/embed/{VIDEO_ID}?autoplay=1',
+    f'https://www.youtube-nocookie.com/embed/{VIDEO_ID}',
+    f'https://www.youtube.com/live/{VIDEO_ID}',
+    f'  {VIDEO_ID}  ',
+])
+def test_youtube_url_forms_share_one_key(url):
+    assert canonical_video_key(url) == ('youtube', VIDEO_ID)
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.instagram.com/reel/C1a2B3c4D5e/',
+    'https://www.instagram.com/reels/C1a2B3c4D5e',
+    'https://www.instagram.com/p/C1a2B3c4D5e/?igsh=xyz',
+    'https://instagram.com/some.creator/reel/C1a2B3c4D5e/',
+])
+def test_instagram_url_forms_share_one_key(url):
+    assert canonical_video_key(url) == ('instagram', 'C1a2B3c4D5e')
+
+
+@pytest.mark.parametrize('url', [
+    None,
+    '',
+    'https://vimeo.com/123456',
+    'https://www.youtube.com/@somechannel',
+    'https://www.youtube.com/watch?v=tooshort',
+    'not a url at all',
+])
+def test_unrecognized_urls_have_no_key(url):
+    assert canonical_video_key(url) == (None, None)
+
+
+def test_entries_are_shared_across_url_forms():
+    cache = TranscriptCache(persist=False)
+    cache.put(f'https://youtu.be/{VIDEO_ID}', 'hello world', segments=[{'start': 0, 'duration': 1, 'text': 'hello world'}],
+              title='A video', duration_minutes=3.5)
+
+    entry = cache.get(f'https://m.youtube.com/watch?v={VIDEO_ID}&t=30')
+    assert entry['text'] == 'hello world'
+    assert (entry['platform'], entry['video_id'], entry['language']) == ('youtube', VIDEO_ID, 'en')
+    assert entry['title'] == 'A video' and entry['duration_minutes'] == 3.5
+    assert cache.get('https://youtu.be/aaaaaaaaaaa') is None
+    assert cache.get_stats()['memory_hits'] == 1
+
+
+def test_language_selection():
+    cache = TranscriptCache(persist=False)
+    cache.put(f'https://www.youtube.com/shorts/{VIDEO_ID}', 'hola mundo', language='es')
+    # Only Spanish so far: no preference gets it, an English request doesn't
+    assert cache.get(VIDEO_ID)['text'] == 'hola mundo'
+    assert cache.get(VIDEO_ID, language='en') is None
+
+    cache.put(f'https://www.youtube.com/embed/{VIDEO_ID}', 'hello world', language='en')
+    assert cache.get(f'https://youtu.be/{VIDEO_ID}')['text'] == 'hello world'  # English preferred
+    assert cache.get(f'https://youtu.be/{VIDEO_ID}', language='es')['text'] == 'hola mundo'
+    assert cache.get(f'https://youtu.be/{VIDEO_ID}', language='fr') is None
+
+
+def test_put_keeps_known_metadata_and_ignores_unrecognized_urls():
+    cache = TranscriptCache(persist=False)
+    cache.put(VIDEO_ID, 'text', title='Title')
+    cache.put(f'https://youtu.be/{VIDEO_ID}', 'text', duration_minutes=2.0)
+    entry = cache.get(VIDEO_ID)
+    assert (entry['title'], entry['duration_minutes']) == ('Title', 2.0)
+
+    assert cache.put('https://vimeo.com/123456', 'text') is None
+    assert cache.get('https://vimeo.com/123456') is None
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import services.transcription as transcription
+from services.transcription import SAMPLE_RATE, find_chunk_boundaries
+
+RATE = 1000  # Samples per second - small arrays, same arithmetic
+# Quiet stretches as (start, end) seconds, one near each 10s target
+SILENCES = [(9.2, 9.5), (20.4, 20.7), (31.0, 31.3)]
+
+
+def _speech_with_silences(seconds, silences, rate):
+    audio = np.random.default_rng(7).uniform(-0.5, 0.5, int(seconds * rate)).astype(np.float32)
+    for start, end in silences:
+        audio[int(start * rate):int(end * rate)] = 0.0
+    return audio
+
+
+def test_boundaries_land_in_silences():
+    audio = _speech_with_silences(40, SILENCES, RATE)
+    boundaries = find_chunk_boundaries(audio, chunk_seconds=10, search_seconds=2, sample_rate=RATE)
+
+    cuts = [end / RATE for _, end in boundaries[:-1]]
+    assert len(cuts) == len(SILENCES)
+    for cut, (start, end) in zip(cuts, SILENCES):
+        assert start <= cut < end
+
+
+def test_boundaries_cover_the_audio_and_respect_the_max_length():
+    audio = _speech_with_silences(95, [], RATE)
+    chunk_seconds, search_seconds = 10, 2
+    boundaries = find_chunk_boundaries(audio, chunk_seconds=chunk_seconds, search_seconds=search_seconds, sample_rate=RATE)
+
+    assert boundaries[0][0] == 0 and boundaries[-1][1] == len(audio)
+    for (_, end), (start, _) in zip(boundaries, boundaries[1:]):
+        assert end == start
+    lengths = [(end - start) / RATE for start, end in boundaries]
+    # Cuts move at most search_seconds from the target; only the tail may run to 1.5x
+    assert all(length <= chunk_seconds + search_seconds for length in lengths[:-1])
+    assert lengths[-1] <= chunk_seconds * 1.5
+
+
+def test_boundaries_are_deterministic():
+    audio = _speech_with_silences(40, SILENCES, RATE)
+    first = find_chunk_boundaries(audio, chunk_seconds=10, search_seconds=2, sample_rate=RATE)
+    assert find_chunk_boundaries(audio.copy(), chunk_seconds=10, search_seconds=2, sample_rate=RATE) == first
+
+
+def test_short_audio_is_one_chunk():
+    audio = np.zeros(14 * RATE, dtype=np.float32)
+    assert find_chunk_boundaries(audio, chunk_seconds=10, search_seconds=2, sample_rate=RATE) == [(0, len(audio))]
+
+
+class FakeModel:
+    """Splits whatever it is given into 2s segments, timed from the start of that chunk"""
+
+    def transcribe(self, audio, fp16=False, language=None):
+        seconds = len(audio) / SAMPLE_RATE
+        starts = np.arange(0, seconds, 2.0)
+        return {
+            'language': 'en',
+            'segments': [{'start': s, 'end': min(s + 2.0, seconds), 'text': f' words at {s:.0f}s '} for s in starts],
+        }
+
+
+class InlinePool:
+    def map(self, fn, tasks):
+        return [fn(task) for task in reversed(list(tasks))]  # Out of order, like a real pool can be
+
+
+def test_stitched_segments_use_global_offsets(monkeypatch):
+    monkeypatch.setattr(transcription, '_worker_model', FakeModel())
+    monkeypatch.setattr(transcription, '_get_pool', lambda workers, model_name: InlinePool())
+    audio = _speech_with_silences(45, SILENCES, SAMPLE_RATE)
+
+    result = transcription.transcribe_chunked(audio, workers=2, model_name='tiny', chunk_seconds=10)
+
+    starts = [segment['start'] for segment in result['segments']]
+    assert starts == sorted(starts) and len(set(starts)) == len(starts)
+    boundaries = find_chunk_boundaries(audio, chunk_seconds=10)
+    assert len(boundaries) > 1
+    for start, _ in boundaries:
+        assert round(start / SAMPLE_RATE, 3) in starts  # Each chunk's first segment starts at its offset
+    last = result['segments'][-1]
+    assert last['start'] + last['duration'] == pytest.approx(len(audio) / SAMPLE_RATE, abs=0.01)
+    assert result['text'].startswith('words at 0s words at 2s')
+    assert result['language'] == 'en'
@@ -0,0 +1,209 @@
+-- Migration: Content-addressed blob storage
+-- Description: Transcripts, segments and analyses move out of TEXT columns into
+--              content_blobs, keyed by the SHA-256 of the uncompressed bytes
+--              (see backend/services/blob_store.py). Rows keep only the hashes.
+-- Depends on: add_minute_ledger.sql, add_transcript_cache.sql
+-- Date: 2025-11-23
+
+-- =============================================================================
+-- 1. CONTENT_BLOBS TABLE
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS content_blobs (
+  hash TEXT PRIMARY KEY, -- SHA-256 (hex) of the uncompressed bytes
+  kind TEXT NOT NULL, -- 'transcript', 'segments', 'analysis'
+  codec TEXT NOT NULL, -- 'zstd', 'zlib'
+  size_bytes INTEGER NOT NULL, -- Uncompressed
+  stored_bytes INTEGER NOT NULL, -- Compressed
+  data TEXT NOT NULL, -- Base64 of the compressed bytes
+  created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Already compressed - don't let TOAST try again
+ALTER TABLE content_blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
+-- Backend only (service role); no direct client access
+ALTER TABLE content_blobs ENABLE ROW LEVEL SECURITY;
+
+-- =============================================================================
+-- 2. HASH COLUMNS
+-- =============================================================================
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS transcript_hash TEXT;
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS segments_hash TEXT;
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS analysis_hash TEXT;
+
+ALTER TABLE transcript_cache ADD COLUMN IF NOT EXISTS transcript_hash TEXT;
+ALTER TABLE transcript_cache ADD COLUMN IF NOT EXISTS segments_hash TEXT;
+-- Rows with a transcript_hash leave the inline text empty
+ALTER TABLE transcript_cache ALTER COLUMN transcription DROP NOT NULL;
+
+-- Used by prune_content_blobs
+CREATE INDEX IF NOT EXISTS idx_videos_transcript_hash ON videos(transcript_hash) WHERE transcript_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_videos_segments_hash ON videos(segments_hash) WHERE segments_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_videos_analysis_hash ON videos(analysis_hash) WHERE analysis_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_transcript_cache_transcript_hash ON transcript_cache(transcript_hash) WHERE transcript_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_transcript_cache_segments_hash ON transcript_cache(segments_hash) WHERE segments_hash IS NOT NULL;
+
+-- =============================================================================
+-- 3. RECORD_VIDEO_RESULT STORES THE HASHES
+-- =============================================================================
+-- Same as add_minute_ledger.sql plus transcript_hash / segments_hash /
+-- analysis_hash from p_video (NULL when the payload is stored inline).
+CREATE OR REPLACE FUNCTION record_video_result(
+  p_user_id UUID,
+  p_video JSONB,
+  p_minutes DECIMAL,
+  p_video_id UUID DEFAULT NULL,
+  p_creator JSONB DEFAULT NULL,
+  p_fact_score DECIMAL DEFAULT NULL,
+  p_reservation_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_creator_id UUID;
+  v_creator JSONB;
+  v_video_id UUID := p_video_id;
+  v_minutes_used DECIMAL;
+BEGIN
+  -- Creator tracking (non-critical)
+  IF p_creator IS NOT NULL AND COALESCE(p_creator->>'name', '') <> '' THEN
+    BEGIN
+      v_creator_id := upsert_creator(
+        p_creator->>'name',
+        COALESCE(NULLIF(p_creator->>'platform_id', ''), 'unknown'),
+        COALESCE(p_creator->>'platform', p_video->>'platform', 'youtube'),
+        p_creator->>'channel_url',
+        (p_creator->>'subscriber_count')::NUMERIC::INTEGER,
+        p_creator->>'category'
+      );
+      PERFORM track_video_upload(p_video->>'video_url', v_creator_id);
+      IF p_fact_score IS NOT NULL THEN
+        PERFORM update_creator_stats(v_creator_id, p_fact_score);
+      END IF;
+      SELECT to_jsonb(c) INTO v_creator FROM creators c WHERE c.id = v_creator_id;
+    EXCEPTION WHEN OTHERS THEN
+      RAISE WARNING 'record_video_result: creator tracking failed: %', SQLERRM;
+      v_creator_id := NULL;
+      v_creator := NULL;
+    END;
+  END IF;
+
+  -- Video row
+  IF v_video_id IS NULL THEN
+    INSERT INTO videos (
+      user_id, video_url, title, platform, duration_minutes, transcription,
+      analysis, analysis_type, processing_status, minutes_charged, completed_at,
+      creator_id, creator_name, creator_platform_id, category,
+      transcript_hash, segments_hash, analysis_hash
+    )
+    VALUES (
+      p_user_id,
+      p_video->>'video_url',
+      COALESCE(p_video->>'title', 'Untitled'),
+      p_video->>'platform',
+      (p_video->>'duration_minutes')::DECIMAL,
+      p_video->>'transcription',
+      p_video->>'analysis',
+      p_video->>'analysis_type',
+      'completed',
+      p_minutes,
+      NOW(),
+      v_creator_id,
+      p_creator->>'name',
+      p_creator->>'platform_id',
+      p_creator->>'category',
+      p_video->>'transcript_hash',
+      p_video->>'segments_hash',
+      p_video->>'analysis_hash'
+    )
+    RETURNING id INTO v_video_id;
+  ELSE
+    UPDATE videos SET
+      video_url = p_video->>'video_url',
+      title = COALESCE(p_video->>'title', 'Untitled'),
+      platform = p_video->>'platform',
+      duration_minutes = (p_video->>'duration_minutes')::DECIMAL,
+      transcription = p_video->>'transcription',
+      analysis = p_video->>'analysis',
+      analysis_type = p_video->>'analysis_type',
+      processing_status = 'completed',
+      error_message = NULL,
+      minutes_charged = p_minutes,
+      completed_at = NOW(),
+      creator_id = v_creator_id,
+      creator_name = p_creator->>'name',
+      creator_platform_id = p_creator->>'platform_id',
+      category = p_creator->>'category',
+      transcript_hash = p_video->>'transcript_hash',
+      segments_hash = p_video->>'segments_hash',
+      analysis_hash = p_video->>'analysis_hash'
+    WHERE id = v_video_id AND user_id = p_user_id;
+
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'record_video_result: video % not found for user %', v_video_id, p_user_id;
+    END IF;
+  END IF;
+
+  -- Settle: drop the estimate, charge the actual minutes
+  IF p_reservation_id IS NOT NULL THEN
+    PERFORM release_minute_reservation(p_reservation_id);
+  END IF;
+
+  UPDATE users
+  SET minutes_used_this_month = COALESCE(minutes_used_this_month, 0) + p_minutes,
+      updated_at = NOW()
+  WHERE id = p_user_id
+  RETURNING minutes_used_this_month INTO v_minutes_used;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'record_video_result: user % not found', p_user_id;
+  END IF;
+
+  INSERT INTO minute_transactions (user_id, video_id, minutes_used, transaction_type, reservation_id)
+  VALUES (p_user_id, v_video_id, p_minutes, 'video_processing', p_reservation_id);
+
+  RETURN jsonb_build_object(
+    'video_id', v_video_id,
+    'minutes_used_this_month', v_minutes_used,
+    'creator', v_creator
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 4. PRUNING
+-- =============================================================================
+-- Blobs are shared, so deleting a video never deletes them. Run this
+-- periodically (or from the SQL editor) to drop blobs nothing references.
+CREATE OR REPLACE FUNCTION prune_content_blobs(
+  p_min_age INTERVAL DEFAULT INTERVAL '1 day'
+)
+RETURNS INTEGER AS $$
+DECLARE
+  v_deleted INTEGER;
+BEGIN
+  -- The age guard keeps blobs written just before their row was saved
+  DELETE FROM content_blobs b
+  WHERE b.created_at < NOW() - p_min_age
+    AND NOT EXISTS (SELECT 1 FROM videos v WHERE v.transcript_hash = b.hash)
+    AND NOT EXISTS (SELECT 1 FROM videos v WHERE v.segments_hash = b.hash)
+    AND NOT EXISTS (SELECT 1 FROM videos v WHERE v.analysis_hash = b.hash)
+    AND NOT EXISTS (SELECT 1 FROM transcript_cache t WHERE t.transcript_hash = b.hash)
+    AND NOT EXISTS (SELECT 1 FROM transcript_cache t WHERE t.segments_hash = b.hash);
+
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION prune_content_blobs(INTERVAL) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION prune_content_blobs(INTERVAL) TO service_role;
+
+-- =============================================================================
+-- 5. COMMENTS
+-- =============================================================================
+
+COMMENT ON TABLE content_blobs IS 'Compressed, deduplicated transcripts, segments and analyses (by SHA-256)';
+COMMENT ON COLUMN videos.transcript_hash IS 'content_blobs hash of the transcript (transcription is NULL when set)';
+COMMENT ON COLUMN videos.segments_hash IS 'content_blobs hash of the packed timestamped segments';
+COMMENT ON COLUMN videos.analysis_hash IS 'content_blobs hash of the analysis, highlights stored as spans (analysis is NULL when set)';
+COMMENT ON FUNCTION prune_content_blobs IS 'Deletes blobs no videos/transcript_cache row references';
@@ -0,0 +1,29 @@
+-- Migration: History listing indexes
+-- Description: Keyset pagination and indexed search for GET /api/videos/history
+-- Date: 2025-11-22
+
+-- =============================================================================
+-- 1. KEYSET INDEX
+-- =============================================================================
+-- History lists a user's completed videos newest first and pages with a
+-- (created_at, id) cursor. This index serves the filter, the order and the
+-- cursor predicate, so a page costs the same on page 1 and page 500.
+CREATE INDEX IF NOT EXISTS idx_videos_history
+  ON videos(user_id, created_at DESC, id DESC)
+  WHERE processing_status = 'completed';
+
+-- =============================================================================
+-- 2. SEARCH INDEXES
+-- =============================================================================
+-- Search is a substring match (ILIKE '%term%') on title and URL; trigram
+-- GIN indexes let Postgres answer it without scanning every row.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_videos_title_trgm ON videos USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_videos_url_trgm ON videos USING GIN (video_url gin_trgm_ops);
+
+-- =============================================================================
+-- 3. COMMENTS
+-- =============================================================================
+
+COMMENT ON INDEX idx_videos_history IS 'History listing: completed videos per user, keyset on (created_at, id)';
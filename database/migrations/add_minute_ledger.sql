@@ -0,0 +1,276 @@
+-- Migration: Minute ledger with reservations
+-- Description: Reserve minutes when a video is accepted, settle them when it
+--              completes. minute_transactions becomes the append-only ledger:
+--                reservation          - estimate held while the video is processed
+--                reservation_release  - the hold is returned (completed or failed)
+--                video_processing     - actual minutes charged
+-- Depends on: add_record_video_result.sql
+-- Date: 2025-11-21
+
+-- =============================================================================
+-- 1. COLUMNS AND INDEXES
+-- =============================================================================
+-- Minutes held by in-flight videos; the limit check is used + reserved < limit
+ALTER TABLE users ADD COLUMN IF NOT EXISTS minutes_reserved DECIMAL NOT NULL DEFAULT 0;
+
+-- Links release/charge rows to the reservation they settle
+ALTER TABLE minute_transactions ADD COLUMN IF NOT EXISTS reservation_id UUID REFERENCES minute_transactions(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_created ON minute_transactions(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_reservation ON minute_transactions(reservation_id) WHERE reservation_id IS NOT NULL;
+
+-- The ledger is append-only: clients may read their rows, never change them
+REVOKE INSERT, UPDATE, DELETE ON minute_transactions FROM anon, authenticated;
+
+-- =============================================================================
+-- 2. FUNCTIONS
+-- =============================================================================
+
+-- Function: Release a reservation (idempotent) -> minutes released
+CREATE OR REPLACE FUNCTION release_minute_reservation(
+  p_reservation_id UUID
+)
+RETURNS DECIMAL AS $$
+DECLARE
+  v_user_id UUID;
+  v_minutes DECIMAL;
+BEGIN
+  -- Row lock serializes concurrent settles of the same reservation
+  SELECT user_id, minutes_used INTO v_user_id, v_minutes
+  FROM minute_transactions
+  WHERE id = p_reservation_id AND transaction_type = 'reservation'
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN 0;
+  END IF;
+
+  IF EXISTS (
+    SELECT 1 FROM minute_transactions
+    WHERE reservation_id = p_reservation_id AND transaction_type = 'reservation_release'
+  ) THEN
+    RETURN 0;
+  END IF;
+
+  UPDATE users
+  SET minutes_reserved = GREATEST(0, COALESCE(minutes_reserved, 0) - v_minutes)
+  WHERE id = v_user_id;
+
+  INSERT INTO minute_transactions (user_id, minutes_used, transaction_type, reservation_id)
+  VALUES (v_user_id, v_minutes, 'reservation_release', p_reservation_id);
+
+  RETURN v_minutes;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: Reserve minutes if the user has any left (grace period: a video
+-- may finish over the limit, but can't start once used + reserved >= limit)
+CREATE OR REPLACE FUNCTION reserve_minutes(
+  p_user_id UUID,
+  p_minutes DECIMAL,
+  p_video_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_user users%ROWTYPE;
+  v_reservation_id UUID;
+BEGIN
+  -- Reservations from workers that died mid-video would block the user forever
+  PERFORM release_minute_reservation(r.id)
+  FROM minute_transactions r
+  WHERE r.user_id = p_user_id
+    AND r.transaction_type = 'reservation'
+    AND r.created_at < NOW() - INTERVAL '6 hours'
+    AND NOT EXISTS (
+      SELECT 1 FROM minute_transactions s
+      WHERE s.reservation_id = r.id AND s.transaction_type = 'reservation_release'
+    );
+
+  -- Check and hold in one statement: the row lock makes concurrent reservations queue up
+  UPDATE users
+  SET minutes_reserved = COALESCE(minutes_reserved, 0) + p_minutes
+  WHERE id = p_user_id
+    AND COALESCE(minutes_used_this_month, 0) + COALESCE(minutes_reserved, 0) < monthly_minute_limit
+  RETURNING * INTO v_user;
+
+  IF NOT FOUND THEN
+    SELECT * INTO v_user FROM users WHERE id = p_user_id;
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'reserve_minutes: user % not found', p_user_id;
+    END IF;
+  ELSE
+    INSERT INTO minute_transactions (user_id, video_id, minutes_used, transaction_type)
+    VALUES (p_user_id, p_video_id, p_minutes, 'reservation')
+    RETURNING id INTO v_reservation_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'reserved', v_reservation_id IS NOT NULL,
+    'reservation_id', v_reservation_id,
+    'minutes_used_this_month', v_user.minutes_used_this_month,
+    'minutes_reserved', v_user.minutes_reserved,
+    'monthly_minute_limit', v_user.monthly_minute_limit,
+    'subscription_tier', v_user.subscription_tier
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: Increment Minute Usage (now returns the new total)
+DROP FUNCTION IF EXISTS increment_minute_usage(UUID, DECIMAL);
+
+CREATE OR REPLACE FUNCTION increment_minute_usage(
+  p_user_id UUID,
+  p_minutes DECIMAL
+)
+RETURNS DECIMAL AS $$
+DECLARE
+  v_used DECIMAL;
+BEGIN
+  UPDATE users
+  SET minutes_used_this_month = COALESCE(minutes_used_this_month, 0) + p_minutes
+  WHERE id = p_user_id
+  RETURNING minutes_used_this_month INTO v_used;
+
+  RETURN v_used;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 3. RECORD_VIDEO_RESULT SETTLES THE RESERVATION
+-- =============================================================================
+-- Same as add_record_video_result.sql plus p_reservation_id: the hold is
+-- released and the actual minutes charged in the same transaction.
+DROP FUNCTION IF EXISTS record_video_result(UUID, JSONB, DECIMAL, UUID, JSONB, DECIMAL);
+
+CREATE OR REPLACE FUNCTION record_video_result(
+  p_user_id UUID,
+  p_video JSONB,
+  p_minutes DECIMAL,
+  p_video_id UUID DEFAULT NULL,
+  p_creator JSONB DEFAULT NULL,
+  p_fact_score DECIMAL DEFAULT NULL,
+  p_reservation_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_creator_id UUID;
+  v_creator JSONB;
+  v_video_id UUID := p_video_id;
+  v_minutes_used DECIMAL;
+BEGIN
+  -- Creator tracking (non-critical)
+  IF p_creator IS NOT NULL AND COALESCE(p_creator->>'name', '') <> '' THEN
+    BEGIN
+      v_creator_id := upsert_creator(
+        p_creator->>'name',
+        COALESCE(NULLIF(p_creator->>'platform_id', ''), 'unknown'),
+        COALESCE(p_creator->>'platform', p_video->>'platform', 'youtube'),
+        p_creator->>'channel_url',
+        (p_creator->>'subscriber_count')::NUMERIC::INTEGER,
+        p_creator->>'category'
+      );
+      PERFORM track_video_upload(p_video->>'video_url', v_creator_id);
+      IF p_fact_score IS NOT NULL THEN
+        PERFORM update_creator_stats(v_creator_id, p_fact_score);
+      END IF;
+      SELECT to_jsonb(c) INTO v_creator FROM creators c WHERE c.id = v_creator_id;
+    EXCEPTION WHEN OTHERS THEN
+      RAISE WARNING 'record_video_result: creator tracking failed: %', SQLERRM;
+      v_creator_id := NULL;
+      v_creator := NULL;
+    END;
+  END IF;
+
+  -- Video row
+  IF v_video_id IS NULL THEN
+    INSERT INTO videos (
+      user_id, video_url, title, platform, duration_minutes, transcription,
+      analysis, analysis_type, processing_status, minutes_charged, completed_at,
+      creator_id, creator_name, creator_platform_id, category
+    )
+    VALUES (
+      p_user_id,
+      p_video->>'video_url',
+      COALESCE(p_video->>'title', 'Untitled'),
+      p_video->>'platform',
+      (p_video->>'duration_minutes')::DECIMAL,
+      p_video->>'transcription',
+      p_video->>'analysis',
+      p_video->>'analysis_type',
+      'completed',
+      p_minutes,
+      NOW(),
+      v_creator_id,
+      p_creator->>'name',
+      p_creator->>'platform_id',
+      p_creator->>'category'
+    )
+    RETURNING id INTO v_video_id;
+  ELSE
+    UPDATE videos SET
+      video_url = p_video->>'video_url',
+      title = COALESCE(p_video->>'title', 'Untitled'),
+      platform = p_video->>'platform',
+      duration_minutes = (p_video->>'duration_minutes')::DECIMAL,
+      transcription = p_video->>'transcription',
+      analysis = p_video->>'analysis',
+      analysis_type = p_video->>'analysis_type',
+      processing_status = 'completed',
+      error_message = NULL,
+      minutes_charged = p_minutes,
+      completed_at = NOW(),
+      creator_id = v_creator_id,
+      creator_name = p_creator->>'name',
+      creator_platform_id = p_creator->>'platform_id',
+      category = p_creator->>'category'
+    WHERE id = v_video_id AND user_id = p_user_id;
+
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'record_video_result: video % not found for user %', v_video_id, p_user_id;
+    END IF;
+  END IF;
+
+  -- Settle: drop the estimate, charge the actual minutes
+  IF p_reservation_id IS NOT NULL THEN
+    PERFORM release_minute_reservation(p_reservation_id);
+  END IF;
+
+  UPDATE users
+  SET minutes_used_this_month = COALESCE(minutes_used_this_month, 0) + p_minutes,
+      updated_at = NOW()
+  WHERE id = p_user_id
+  RETURNING minutes_used_this_month INTO v_minutes_used;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'record_video_result: user % not found', p_user_id;
+  END IF;
+
+  INSERT INTO minute_transactions (user_id, video_id, minutes_used, transaction_type, reservation_id)
+  VALUES (p_user_id, v_video_id, p_minutes, 'video_processing', p_reservation_id);
+
+  RETURN jsonb_build_object(
+    'video_id', v_video_id,
+    'minutes_used_this_month', v_minutes_used,
+    'creator', v_creator
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Minute accounting is backend-only (service role)
+REVOKE EXECUTE ON FUNCTION record_video_result(UUID, JSONB, DECIMAL, UUID, JSONB, DECIMAL, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_video_result(UUID, JSONB, DECIMAL, UUID, JSONB, DECIMAL, UUID) TO service_role;
+REVOKE EXECUTE ON FUNCTION reserve_minutes(UUID, DECIMAL, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reserve_minutes(UUID, DECIMAL, UUID) TO service_role;
+REVOKE EXECUTE ON FUNCTION release_minute_reservation(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION release_minute_reservation(UUID) TO service_role;
+REVOKE EXECUTE ON FUNCTION increment_minute_usage(UUID, DECIMAL) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION increment_minute_usage(UUID, DECIMAL) TO service_role;
+
+-- =============================================================================
+-- 4. COMMENTS
+-- =============================================================================
+
+COMMENT ON COLUMN users.minutes_reserved IS 'Minutes held by videos still processing (estimate, settled on completion)';
+COMMENT ON COLUMN minute_transactions.reservation_id IS 'Reservation settled by this release/charge row';
+COMMENT ON FUNCTION reserve_minutes IS 'Atomically checks used + reserved < limit and holds the estimate';
+COMMENT ON FUNCTION release_minute_reservation IS 'Returns a reservation''s minutes (idempotent)';
@@ -0,0 +1,180 @@
+-- Migration: Record a processed video in one transaction
+-- Description: Single RPC for creator upsert, upload tracking, creator stats,
+--              video insert/complete, minute deduction and transaction log
+-- Depends on: add_creator_tracking.sql
+-- Date: 2025-11-20
+
+-- =============================================================================
+-- 1. CATEGORY COLUMNS
+-- =============================================================================
+-- The backend already sends a category for creators and videos
+ALTER TABLE creators ADD COLUMN IF NOT EXISTS category TEXT;
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS category TEXT;
+
+-- =============================================================================
+-- 2. UPSERT_CREATOR WITH CATEGORY
+-- =============================================================================
+-- The backend calls upsert_creator with p_category, which the original
+-- 5-argument signature doesn't accept. Replace it rather than overload it.
+DROP FUNCTION IF EXISTS upsert_creator(TEXT, TEXT, TEXT, TEXT, INTEGER);
+
+CREATE OR REPLACE FUNCTION upsert_creator(
+  p_name TEXT,
+  p_platform_id TEXT,
+  p_platform TEXT,
+  p_channel_url TEXT DEFAULT NULL,
+  p_subscriber_count INTEGER DEFAULT NULL,
+  p_category TEXT DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+  v_creator_id UUID;
+BEGIN
+  INSERT INTO creators (name, platform_id, platform, channel_url, subscriber_count, category)
+  VALUES (p_name, p_platform_id, p_platform, p_channel_url, p_subscriber_count, p_category)
+  ON CONFLICT (platform, platform_id)
+  DO UPDATE SET
+    name = EXCLUDED.name,
+    channel_url = COALESCE(EXCLUDED.channel_url, creators.channel_url),
+    subscriber_count = COALESCE(EXCLUDED.subscriber_count, creators.subscriber_count),
+    category = COALESCE(EXCLUDED.category, creators.category),
+    last_seen = NOW(),
+    updated_at = NOW()
+  RETURNING id INTO v_creator_id;
+
+  RETURN v_creator_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 3. RECORD_VIDEO_RESULT
+-- =============================================================================
+-- Replaces ~8 sequential round trips from the backend with one call.
+-- Everything commits together, except creator tracking, which stays
+-- non-critical: a failure there is rolled back to a savepoint and the video
+-- is still saved and charged.
+--
+-- p_video:   videos columns (video_url, title, platform, duration_minutes,
+--            transcription, analysis, analysis_type, minutes_charged)
+-- p_creator: {name, platform_id, platform, channel_url, subscriber_count, category} or NULL
+-- p_video_id: complete this placeholder row (queued jobs) instead of inserting
+--
+-- Returns {video_id, minutes_used_this_month, creator (row or null)}
+CREATE OR REPLACE FUNCTION record_video_result(
+  p_user_id UUID,
+  p_video JSONB,
+  p_minutes DECIMAL,
+  p_video_id UUID DEFAULT NULL,
+  p_creator JSONB DEFAULT NULL,
+  p_fact_score DECIMAL DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_creator_id UUID;
+  v_creator JSONB;
+  v_video_id UUID := p_video_id;
+  v_minutes_used DECIMAL;
+BEGIN
+  -- Creator tracking (non-critical)
+  IF p_creator IS NOT NULL AND COALESCE(p_creator->>'name', '') <> '' THEN
+    BEGIN
+      v_creator_id := upsert_creator(
+        p_creator->>'name',
+        COALESCE(NULLIF(p_creator->>'platform_id', ''), 'unknown'),
+        COALESCE(p_creator->>'platform', p_video->>'platform', 'youtube'),
+        p_creator->>'channel_url',
+        (p_creator->>'subscriber_count')::NUMERIC::INTEGER,
+        p_creator->>'category'
+      );
+      PERFORM track_video_upload(p_video->>'video_url', v_creator_id);
+      IF p_fact_score IS NOT NULL THEN
+        PERFORM update_creator_stats(v_creator_id, p_fact_score);
+      END IF;
+      SELECT to_jsonb(c) INTO v_creator FROM creators c WHERE c.id = v_creator_id;
+    EXCEPTION WHEN OTHERS THEN
+      RAISE WARNING 'record_video_result: creator tracking failed: %', SQLERRM;
+      v_creator_id := NULL;
+      v_creator := NULL;
+    END;
+  END IF;
+
+  -- Video row
+  IF v_video_id IS NULL THEN
+    INSERT INTO videos (
+      user_id, video_url, title, platform, duration_minutes, transcription,
+      analysis, analysis_type, processing_status, minutes_charged, completed_at,
+      creator_id, creator_name, creator_platform_id, category
+    )
+    VALUES (
+      p_user_id,
+      p_video->>'video_url',
+      COALESCE(p_video->>'title', 'Untitled'),
+      p_video->>'platform',
+      (p_video->>'duration_minutes')::DECIMAL,
+      p_video->>'transcription',
+      p_video->>'analysis',
+      p_video->>'analysis_type',
+      'completed',
+      p_minutes,
+      NOW(),
+      v_creator_id,
+      p_creator->>'name',
+      p_creator->>'platform_id',
+      p_creator->>'category'
+    )
+    RETURNING id INTO v_video_id;
+  ELSE
+    UPDATE videos SET
+      video_url = p_video->>'video_url',
+      title = COALESCE(p_video->>'title', 'Untitled'),
+      platform = p_video->>'platform',
+      duration_minutes = (p_video->>'duration_minutes')::DECIMAL,
+      transcription = p_video->>'transcription',
+      analysis = p_video->>'analysis',
+      analysis_type = p_video->>'analysis_type',
+      processing_status = 'completed',
+      error_message = NULL,
+      minutes_charged = p_minutes,
+      completed_at = NOW(),
+      creator_id = v_creator_id,
+      creator_name = p_creator->>'name',
+      creator_platform_id = p_creator->>'platform_id',
+      category = p_creator->>'category'
+    WHERE id = v_video_id AND user_id = p_user_id;
+
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'record_video_result: video % not found for user %', v_video_id, p_user_id;
+    END IF;
+  END IF;
+
+  -- Minute deduction (in-place increment - no read-modify-write race)
+  UPDATE users
+  SET minutes_used_this_month = COALESCE(minutes_used_this_month, 0) + p_minutes,
+      updated_at = NOW()
+  WHERE id = p_user_id
+  RETURNING minutes_used_this_month INTO v_minutes_used;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'record_video_result: user % not found', p_user_id;
+  END IF;
+
+  INSERT INTO minute_transactions (user_id, video_id, minutes_used, transaction_type)
+  VALUES (p_user_id, v_video_id, p_minutes, 'video_processing');
+
+  RETURN jsonb_build_object(
+    'video_id', v_video_id,
+    'minutes_used_this_month', v_minutes_used,
+    'creator', v_creator
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Charges minutes - only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION record_video_result(UUID, JSONB, DECIMAL, UUID, JSONB, DECIMAL) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_video_result(UUID, JSONB, DECIMAL, UUID, JSONB, DECIMAL) TO service_role;
+
+-- =============================================================================
+-- 4. COMMENTS
+-- =============================================================================
+
+COMMENT ON FUNCTION record_video_result IS 'Saves a processed video, creator stats and minute charge in one transaction';
@@ -0,0 +1,49 @@
+-- Migration: Add Transcript Cache
+-- Description: Content-addressed transcript cache shared by all workers and users
+-- Keyed by (platform, canonical video id, language) so every URL form of a video hits the same row
+
+-- =============================================================================
+-- 1. TRANSCRIPT_CACHE TABLE
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS transcript_cache (
+  platform TEXT NOT NULL, -- 'youtube', 'instagram'
+  video_id TEXT NOT NULL, -- Canonical id (YouTube video id, Instagram shortcode)
+  language TEXT NOT NULL DEFAULT 'en',
+
+  -- Transcript
+  transcription TEXT NOT NULL,
+  segments JSONB DEFAULT '[]'::jsonb, -- [{start, duration, text}, ...]
+  source TEXT, -- 'youtube_captions', 'whisper', 'videos'
+
+  -- Metadata known when the transcript was produced
+  title TEXT,
+  duration_minutes DECIMAL(10,2),
+  creator_info JSONB,
+
+  created_at TIMESTAMP DEFAULT NOW(),
+  updated_at TIMESTAMP DEFAULT NOW(),
+
+  PRIMARY KEY (platform, video_id, language)
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcript_cache_updated_at ON transcript_cache(updated_at DESC);
+
+-- Keep updated_at current on upsert
+CREATE OR REPLACE FUNCTION touch_transcript_cache()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_touch_transcript_cache ON transcript_cache;
+CREATE TRIGGER trg_touch_transcript_cache
+  BEFORE UPDATE ON transcript_cache
+  FOR EACH ROW EXECUTE FUNCTION touch_transcript_cache();
+
+-- =============================================================================
+-- 2. ROW LEVEL SECURITY
+-- =============================================================================
+-- Backend only (service role); no direct client access
+ALTER TABLE transcript_cache ENABLE ROW LEVEL SECURITY;
@@ -14,6 +14,21 @@ import {
 import { Icon } from "@iconify/react";
 import { videoAPI } from "../services/api";
 
+// Stream progress and partial claims over SSE instead of waiting for the full response
+const STREAM_ANALYSIS = import.meta.env.VITE_STREAM_ANALYSIS === "true";
+
+const STAGE_LABELS = {
+  checking_cache: "Checking for an existing transcript...",
+  estimating: "Estimating video length...",
+  fetching_transcript: "Fetching transcript...",
+  downloading: "Downloading audio...",
+  transcribing: "Transcribing audio...",
+  fetching_metadata: "Fetching video info...",
+  analyzing: "Analyzing...",
+  highlighting: "Highlighting claims...",
+  saving: "Saving results...",
+};
+
 export default function VideoProcessor({ onProcessed, onLoadingChange, onProcessingStart, embedded = false }) {
   const [inputType, setInputType] = useState("url");
   const [url, setUrl] = useState("");
@@ -107,6 +122,22 @@ export default function VideoProcessor({ onProcessed, onLoadingChange, onProcess
       let response;
       if (isAnonymous) {
         response = await videoAPI.processFree(cleanUrl);
+      } else if (STREAM_ANALYSIS) {
+        let claimsFound = 0;
+        let summaryChars = 0;
+        response = await videoAPI.processStream(cleanUrl, selectedType, (event, data) => {
+          if (event === "stage") {
+            setProcessingStatus(STAGE_LABELS[data.stage] || "Processing video...");
+          } else if (event === "claim") {
+            claimsFound += 1;
+            setProcessingStatus(`Fact-checking... ${claimsFound} claim${claimsFound === 1 ? "" : "s"} found`);
+          } else if (event === "chunk") {
+            setProcessingStatus(`Fact-checking... part ${data.done} of ${data.total} done`);
+          } else if (event === "token") {
+            summaryChars += data.text.length;
+            setProcessingStatus(`Writing summary... (${summaryChars} characters)`);
+          }
+        });
       } else {
         response = await videoAPI.process(cleanUrl, selectedType);
       }
@@ -20,14 +20,24 @@ export default function HistoryPage() {
   const [videos, setVideos] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [search, setSearch] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
   const [filter, setFilter] = useState("all");
   const [page, setPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
   const perPage = 10;
 
+  // Search runs server-side (indexed), so wait for the user to stop typing
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setDebouncedSearch(search.trim());
+      setPage(1);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [search]);
+
   useEffect(() => {
     fetchVideos();
-  }, [page, filter]);
+  }, [page, filter, debouncedSearch]);
 
   const fetchVideos = async () => {
     setIsLoading(true);
@@ -39,6 +49,9 @@ export default function HistoryPage() {
       if (filter !== "all") {
         params.analysis_type = filter;
       }
+      if (debouncedSearch) {
+        params.search = debouncedSearch;
+      }
 
       const response = await videoAPI.getHistory(params);
       setVideos(response.data.videos || []);
@@ -76,10 +89,6 @@ export default function HistoryPage() {
     }
   };
 
-  const filteredVideos = videos.filter((video) =>
-    video.title?.toLowerCase().includes(search.toLowerCase())
-  );
-
   return (
     <div className="min-h-screen py-8 px-4">
       <div className="max-w-6xl mx-auto space-y-6">
@@ -124,7 +133,7 @@ export default function HistoryPage() {
           <div className="flex justify-center py-12">
             <Spinner size="lg" color="primary" />
           </div>
-        ) : filteredVideos.length === 0 ? (
+        ) : videos.length === 0 ? (
           <Card>
             <CardBody className="py-12 text-center">
               <Icon icon="solar:folder-open-linear" className="text-default-300 mx-auto mb-4" width={48} />
@@ -141,7 +150,7 @@ export default function HistoryPage() {
           </Card>
         ) : (
           <div className="space-y-4">
-            {filteredVideos.map((video) => (
+            {videos.map((video) => (
               <Card key={video.id} className="hover:shadow-md transition-shadow">
                 <CardBody className="flex flex-row items-center gap-4">
                   <div className="w-12 h-12 rounded-full bg-primary/10 flex items-center justify-center flex-shrink-0">
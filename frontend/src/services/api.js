@@ -75,9 +75,97 @@ export const userAPI = {
   deleteAccount: (password) => api.delete('/users/me', { data: { password } }),
 };
 
+// Poll a background job until it finishes; resolves/rejects like a normal axios call
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const waitForJob = async (jobId) => {
+  for (;;) {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    const { data: job } = await api.get(`/videos/jobs/${jobId}`);
+    if (job.status === 'completed') {
+      return { data: job.result, status: 200 };
+    }
+    if (job.status === 'failed') {
+      const result = job.result || { success: false, error: job.error };
+      const error = new Error(result.error || 'Video processing failed');
+      error.response = { status: result.status_code || 500, data: result };
+      throw error;
+    }
+  }
+};
+
+// Stream /videos/process-stream (Server-Sent Events over fetch, since EventSource can't POST or send auth)
+const processStream = async (url, analysisType, onEvent = () => {}) => {
+  let token = localStorage.getItem('access_token');
+  if (!token) {
+    const { data: { session } } = await supabase.auth.getSession();
+    token = session?.access_token;
+  }
+
+  const response = await fetch(`${API_URL}/videos/process-stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify({ url, analysis_type: analysisType }),
+  });
+
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => ({}));
+    const error = new Error(data.error || 'Video processing failed');
+    error.response = { status: response.status, data };
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;  // keepalive comment
+      const payload = JSON.parse(data);
+
+      if (event === 'result') {
+        return { data: payload, status: payload.status_code || 200 };
+      }
+      if (event === 'error') {
+        const error = new Error(payload.error || 'Video processing failed');
+        error.response = { status: payload.status_code || 500, data: payload };
+        throw error;
+      }
+      onEvent(event, payload);
+    }
+  }
+  throw new Error('Stream ended before the analysis finished');
+};
+
 // Video API
 export const videoAPI = {
-  process: (url, analysisType) => api.post('/videos/process', { url, analysis_type: analysisType }),
+  process: async (url, analysisType) => {
+    const response = await api.post('/videos/process', { url, analysis_type: analysisType });
+    // 202 = queued as a background job (USE_BACKGROUND_JOBS); poll for the final result
+    if (response.status === 202 && response.data?.job_id) {
+      return waitForJob(response.data.job_id);
+    }
+    return response;
+  },
+  processStream,
+  getJob: (jobId) => api.get(`/videos/jobs/${jobId}`),
   processFree: (url) => axios.post(`${API_URL}/videos/process-free`, { url }),  // No auth required
   getHistory: (params) => api.get('/videos/history', { params }),
   getVideo: (videoId) => api.get(`/videos/${videoId}`),